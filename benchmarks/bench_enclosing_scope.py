@@ -0,0 +1,96 @@
+"""
+Compares the legacy nested-walk caller enclosure search with the one-pass
+enclosing-scope resolver on a generated module.
+
+    python benchmarks/bench_enclosing_scope.py --lines 10000
+"""
+import argparse
+import ast
+import time
+
+from pyqaai.core.parse_cache import EnclosingScopeVisitor
+
+TARGET = "target_function"
+
+
+def generate_module(lines: int) -> str:
+    chunks = []
+    count = 0
+    index = 0
+    while count < lines:
+        chunks.append(
+            f"class Service{index}:\n"
+            f"    def method_{index}(self, value):\n"
+            f"        def helper(item):\n"
+            f"            return {TARGET}(item) + {index}\n"
+            f"        result = [helper(v) for v in range(value)]\n"
+            f"        return self.{TARGET}(sum(result))\n"
+            f"\n"
+            f"def function_{index}(value):\n"
+            f"    total = 0\n"
+            f"    for i in range(value):\n"
+            f"        total += i * {index}\n"
+            f"    return {TARGET}(total)\n"
+            f"\n"
+        )
+        count += 13
+        index += 1
+    return "".join(chunks)
+
+
+def find_calls(tree: ast.AST) -> list:
+    calls = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            func = node.func
+            if (isinstance(func, ast.Name) and func.id == TARGET) or (isinstance(func, ast.Attribute) and func.attr == TARGET):
+                calls.append(node)
+    return calls
+
+
+def legacy_search(tree: ast.AST, calls: list) -> dict:
+    callers = {}
+    for call in calls:
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and call in ast.walk(node):
+                callers[id(call)] = node
+                break
+    return callers
+
+
+def resolver_search(tree: ast.AST, calls: list) -> dict:
+    visitor = EnclosingScopeVisitor()
+    visitor.visit(tree)
+    return {id(call): visitor.scopes[id(call)] for call in calls if id(call) in visitor.scopes}
+
+
+def time_it(function, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=10000, help="Approximate size of the generated module.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per implementation; the best time is reported.")
+    args = parser.parse_args()
+
+    source = generate_module(args.lines)
+    tree = ast.parse(source)
+    calls = find_calls(tree)
+
+    legacy = time_it(legacy_search, tree, calls, repeat=args.repeat)
+    resolver = time_it(resolver_search, tree, calls, repeat=args.repeat)
+
+    print(f"Module: {len(source.splitlines())} lines, {len(calls)} calls to '{TARGET}'")
+    print(f"Legacy nested walk:     {legacy * 1000:10.1f} ms")
+    print(f"Enclosing-scope lookup: {resolver * 1000:10.1f} ms")
+    print(f"Speedup:                {legacy / resolver:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+End-to-end benchmark of the analysis pipeline on a generated project. Times each stage
+separately, records peak RSS and writes JSON that can be compared between commits.
+
+    python benchmarks/bench_pipeline.py --files 1000 --output before.json
+    python benchmarks/bench_pipeline.py --files 1000 --compare before.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from pyqaai.core.backends import OpenAICompatibleBackend
+from pyqaai.core.code_analyser import CodeAnalyser
+from pyqaai.core.context_builder import ContextBuilder
+from pyqaai.core.llm import LLM
+from pyqaai.core.parse_cache import get_parse_cache
+from pyqaai.core.report_generator import HTMLReportGenerator
+from pyqaai.core.prompt_layout import render_template
+from pyqaai.static.prompts import CHECK_PROMPT, SYSTEM_PROMPT
+
+TARGET = "target_function"
+
+
+def module_name(index: int, depth: int) -> str:
+    return f"pkg.layer{index % depth}.mod{index}"
+
+
+def generate_project(root: str, files: int, functions: int, fan_out: int, fan_in: int, depth: int, seed: int) -> dict:
+    """
+    Writes a project of ``files`` modules spread over ``depth`` package layers. Modules
+    import from the next layer down, so import chains are ``depth`` modules long. Each
+    function calls ``fan_out`` local or imported functions and ``fan_in`` functions
+    across the project call ``target_function`` in pkg/hub.py.
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.join(root, "pkg"))
+    open(os.path.join(root, "setup.py"), "w").close()
+    open(os.path.join(root, "pkg", "__init__.py"), "w").close()
+    for layer in range(depth):
+        os.makedirs(os.path.join(root, "pkg", f"layer{layer}"))
+        open(os.path.join(root, "pkg", f"layer{layer}", "__init__.py"), "w").close()
+    with open(os.path.join(root, "pkg", "hub.py"), "w") as file:
+        file.write(f"def {TARGET}(value):\n    return value * 2\n")
+
+    callers = set(rng.sample(range(files * functions), min(fan_in, files * functions)))
+    lines = 2
+    for index in range(files):
+        imports = []
+        imported_functions = []
+        if index % depth < depth - 1 and files > depth:
+            # Modules in the next layer down have indices congruent to (layer + 1) mod depth.
+            for _ in range(2):
+                other = rng.randrange(index % depth + 1, files, depth) if index % depth + 1 < files else None
+                if other is None:
+                    continue
+                name = f"func_{other}_{rng.randrange(functions)}"
+                imports.append(f"from {module_name(other, depth)} import {name}")
+                imported_functions.append(name)
+
+        body = []
+        for number in range(functions):
+            local_functions = [f"func_{index}_{other}" for other in range(number)]
+            candidates = local_functions + imported_functions
+            callees = [rng.choice(candidates) for _ in range(fan_out)] if candidates else []
+            if index * functions + number in callers:
+                callees.append(TARGET)
+            calls = "".join(f"    total += {callee}(value + {position})\n" for position, callee in enumerate(callees))
+            body.append(
+                f"def func_{index}_{number}(value):\n"
+                f"    \"\"\"Generated function {number} of module {index}.\"\"\"\n"
+                f"    total = value\n"
+                f"{calls}"
+                f"    return total\n"
+            )
+        body.append(
+            f"class Service{index}:\n"
+            f"    def run(self, value):\n"
+            f"        return func_{index}_0(value)\n"
+        )
+        if any(index * functions + number in callers for number in range(functions)):
+            imports.append(f"from pkg.hub import {TARGET}")
+
+        source = "\n".join(imports) + "\n\n\n" + "\n\n".join(body)
+        path = os.path.join(root, *module_name(index, depth).split(".")) + ".py"
+        with open(path, "w") as file:
+            file.write(source)
+        lines += source.count("\n") + 1
+
+    return {"files": files + depth + 2, "modules": files, "lines": lines, "functions": files * functions, "callers_of_target": len(callers)}
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, name: str, function, calls: int = 1):
+        start = time.perf_counter()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            result = function()
+        elapsed = time.perf_counter() - start
+        self.stages[name] = {
+            "seconds": round(elapsed, 4),
+            "calls": calls,
+            "ms_per_call": round(elapsed * 1000 / max(1, calls), 3),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(project_root: str, samples: int, seed: int) -> dict:
+    timer = StageTimer()
+    os.chdir(project_root)
+    get_parse_cache().clear()
+
+    timer.run("find_project_root", CodeAnalyser.find_project_root)
+    code_analyser = timer.run("create_code_analyser", CodeAnalyser)
+    python_files = sorted(CodeAnalyser.find_python_files_in_directory(os.path.join(project_root, "pkg")))
+
+    def extract_all():
+        return {path: CodeAnalyser.extract_functions_and_classes_from_module(path) for path in python_files}
+    definitions = timer.run("extract_functions_and_classes_from_module", extract_all, calls=len(python_files))
+
+    rng = random.Random(seed)
+    targets = [(path, name) for path, elements in definitions.items() for name in elements if "." not in name]
+    sampled = rng.sample(targets, min(samples, len(targets)))
+
+    invoked = timer.run("extract_callee_functions", lambda: [code_analyser.extract_callee_functions(path, name) for path, name in sampled], calls=len(sampled))
+
+    def imports():
+        results = []
+        for path, _ in sampled:
+            imported_modules, import_statements = code_analyser.get_imported_modules(path)
+            results.append((import_statements, code_analyser.extract_local_imported_functions(imported_modules, path)))
+        return results
+    imported = timer.run("get_imported_modules+extract_local_imported_functions", imports, calls=len(sampled))
+
+    timer.run("find_callers_of_function[cold]", lambda: code_analyser.find_callers_of_function(TARGET), calls=1)
+    callers = timer.run("find_callers_of_function[warm]", lambda: [code_analyser.find_callers_of_function(name) for _, name in sampled], calls=len(sampled))
+
+    llm = LLM(None, None, backend=OpenAICompatibleBackend("http://127.0.0.1:9/v1"))
+    context_builder = ContextBuilder(model=llm.model)
+    system_prompt = render_template(SYSTEM_PROMPT)
+    check_prompt = render_template(CHECK_PROMPT, filled_structure={"qa_check_prompt": "Benchmark", "pass": "True or False", "justification": "..."})
+
+    def assemble():
+        prompts = []
+        for (path, name), invoked_functions, (import_statements, local_imports), caller_methods in zip(sampled, invoked, imported, callers):
+            assembled = context_builder.build(os.path.relpath(path, project_root), invoked_functions, local_imports, caller_methods)
+            prompts.append(llm._prepare_messages(
+                system_prompt,
+                import_statements=import_statements,
+                local_imported_functions_classes=assembled.local_imported_functions_classes,
+                caller_methods=assembled.caller_methods,
+                qa_code=definitions[path][name].code,
+                invoked_functions=assembled.invoked_functions,
+                check_prompt=check_prompt,
+            ))
+        return prompts
+    timer.run("prompt_assembly", assemble, calls=len(sampled))
+
+    def report():
+        report_generator = HTMLReportGenerator(report_file=os.path.join(project_root, "bench_report.html"))
+        for path, name in sampled:
+            report_generator.add_header(name, level=2)
+            report_generator.add_code_block(definitions[path][name].code)
+            report_generator.add_result("Benchmark check", True, "Generated **justification** text.")
+        report_generator.save_report()
+    timer.run("report_generation", report, calls=len(sampled))
+
+    return timer.stages
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"{'Stage':55} {'Baseline s':>11} {'Current s':>11} {'Ratio':>7}")
+    for name, stage in current["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            print(f"{name:55} {'-':>11} {stage['seconds']:11.4f} {'-':>7}")
+            continue
+        ratio = stage["seconds"] / before["seconds"] if before["seconds"] else float("inf")
+        print(f"{name:55} {before['seconds']:11.4f} {stage['seconds']:11.4f} {ratio:6.2f}x")
+    print(f"{'peak_rss_mb':55} {baseline.get('peak_rss_mb', 0):11.1f} {current['peak_rss_mb']:11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=100, help="Modules in the generated project.")
+    parser.add_argument("--functions", type=int, default=10, help="Functions per module.")
+    parser.add_argument("--fan-out", type=int, default=3, help="Calls made by each generated function.")
+    parser.add_argument("--fan-in", type=int, default=50, help="Functions that call the benchmarked target_function.")
+    parser.add_argument("--import-depth", type=int, default=3, help="Package layers; modules import from the layer below.")
+    parser.add_argument("--samples", type=int, default=20, help="Targets sampled for the per-target stages.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--project", help="Directory for the generated project (default: a temporary directory, removed afterwards).")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Print per-stage ratios against an earlier JSON result.")
+    args = parser.parse_args()
+
+    project_root = os.path.abspath(args.project) if args.project else tempfile.mkdtemp(prefix="pyqaai-bench-")
+    cwd = os.getcwd()
+    try:
+        start = time.perf_counter()
+        project = generate_project(project_root, args.files, args.functions, args.fan_out, args.fan_in, max(1, args.import_depth), args.seed)
+        generation_seconds = time.perf_counter() - start
+        stages = run_benchmark(project_root, args.samples, args.seed)
+    finally:
+        os.chdir(cwd)
+        if not args.project:
+            shutil.rmtree(project_root, ignore_errors=True)
+
+    result = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("project", "output", "compare")},
+        "project": dict(project, generation_seconds=round(generation_seconds, 3)),
+        "stages": stages,
+        "total_seconds": round(sum(stage["seconds"] for stage in stages.values()), 4),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_rss_children_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(result, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(result, json.load(file))
+    elif not args.output:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Start-up benchmark and import-time regression check. Measures the import time of the
+CLI entry points with ``python -X importtime`` and the wall time of commands that must
+not touch the network stack, and fails if a budget is exceeded or a heavy dependency is
+imported eagerly.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --budget-ms 150 --output startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Dependencies only the commands that call the LLM or render reports may import.
+DEFERRED_MODULES = ("openai", "httpx", "httpx2", "pydantic", "tqdm", "inquirer", "markdown", "termcolor", "dotenv")
+ENTRY_MODULES = ("pyqaai.main", "pyqaai.client")
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "pyqaai --help": ["-m", "pyqaai.main", "--help"],
+    "pyqaai --version": ["-m", "pyqaai.main", "--version"],
+    "pyqaai tiers": ["-m", "pyqaai.main", "tiers"],
+    "pyqaai-client --help": ["-m", "pyqaai.client", "--help"],
+}
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(arguments, environment):
+    return subprocess.run([sys.executable, *arguments], capture_output=True, text=True, env=environment, cwd=REPOSITORY_ROOT)
+
+
+def import_profile(module: str, environment) -> dict:
+    """
+    Cumulative import time of ``module`` in milliseconds and every module it loaded.
+    """
+    result = run_python(["-X", "importtime", "-c", f"import {module}"], environment)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        imported[name] = int(cumulative)
+    return {"cumulative_ms": round(imported.get(module, 0) / 1000, 2), "modules": sorted(imported)}
+
+
+def wall_time_ms(arguments, environment, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_python(arguments, environment)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="Maximum cumulative import time of each entry module (default: 100).")
+    parser.add_argument("--repeats", type=int, default=5, help="Runs per command; the fastest is reported (default: 5).")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPOSITORY_ROOT, os.environ.get("PYTHONPATH")])))
+    failures = []
+    imports = {}
+    for module in ENTRY_MODULES:
+        profile = import_profile(module, environment)
+        eager = sorted(name for name in profile["modules"] if name.split(".")[0] in DEFERRED_MODULES)
+        imports[module] = {"cumulative_ms": profile["cumulative_ms"], "modules": len(profile["modules"]), "eager_heavy_modules": eager}
+        if profile["cumulative_ms"] > args.budget_ms:
+            failures.append(f"importing {module} took {profile['cumulative_ms']} ms (budget {args.budget_ms} ms)")
+        if eager:
+            failures.append(f"importing {module} loads {', '.join(sorted({name.split('.')[0] for name in eager}))}")
+
+    commands = {name: wall_time_ms(arguments, environment, args.repeats) for name, arguments in COMMANDS.items()}
+
+    print(f"{'Import':30} {'Cumulative ms':>14} {'Modules':>8}")
+    for module, profile in imports.items():
+        print(f"{module:30} {profile['cumulative_ms']:14.2f} {profile['modules']:8}")
+    print(f"\n{'Command':30} {'Wall ms':>14}")
+    for name, milliseconds in commands.items():
+        print(f"{name:30} {milliseconds:14.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"python": sys.version.split()[0], "budget_ms": args.budget_ms, "imports": imports, "commands": commands, "failures": failures}, file, indent=2)
+
+    if failures:
+        print("\nStart-up budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nStart-up within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,14 @@
-from .core import *
+import importlib
+
 from .models import *
-from .static import *
\ No newline at end of file
+from .static import *
+
+
+def __getattr__(name: str):
+    # Core names load lazily, see pyqaai.core.
+    core = importlib.import_module(f"{__name__}.core")
+    if name == "__all__":
+        return [name for name in globals() if not name.startswith("_")] + core.__all__
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(core, name)
@@ -0,0 +1,136 @@
+"""
+Thin client for a running ``pyqaai serve`` daemon. Uses only the standard library so
+editor integrations and pre-commit hooks start quickly.
+
+    pyqaai-client check pyqaai/core/llm.py --tier 1
+    pyqaai-client check . --changed-since HEAD --incremental
+    pyqaai-client status
+    pyqaai-client stop
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Optional
+
+STATE_RELATIVE_PATH = os.path.join(".pyqaai", "daemon.json")
+# Exit code when no daemon is reachable, distinct from failing checks.
+EXIT_NO_DAEMON = 2
+# Exit code when the daemon was reached but rejected or failed the request.
+EXIT_DAEMON_ERROR = 3
+
+
+def find_daemon_state(starting_directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Reads the state file of the daemon serving the nearest enclosing project.
+    """
+    directory = os.path.abspath(starting_directory or os.getcwd())
+    while True:
+        path = os.path.join(directory, STATE_RELATIVE_PATH)
+        if os.path.isfile(path):
+            try:
+                with open(path) as file:
+                    return json.load(file)
+            except (OSError, ValueError):
+                return None
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def request(state: Dict[str, Any], method: str, path: str, payload: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    http_request = urllib.request.Request(
+        state["url"] + path,
+        data=data,
+        method=method,
+        headers={"Authorization": f"Bearer {state['token']}", "Content-Type": "application/json"},
+    )
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        try:
+            message = json.load(e).get("error", e.reason)
+        except ValueError:
+            message = e.reason
+        raise RuntimeError(f"Daemon returned {e.code}: {message}")
+
+
+def print_results(response: Dict[str, Any]) -> None:
+    for result in response["results"]:
+        marker = " (reused)" if result.get("reused") else ""
+        print(f"{result['file']}:{result['lineno']} {result['type']}: {result['name']}{marker}")
+        if result.get("error"):
+            print(f"  analysis failed: {result['error']}")
+        for check in result["checks"]:
+            status = {True: "pass", False: "FAIL", None: "no response"}[check["pass"]]
+            print(f"  [{status}] {check['category']}")
+    summary = response["summary"]
+    print(f"Checks passed: {summary['checks_passed']}, failed: {summary['checks_failed']}, without a response: {summary['checks_errored']}")
+    cascade = summary.get("cascade")
+    if cascade:
+        print(f"Model cascade: {cascade['decided_by_screen']} of {cascade['checks_screened']} screened checks decided by {cascade['screen_model']}, {cascade['escalated']} escalated to {cascade['main_model']}.")
+    if response.get("results_file"):
+        print(f"Results written to {response['results_file']}")
+
+
+def main(argv: Optional[list] = None) -> None:
+    parser = argparse.ArgumentParser(prog="pyqaai-client", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    check_parser = subparsers.add_parser("check", help="Run a QA tier on files through the daemon.")
+    check_parser.add_argument("paths", nargs="+", help="Python files, directories or glob patterns to check.")
+    check_parser.add_argument("--name", help="Only check this function or class (qualified name, e.g. Class.method).")
+    check_parser.add_argument("--tier", choices=["1", "2", "3"], default="1", help="QA tier to run (default: 1).")
+    check_parser.add_argument("--changed-since", metavar="GIT_REF", help="Only check functions and classes changed since this git ref.")
+    check_parser.add_argument("--incremental", action="store_true", help="Reuse stored results for unchanged functions and classes.")
+    check_parser.add_argument("--output", help="Also write an HTML report and JSON results to this path.")
+    check_parser.add_argument("--json", action="store_true", help="Print the raw JSON response.")
+    subparsers.add_parser("status", help="Show the daemon's state and cache statistics.")
+    subparsers.add_parser("stop", help="Stop the daemon.")
+    args = parser.parse_args(argv)
+
+    state = find_daemon_state()
+    if state is None:
+        print("No PyQAAI daemon is running for this project. Start one with `pyqaai serve`.", file=sys.stderr)
+        sys.exit(EXIT_NO_DAEMON)
+
+    try:
+        if args.command == "status":
+            print(json.dumps(request(state, "GET", "/status", timeout=10), indent=2))
+            return
+        if args.command == "stop":
+            request(state, "POST", "/shutdown", {}, timeout=10)
+            print("Daemon stopping.")
+            return
+
+        response = request(state, "POST", "/check", {
+            "paths": [os.path.abspath(path) for path in args.paths],
+            "name": args.name,
+            "tier": args.tier,
+            "changed_since": args.changed_since,
+            "incremental": args.incremental,
+            "output": os.path.abspath(args.output) if args.output else None,
+        })
+    except RuntimeError as e:
+        # Raised by request for HTTP error responses: the daemon is up
+        print(e, file=sys.stderr)
+        sys.exit(EXIT_DAEMON_ERROR)
+    except OSError as e:
+        print(f"Could not reach the PyQAAI daemon at {state.get('url')}: {e}", file=sys.stderr)
+        sys.exit(EXIT_NO_DAEMON)
+
+    if args.json:
+        print(json.dumps(response, indent=2))
+    else:
+        print_results(response)
+    # A non-zero exit code lets hooks fail on failing checks
+    sys.exit(1 if response["summary"]["checks_failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,135 @@
-from .code_analyser import *
-from .llm import *
-from .report_generator import *
-from .user_interface import *
\ No newline at end of file
+"""
+Names from the core modules are resolved on first access rather than re-exported with
+star imports, so importing one module of the package does not load the OpenAI client,
+markdown and the other heavy dependencies of the rest.
+"""
+import importlib
+from typing import Any, Dict, List
+
+# The public names of each module. The first four are the modules the package originally
+# star-imported, in that order; where two modules define a name, the later one wins, as
+# it did with star imports. Keep this in step when adding public names to a module.
+EXPORTS = {
+    "code_analyser": (
+        "CalleeVisitor", "find_caller_spans", "CodeAnalyser"
+    ),
+    "llm": (
+        "RETRYABLE_STATUS_CODES", "RESPONSE_TOKENS_PER_CHECK", "LLM"
+    ),
+    "report_generator": (
+        "DEFAULT_SECTION", "REPORT_FOOT", "resolve_report_path", "render_header",
+        "render_paragraph", "render_code_block", "render_result", "render_timing_summary",
+        "render_critical_path", "render_cascade_summary", "report_head", "COPY_SCRIPT",
+        "HTMLReportGenerator"
+    ),
+    "user_interface": (
+        "UserInterface",
+    ),
+    "backends": (
+        "DEFAULT_OPENAI_MODEL", "LLMBackend", "OpenAIBackend", "OpenAICompatibleBackend",
+        "FakeBackend", "BACKEND_NAMES", "create_backend"
+    ),
+    "batch": (
+        "HUNK_PATTERN", "BatchTarget", "expand_paths", "changed_line_ranges", "enumerate_targets",
+        "BatchRunner"
+    ),
+    "call_resolver": (
+        "FUNCTION_NODES", "MAX_MRO_DEPTH", "RESOLVED", "UNKNOWN", "EXTERNAL", "Symbol",
+        "CallResolver"
+    ),
+    "cascade": (
+        "DEFAULT_CASCADE_TIERS", "DEFAULT_MIN_CONFIDENCE", "DECIDED_BY_FIELD", "CONFIDENCE_FIELD",
+        "parse_confidence", "ModelCascade"
+    ),
+    "context_builder": (
+        "DEFAULT_CONTEXT_TOKEN_BUDGET", "SECTION_RANKS", "ContextItem", "AssembledContext",
+        "summarise_definition", "path_proximity", "ContextBuilder"
+    ),
+    "daemon": (
+        "DAEMON_STATE_FILENAME", "DEFAULT_WATCH_INTERVAL", "MAX_REQUEST_BYTES", "daemon_state_path",
+        "ProjectWatcher", "QADaemon"
+    ),
+    "fake_server": (
+        "STRUCTURE_MARKER", "IMPROVEMENT_MARKER", "CANNED_JUSTIFICATION", "CANNED_IMPROVEMENT",
+        "STREAM_CHUNK_CHARACTERS", "canned_response", "FakeLLMServer", "serve"
+    ),
+    "file_discovery": (
+        "FILE_LIST_CACHE_FILENAME", "FILE_LIST_CACHE_VERSION", "IGNORE_FILENAMES",
+        "DEFAULT_EXCLUDED_DIRECTORIES", "IgnoreRule", "compile_ignore_pattern", "IgnoreFile",
+        "is_ignored", "FileDiscovery"
+    ),
+    "fingerprints": (
+        "VERDICT_STORE_FILENAME", "normalised_ast_hash", "element_fingerprint", "VerdictStore"
+    ),
+    "import_resolver": (
+        "MAX_REEXPORT_DEPTH", "split_import_path", "StaticImportResolver"
+    ),
+    "instrumentation": (
+        "SUMMED_ATTRIBUTES", "Span", "Tracer", "get_tracer"
+    ),
+    "parse_cache": (
+        "AST_SIZE_FACTOR", "DEFAULT_MAX_BYTES", "SCOPE_NODES", "LINE_BREAK",
+        "EnclosingScopeVisitor", "ScopeChainVisitor", "used_names", "ParsedModule", "ParseCache",
+        "get_parse_cache"
+    ),
+    "pipeline": (
+        "CONTEXT_SECTIONS", "TargetContext", "create_llm", "create_context_builder",
+        "create_cascade", "gather_target_context", "section_groups", "section_label",
+        "build_check_prompts", "run_tier_checks", "run_section_checks", "check_target"
+    ),
+    "project_index": (
+        "INDEX_DIRECTORY", "INDEX_FILENAME", "INDEX_SCHEMA_VERSION", "hash_content", "IndexVisitor",
+        "index_file", "read_source_file", "read_source_span", "ProjectIndex"
+    ),
+    "prompt_layout": (
+        "CONTEXT_START", "CONTEXT_END", "canonical_json", "render_statements", "render_definitions",
+        "render_code_context", "render_template"
+    ),
+    "rate_limiter": (
+        "TokenBucket", "RateLimiter"
+    ),
+    "report_writer": (
+        "DEFAULT_PAGE_SIZE", "MAX_SUMMARY_JUSTIFICATION_CHARS", "failure_summary",
+        "TableOfContentsEntry", "BatchReportWriter"
+    ),
+    "response_cache": (
+        "RESPONSE_CACHE_FILENAME", "DEFAULT_TTL_SECONDS", "DEFAULT_MAX_ENTRIES", "ResponseCache"
+    ),
+    "stage_graph": (
+        "Stage", "StageGraph"
+    ),
+    "static_checks": (
+        "STATIC_DECIDER", "STATIC_CHECKS_VERSION", "BROAD_EXCEPTIONS", "FUNCTION_NODES",
+        "StaticFacts", "analyse_definition", "STATIC_RULES", "apply_static_rules"
+    ),
+    "streaming": (
+        "JSON_ESCAPES", "JsonFieldStreamer", "StreamPrinter"
+    ),
+    "tokenizer": (
+        "WORD_PATTERN", "count_tokens"
+    ),
+    "worker_pool": (
+        "SERIAL_THRESHOLD", "CHUNKS_PER_WORKER", "size_balanced_chunks", "WorkerPool",
+        "get_worker_pool"
+    ),
+}
+
+SUBMODULES = tuple(EXPORTS)
+
+_owners: Dict[str, str] = {name: submodule for submodule, names in EXPORTS.items() for name in names}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "__all__":
+        return list(_owners)
+    submodule = _owners.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Only the module defining the name is imported.
+    value = getattr(importlib.import_module(f"{__name__}.{submodule}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(SUBMODULES) | set(_owners))
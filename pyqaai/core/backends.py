@@ -0,0 +1,100 @@
+from typing import Any, Dict, Optional
+
+DEFAULT_OPENAI_MODEL = "gpt-4o-2024-05-13"
+
+
+class LLMBackend:
+    """
+    Where LLM requests are sent. Every backend provides an OpenAI-compatible client, so
+    rate limiting, retries and streaming work the same way for all of them.
+    """
+    name = ""
+    requires_api_key = False
+    default_model = DEFAULT_OPENAI_MODEL
+
+    def create_client(self) -> Any:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class OpenAIBackend(LLMBackend):
+    name = "openai"
+    requires_api_key = True
+
+    def __init__(self, api_key: str, organisation: Optional[str]):
+        if not api_key or not organisation:
+            raise ValueError("API key and organisation must be provided")
+        self.api_key = api_key
+        self.organisation = organisation
+
+    def create_client(self) -> Any:
+        from openai import OpenAI
+
+        # Retries are handled by LLM._create_completion so they share the rate limiter.
+        return OpenAI(organization=self.organisation, api_key=self.api_key, max_retries=0)
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any server implementing the OpenAI chat completions API, e.g. a local model server.
+    """
+    name = "openai-compatible"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, model: Optional[str] = None):
+        if not base_url:
+            raise ValueError("A base URL must be provided for an OpenAI-compatible backend")
+        self.base_url = base_url
+        self.api_key = api_key
+        if model:
+            self.default_model = model
+
+    def create_client(self) -> Any:
+        from openai import OpenAI
+
+        # Local servers usually ignore the key, but the client requires one.
+        return OpenAI(base_url=self.base_url, api_key=self.api_key or "not-needed", max_retries=0)
+
+
+class FakeBackend(OpenAICompatibleBackend):
+    """
+    Starts the bundled fake LLM server in-process and sends requests to it over HTTP.
+    """
+    name = "fake"
+    default_model = "pyqaai-fake"
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.0, pass_rate: float = 0.8):
+        from pyqaai.core.fake_server import FakeLLMServer
+
+        self.server = FakeLLMServer(latency=latency, jitter=jitter, pass_rate=pass_rate)
+        super().__init__(self.server.base_url)
+
+    def create_client(self) -> Any:
+        self.server.start()
+        return super().create_client()
+
+    def close(self) -> None:
+        self.server.stop()
+
+
+BACKEND_NAMES = [OpenAIBackend.name, OpenAICompatibleBackend.name, FakeBackend.name]
+
+
+def create_backend(name: str, config: Dict[str, Any], api_key: Optional[str] = None, organisation: Optional[str] = None) -> LLMBackend:
+    """
+    Creates the named backend from the configuration. The OpenAI backend needs the
+    API key and organisation; the others read LLM_BASE_URL, LLM_MODEL and the
+    FAKE_LLM_* settings.
+    """
+    if name == OpenAIBackend.name:
+        return OpenAIBackend(api_key, organisation)
+    if name == OpenAICompatibleBackend.name:
+        return OpenAICompatibleBackend(config.get("LLM_BASE_URL"), api_key=api_key, model=config.get("LLM_MODEL"))
+    if name == FakeBackend.name:
+        return FakeBackend(
+            latency=config.get("FAKE_LLM_LATENCY_SECONDS", 0.5),
+            jitter=config.get("FAKE_LLM_JITTER_SECONDS", 0.0),
+            pass_rate=config.get("FAKE_LLM_PASS_RATE", 0.8),
+        )
+    raise ValueError(f"Unknown LLM backend: {name}")
@@ -0,0 +1,322 @@
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from pyqaai.core.cascade import DECIDED_BY_FIELD, ModelCascade
+from pyqaai.core.code_analyser import CodeAnalyser
+from pyqaai.core.context_builder import ContextBuilder
+from pyqaai.core.fingerprints import VerdictStore, element_fingerprint
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.llm import LLM
+from pyqaai.core.pipeline import TargetContext, build_check_prompts, gather_target_context, run_section_checks, section_groups
+from pyqaai.core.report_writer import BatchReportWriter
+from pyqaai.core.static_checks import STATIC_CHECKS_VERSION
+from pyqaai.models.models import CodeElement
+from pyqaai.static.prompts import CHECK_PROMPT, CHECK_PROMPT_BATCH, QA_PROMPTS, SYSTEM_PROMPT
+
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class BatchTarget:
+    def __init__(self, file_path: str, name: str, element: CodeElement, end_lineno: int):
+        self.file_path = file_path
+        self.name = name
+        self.element = element
+        self.end_lineno = end_lineno
+
+
+def expand_paths(patterns: List[str]) -> List[str]:
+    """
+    Resolves files, directories and glob patterns to a sorted list of Python files.
+    """
+    python_files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                python_files.update(CodeAnalyser.find_python_files_in_directory(match))
+            elif match.endswith(".py") and os.path.isfile(match):
+                python_files.add(match)
+    return sorted(os.path.abspath(path) for path in python_files)
+
+
+def _run_git(arguments: List[str], cwd: str) -> str:
+    try:
+        result = subprocess.run(["git", *arguments], cwd=cwd, capture_output=True, text=True, check=True)
+    except FileNotFoundError:
+        raise ValueError("git is not installed or not on PATH")
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"git {' '.join(arguments)} failed: {e.stderr.strip()}")
+    return result.stdout
+
+
+def changed_line_ranges(project_root: str, git_ref: str) -> Dict[str, Optional[List[Tuple[int, int]]]]:
+    """
+    Maps each Python file changed since ``git_ref`` (including uncommitted and untracked
+    changes) to the line ranges that changed in the working tree. Untracked files map to
+    None, meaning the whole file is new.
+    """
+    toplevel = _run_git(["rev-parse", "--show-toplevel"], project_root).strip()
+    changed: Dict[str, Optional[List[Tuple[int, int]]]] = {}
+
+    current_file = None
+    for line in _run_git(["diff", "--unified=0", "--no-color", git_ref, "--", "*.py"], toplevel).splitlines():
+        if line.startswith("+++ "):
+            path = line[4:]
+            current_file = os.path.join(toplevel, path[2:]) if path.startswith("b/") else None
+            if current_file is not None:
+                changed.setdefault(current_file, [])
+        elif current_file is not None:
+            match = HUNK_PATTERN.match(line)
+            if match:
+                start = int(match.group(1))
+                count = int(match.group(2)) if match.group(2) is not None else 1
+                # A pure deletion still touches the code around line ``start``.
+                changed[current_file].append((start, start + max(count, 1) - 1))
+
+    for path in _run_git(["ls-files", "--others", "--exclude-standard", "--", "*.py"], toplevel).splitlines():
+        changed[os.path.join(toplevel, path)] = None
+
+    return {os.path.realpath(path): ranges for path, ranges in changed.items()}
+
+
+def enumerate_targets(python_files: List[str], changed: Optional[Dict[str, Optional[List[Tuple[int, int]]]]] = None) -> List[BatchTarget]:
+    """
+    Lists every function and class in the given files. With ``changed`` (see
+    changed_line_ranges), only targets whose lines intersect a change are kept.
+    """
+    targets = []
+    for file_path in python_files:
+        real_path = os.path.realpath(file_path)
+        if changed is not None and real_path not in changed:
+            continue
+        ranges = changed.get(real_path) if changed is not None else None
+
+        try:
+            functions_classes = CodeAnalyser.extract_functions_and_classes_from_module(file_path)
+        except (SyntaxError, ValueError, OSError) as e:
+            print(f"Skipping {file_path}: {e}")
+            continue
+
+        for name, element in functions_classes.items():
+            if ranges is not None and not any(start <= element.end_lineno and element.lineno <= end for start, end in ranges):
+                continue
+            targets.append(BatchTarget(file_path, name, element, element.end_lineno))
+    return targets
+
+
+class BatchRunner:
+    """
+    Runs a QA tier over many targets without user interaction. Code analysis runs on the
+    calling thread while LLM checks for already analysed targets run on a bounded pool of
+    workers, so analysis and model latency overlap. Writes one consolidated HTML report
+    and a JSON results file.
+
+    With a ``verdict_store`` the results of every fully answered target are stored with
+    its fingerprint; with ``incremental`` set as well, targets whose fingerprint is
+    unchanged reuse those results instead of being checked again.
+    """
+    def __init__(self,
+                 code_analyser: CodeAnalyser,
+                 llm: LLM,
+                 context_builder: ContextBuilder,
+                 task_key: str,
+                 workers: int = 4,
+                 batch_checks: bool = False,
+                 verdict_store: Optional[VerdictStore] = None,
+                 incremental: bool = False,
+                 cascade: Optional[ModelCascade] = None,
+                 static_checks: bool = False,
+                 analysis_lock: Optional[threading.Lock] = None):
+        if task_key not in QA_PROMPTS:
+            raise ValueError(f"Unknown tier: {task_key}")
+        self.code_analyser = code_analyser
+        self.llm = llm
+        self.context_builder = context_builder
+        self.task_key = task_key
+        self.workers = max(1, workers)
+        self.batch_checks = batch_checks
+        self.verdict_store = verdict_store
+        self.incremental = incremental and verdict_store is not None
+        self.cascade = cascade if cascade is not None and cascade.applies(task_key) else None
+        self.static_checks = static_checks
+        # Held around index refresh and context gathering when the analyser is shared
+        self.analysis_lock = analysis_lock or contextlib.nullcontext()
+        prompts = json.dumps({
+            "system": SYSTEM_PROMPT,
+            "check": CHECK_PROMPT,
+            "batch": CHECK_PROMPT_BATCH,
+            "checks": QA_PROMPTS[task_key],
+            "sections": [[list(sections), group] for sections, group in section_groups(task_key).items()],
+            "static_checks": STATIC_CHECKS_VERSION if static_checks else None,
+        }, sort_keys=True)
+        self.prompt_key = hashlib.sha256(prompts.encode("utf-8")).hexdigest()
+
+    def _fingerprint(self, target: TargetContext) -> str:
+        return element_fingerprint(
+            target.qa_code,
+            target.invoked_functions,
+            target.local_imported_functions_classes,
+            target.caller_methods,
+            f"{self.llm.model}+{self.cascade.key}" if self.cascade is not None else self.llm.model,
+            self.prompt_key,
+        )
+
+    def _check_target(self, target: TargetContext) -> List[Optional[Dict[str, Any]]]:
+        return run_section_checks(self.llm, self.context_builder, self.task_key, target, batch_checks=self.batch_checks, cascade=self.cascade)
+
+    def run(self, targets: List[BatchTarget], on_result: Optional[Callable[[Dict[str, Any]], None]] = None, keep_results: bool = True) -> List[Dict[str, Any]]:
+        """
+        Checks every target. Results are passed to ``on_result`` in target order as soon as
+        they and all earlier ones are finished; with ``keep_results`` unset they are not
+        also collected, so a streaming writer keeps memory flat.
+        """
+        categories, _, _ = build_check_prompts(self.task_key)
+        questions = QA_PROMPTS[self.task_key]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(targets) if keep_results else []
+        # Bounds how many analysed targets may wait for the LLM at once.
+        slots = threading.BoundedSemaphore(self.workers * 2)
+        progress_stream = sys.stderr
+        finished: Dict[int, Dict[str, Any]] = {}
+        next_to_deliver = 0
+        deliver_lock = threading.Lock()
+
+        def deliver(index, entry):
+            nonlocal next_to_deliver
+            with deliver_lock:
+                finished[index] = entry
+                while next_to_deliver in finished:
+                    ready = finished.pop(next_to_deliver)
+                    if keep_results:
+                        results[next_to_deliver] = ready
+                    next_to_deliver += 1
+                    if on_result is not None:
+                        # A failing handler must not hold back the results after this one
+                        try:
+                            on_result(ready)
+                        except Exception as e:
+                            print(f"Error handling the result of {ready['name']}: {e}")
+
+        with tqdm(total=len(targets), desc="QA targets", unit="target", file=progress_stream, dynamic_ncols=True) as pbar:
+            def finish(index, target_context, fingerprint, future):
+                # Runs as a done-callback, where exceptions are swallowed: the slot and the
+                # target's place in the delivery order must be given up whatever happens
+                try:
+                    try:
+                        responses = future.result()
+                    except Exception as e:
+                        responses = [None] * len(categories)
+                        pbar.write(f"{target_context.name}: checks failed: {e}", file=progress_stream)
+                    entry = self._result_entry(target_context, categories, questions, responses)
+                    if self.verdict_store is not None and all(responses):
+                        try:
+                            self.verdict_store.set(f"{entry['file']}:{entry['name']}", self.task_key, fingerprint, entry["checks"])
+                        except Exception as e:
+                            pbar.write(f"{target_context.name}: verdicts not stored: {e}", file=progress_stream)
+                    deliver(index, entry)
+                except Exception as e:
+                    pbar.write(f"{target_context.name}: recording results failed: {e}", file=progress_stream)
+                    deliver(index, self._result_entry(target_context, categories, questions, [None] * len(categories), error=str(e)))
+                finally:
+                    slots.release()
+                    pbar.update(1)
+
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                if targets and self.code_analyser.use_index:
+                    try:
+                        with self.analysis_lock:
+                            self.code_analyser.refresh_project_index()
+                    except (sqlite3.Error, OSError) as e:
+                        pbar.write(f"Project index unavailable ({e}), callers will be found by a full scan.", file=progress_stream)
+                for index, target in enumerate(targets):
+                    slots.acquire()
+                    try:
+                        # Progress output stays off: worker threads are writing results meanwhile
+                        with self.analysis_lock:
+                            target_context = gather_target_context(self.code_analyser, self.context_builder, target.file_path, target.name, target.element,
+                                                                   refresh_index=False, static_checks=self.static_checks, quiet=True)
+                    except Exception as e:
+                        pbar.write(f"{target.name}: analysis failed: {e}", file=progress_stream)
+                        deliver(index, self._result_entry(TargetContext(target.file_path, target.name, target.element), categories, questions, [None] * len(categories), error=str(e)))
+                        slots.release()
+                        pbar.update(1)
+                        continue
+
+                    fingerprint = self._fingerprint(target_context) if self.verdict_store is not None else None
+                    if self.incremental:
+                        entry = self._result_entry(target_context, categories, questions, [None] * len(categories))
+                        stored_checks = self.verdict_store.get(f"{entry['file']}:{entry['name']}", self.task_key, fingerprint)
+                        if stored_checks is not None:
+                            entry["checks"] = stored_checks
+                            entry["reused"] = True
+                            deliver(index, entry)
+                            slots.release()
+                            pbar.update(1)
+                            continue
+
+                    future = executor.submit(self._check_target, target_context)
+                    future.add_done_callback(lambda f, i=index, t=target_context, fp=fingerprint: finish(i, t, fp, f))
+
+        return results
+
+    def _result_entry(self, target: TargetContext, categories: List[str], questions: Dict[str, str], responses: List[Optional[Dict[str, Any]]], error: Optional[str] = None) -> Dict[str, Any]:
+        checks = []
+        for category, response in zip(categories, responses):
+            checks.append({
+                "category": category,
+                "question": questions[category],
+                "pass": (response.get("pass") == "True") if response else None,
+                "justification": response.get("justification", "No justification provided.") if response else None,
+                "decided_by": response.get(DECIDED_BY_FIELD) if response else None,
+            })
+        return {
+            "file": os.path.relpath(os.path.abspath(target.file_path), self.code_analyser.project_root),
+            "name": target.name,
+            "type": target.element.type,
+            "lineno": target.element.lineno,
+            "code": target.qa_code,
+            "checks": checks,
+            "error": error,
+            "reused": False,
+        }
+
+    def summarise(self, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        return {
+            "tier": self.task_key,
+            "targets": len(results),
+            "checks_passed": sum(1 for result in results for check in result["checks"] if check["pass"] is True),
+            "checks_failed": sum(1 for result in results for check in result["checks"] if check["pass"] is False),
+            "checks_errored": sum(1 for result in results for check in result["checks"] if check["pass"] is None),
+            "targets_reused": sum(1 for result in results if result["reused"]),
+            "decided_by": dict(Counter(check.get("decided_by") for result in results for check in result["checks"] if check.get("decided_by"))),
+            "elapsed_seconds": round(elapsed, 3),
+            "targets_per_minute": round(len(results) / elapsed * 60, 2) if elapsed > 0 else None,
+            "cascade": self.cascade_summary(),
+        }
+
+    def cascade_summary(self) -> Optional[Dict[str, Any]]:
+        return self.cascade.summary(self.llm.model) if self.cascade is not None else None
+
+    def write_outputs(self, results: List[Dict[str, Any]], report_file: str, results_file: Optional[str], elapsed: float) -> Tuple[Dict[str, Any], str]:
+        """
+        Saves the paginated HTML report and the JSON and JSON lines results files; the
+        JSON file defaults to the report path with a .json extension. Returns the run
+        summary and the results file path.
+        """
+        writer = BatchReportWriter(report_file, self.task_key, results_file)
+        for result in results:
+            writer.add(result)
+        summary = writer.close(get_tracer().summary(), elapsed, cascade=self.cascade_summary())
+        return summary, writer.results_file
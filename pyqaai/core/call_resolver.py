@@ -0,0 +1,561 @@
+import ast
+import os
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from pyqaai.core.import_resolver import MAX_REEXPORT_DEPTH, StaticImportResolver
+from pyqaai.core.parse_cache import SCOPE_NODES, ParseCache, ParsedModule
+
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+MAX_MRO_DEPTH = 16
+
+RESOLVED = "resolved"
+UNKNOWN = "unknown"
+EXTERNAL = "external"
+
+
+class Symbol:
+    """
+    A module, class, function or method defined in a project file.
+    """
+    def __init__(self, kind: str, path: str, qualname: str = "", node: Optional[ast.AST] = None):
+        self.kind = kind
+        self.path = path
+        self.qualname = qualname
+        self.node = node
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.path, self.qualname)
+
+    @property
+    def name(self) -> str:
+        return self.qualname.split(".")[-1]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Symbol) and self.key == other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __repr__(self) -> str:
+        return f"Symbol({self.kind}, {self.path}, {self.qualname})"
+
+
+def _walk_scope(node: ast.AST) -> Iterator[ast.AST]:
+    # Every node of a function or class body, without descending into nested scopes.
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, SCOPE_NODES + (ast.Lambda,)):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+def _target_names(target: ast.AST) -> Iterator[str]:
+    if isinstance(target, ast.Name):
+        yield target.id
+    elif isinstance(target, (ast.Tuple, ast.List)):
+        for element in target.elts:
+            yield from _target_names(element)
+    elif isinstance(target, ast.Starred):
+        yield from _target_names(target.value)
+
+
+def _is_super_call(call: ast.Call) -> bool:
+    receiver = getattr(call.func, "value", None)
+    return isinstance(receiver, ast.Call) and isinstance(receiver.func, ast.Name) and receiver.func.id == "super"
+
+
+class CallResolver:
+    """
+    Links call sites to the definitions they call, using the static import resolver for
+    module-level names and import aliases, the enclosing class for ``self``/``cls`` and
+    ``super()`` receivers, base classes for inherited methods, and simple local types:
+    annotated parameters, ``x = SomeClass(...)`` assignments and ``self.attr = SomeClass(...)``
+    attributes. Calls whose receiver type cannot be inferred resolve as unknown.
+    """
+    def __init__(self, import_resolver: StaticImportResolver, parse_cache: Optional[ParseCache] = None):
+        self.import_resolver = import_resolver
+        self.parse_cache = parse_cache or import_resolver.parse_cache
+        self._function_scopes: Dict[Tuple[str, str, int, int], Tuple[Dict[str, Tuple[str, Symbol]], Set[str]]] = {}
+        self._mros: Dict[Tuple[str, str], List[Symbol]] = {}
+        self._attribute_types: Dict[Tuple[str, str], Dict[str, Symbol]] = {}
+        self._real_paths: Dict[str, str] = {}
+
+    def clear(self) -> None:
+        self._function_scopes.clear()
+        self._mros.clear()
+        self._attribute_types.clear()
+
+    def _module(self, path: str) -> Optional[ParsedModule]:
+        # Symbols compare by path, so every module is loaded under its real path.
+        real_path = self._real_paths.get(path)
+        if real_path is None:
+            real_path = self._real_paths[path] = os.path.realpath(path)
+        try:
+            return self.parse_cache.get(real_path)
+        except (SyntaxError, ValueError, OSError):
+            return None
+
+    def module_name(self, path: str) -> str:
+        """
+        Dotted module name of a project file, relative to the deepest search root containing it.
+        """
+        real_path = os.path.realpath(path)
+        roots = [root for root in self.import_resolver.search_roots if real_path.startswith(os.path.realpath(root) + os.sep)]
+        root = max(roots, key=len) if roots else os.path.dirname(real_path)
+        parts = os.path.relpath(os.path.splitext(real_path)[0], os.path.realpath(root)).split(os.sep)
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        return ".".join(parts)
+
+    # Symbols
+
+    def symbol_for_definition(self, path: str, node: ast.AST, module: ParsedModule) -> Symbol:
+        chain = module.scope_chains.get(id(node), ())
+        qualname = ".".join([scope.name for scope in chain] + [node.name])
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif chain and isinstance(chain[-1], ast.ClassDef):
+            kind = "method"
+        else:
+            kind = "function"
+        return Symbol(kind, path, qualname, node)
+
+    def symbol_for_qualname(self, path: str, qualname: str) -> Optional[Symbol]:
+        module = self._module(path)
+        if module is None:
+            return None
+        for name, node in reversed(module.definitions):
+            if name == qualname:
+                return self.symbol_for_definition(module.path, node, module)
+        return None
+
+    def owner_class(self, symbol: Symbol) -> Optional[Symbol]:
+        if symbol.kind != "method":
+            return None
+        module = self._module(symbol.path)
+        if module is None:
+            return None
+        chain = module.scope_chains.get(id(symbol.node), ())
+        return self.symbol_for_definition(symbol.path, chain[-1], module) if chain else None
+
+    def resolve_name(self, path: str, name: str, depth: int = 0) -> Optional[Symbol]:
+        """
+        The definition or module a module-level name refers to, following imports,
+        re-exports and star imports within the project.
+        """
+        module = self._module(path) if depth <= MAX_REEXPORT_DEPTH else None
+        if module is None:
+            return None
+        bindings, star_imports = module.bindings
+        node = bindings.get(name)
+
+        if isinstance(node, SCOPE_NODES):
+            return self.symbol_for_definition(module.path, node, module)
+
+        if isinstance(node, ast.alias):
+            statement = module.import_statements_by_alias[id(node)]
+            if isinstance(statement, ast.Import):
+                # ``import a.b`` binds ``a``; ``import a.b as c`` binds the submodule.
+                parts = node.name.split(".") if node.asname else node.name.split(".")[:1]
+                module_file = self.import_resolver.resolve_module(parts, 0, module.path)
+                return Symbol("module", module_file) if module_file else None
+
+            parts = statement.module.split(".") if statement.module else []
+            if parts or statement.level:
+                module_file = self.import_resolver.resolve_module(parts, statement.level, module.path)
+                if module_file is not None and module_file != module.path:
+                    symbol = self.resolve_name(module_file, node.name, depth + 1)
+                    if symbol is not None:
+                        return symbol
+            submodule_file = self.import_resolver.resolve_module(parts + [node.name], statement.level, module.path)
+            return Symbol("module", submodule_file) if submodule_file else None
+
+        if node is not None:
+            # Assigned at module level; the value is not tracked.
+            return None
+
+        for statement in star_imports:
+            parts = statement.module.split(".") if statement.module else []
+            module_file = self.import_resolver.resolve_module(parts, statement.level, module.path)
+            if module_file is not None and module_file != module.path:
+                symbol = self.resolve_name(module_file, name, depth + 1)
+                if symbol is not None:
+                    return symbol
+        return None
+
+    def resolve_attribute(self, symbol: Symbol, attribute: str) -> Optional[Symbol]:
+        if symbol.kind == "module":
+            resolved = self.resolve_name(symbol.path, attribute)
+            if resolved is None and os.path.basename(symbol.path) == "__init__.py":
+                submodule_file = self.import_resolver.resolve_module([attribute], 1, symbol.path)
+                return Symbol("module", submodule_file) if submodule_file else None
+            return resolved
+        if symbol.kind == "class":
+            return self.lookup_member(symbol, attribute)
+        return None
+
+    def resolve_expression(self, path: str, expression: ast.AST) -> Optional[Symbol]:
+        """
+        Statically resolves a module-level expression such as a base class or annotation.
+        """
+        if isinstance(expression, ast.Name):
+            return self.resolve_name(path, expression.id)
+        if isinstance(expression, ast.Attribute):
+            base = self.resolve_expression(path, expression.value)
+            return self.resolve_attribute(base, expression.attr) if base is not None else None
+        if isinstance(expression, ast.Subscript):
+            return self.resolve_expression(path, expression.value)
+        if isinstance(expression, ast.Constant) and isinstance(expression.value, str):
+            try:
+                return self.resolve_expression(path, ast.parse(expression.value, mode="eval").body)
+            except SyntaxError:
+                return None
+        return None
+
+    def _annotation_class(self, path: str, annotation: ast.AST) -> Optional[Symbol]:
+        # Optional[X] and X | None are treated as X.
+        if isinstance(annotation, ast.Subscript) and isinstance(annotation.value, (ast.Name, ast.Attribute)):
+            name = annotation.value.id if isinstance(annotation.value, ast.Name) else annotation.value.attr
+            if name == "Optional":
+                return self._annotation_class(path, annotation.slice)
+        if isinstance(annotation, ast.BinOp) and isinstance(annotation.op, ast.BitOr):
+            sides = [side for side in (annotation.left, annotation.right) if not (isinstance(side, ast.Constant) and side.value is None)]
+            return self._annotation_class(path, sides[0]) if len(sides) == 1 else None
+        symbol = self.resolve_expression(path, annotation)
+        return symbol if symbol is not None and symbol.kind == "class" else None
+
+    def _returned_class(self, symbol: Optional[Symbol]) -> Optional[Symbol]:
+        """
+        The class of instances produced by calling the symbol: the class itself, or the
+        annotated return type of a function.
+        """
+        if symbol is None:
+            return None
+        if symbol.kind == "class":
+            return symbol
+        if symbol.kind in ("function", "method") and symbol.node.returns is not None:
+            return self._annotation_class(symbol.path, symbol.node.returns)
+        return None
+
+    def _value_class(self, path: str, value: ast.AST, argument_types: Dict[str, Symbol]) -> Optional[Symbol]:
+        # Class of a statically resolvable value: a call, an annotated argument, or ``a or b``.
+        if isinstance(value, ast.Call):
+            return self._returned_class(self.resolve_expression(path, value.func))
+        if isinstance(value, ast.Name):
+            return argument_types.get(value.id)
+        if isinstance(value, ast.BoolOp):
+            return next((cls for cls in (self._value_class(path, operand, argument_types) for operand in value.values) if cls is not None), None)
+        return None
+
+    # Classes
+
+    def class_members(self, symbol: Symbol) -> Dict[str, ast.AST]:
+        members = {}
+        for node in symbol.node.body:
+            if isinstance(node, SCOPE_NODES):
+                members[node.name] = node
+        return members
+
+    def mro(self, symbol: Symbol, depth: int = 0) -> List[Symbol]:
+        """
+        Approximate method resolution order: the class, then its bases depth-first.
+        Bases outside the project are skipped.
+        """
+        if symbol.key in self._mros:
+            return self._mros[symbol.key]
+        result = [symbol]
+        # Guards against inheritance cycles while the bases are resolved.
+        self._mros[symbol.key] = result
+        if depth < MAX_MRO_DEPTH:
+            for base in symbol.node.bases:
+                base_symbol = self.resolve_expression(symbol.path, base)
+                if base_symbol is None or base_symbol.kind != "class":
+                    continue
+                for ancestor in self.mro(base_symbol, depth + 1):
+                    if ancestor not in result:
+                        result.append(ancestor)
+        return result
+
+    def lookup_member(self, symbol: Symbol, name: str, skip_first: bool = False) -> Optional[Symbol]:
+        for cls in self.mro(symbol)[1 if skip_first else 0:]:
+            node = self.class_members(cls).get(name)
+            if node is not None:
+                module = self._module(cls.path)
+                return self.symbol_for_definition(cls.path, node, module) if module is not None else None
+        return None
+
+    def instance_attribute_types(self, symbol: Symbol) -> Dict[str, Symbol]:
+        """
+        Types of instance attributes declared in the class body (``attr: SomeClass``) or
+        assigned in its methods (``self.attr = SomeClass(...)``), including inherited ones.
+        """
+        if symbol.key in self._attribute_types:
+            return self._attribute_types[symbol.key]
+        types: Dict[str, Symbol] = {}
+        self._attribute_types[symbol.key] = types
+
+        for cls in reversed(self.mro(symbol)):
+            for node in cls.node.body:
+                if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+                    annotated = self._annotation_class(cls.path, node.annotation)
+                    if annotated is not None:
+                        types[node.target.id] = annotated
+                elif isinstance(node, FUNCTION_NODES) and (node.args.posonlyargs or node.args.args):
+                    receiver = (node.args.posonlyargs + node.args.args)[0].arg
+                    argument_types = self._argument_types(cls.path, node)
+                    for statement in _walk_scope(node):
+                        targets, value, annotation = [], None, None
+                        if isinstance(statement, ast.Assign):
+                            targets, value = statement.targets, statement.value
+                        elif isinstance(statement, ast.AnnAssign):
+                            targets, value, annotation = [statement.target], statement.value, statement.annotation
+                        for target in targets:
+                            if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == receiver:
+                                assigned = self._annotation_class(cls.path, annotation) if annotation is not None else None
+                                if assigned is None and value is not None:
+                                    assigned = self._value_class(cls.path, value, argument_types)
+                                if assigned is not None:
+                                    types[target.attr] = assigned
+        return types
+
+    # Function scopes
+
+    def _argument_types(self, path: str, function: ast.AST) -> Dict[str, Symbol]:
+        arguments = function.args
+        types = {}
+        for argument in arguments.posonlyargs + arguments.args + arguments.kwonlyargs:
+            if argument.annotation is not None:
+                annotated = self._annotation_class(path, argument.annotation)
+                if annotated is not None:
+                    types[argument.arg] = annotated
+        return types
+
+    def _function_scope(self, module: ParsedModule, function: ast.AST) -> Tuple[Dict[str, Tuple[str, Symbol]], Set[str]]:
+        """
+        Inferred types of the function's local names, and every name it binds locally.
+        """
+        key = (module.path, module.content_hash, function.lineno, function.col_offset)
+        if key in self._function_scopes:
+            return self._function_scopes[key]
+
+        types: Dict[str, Tuple[str, Symbol]] = {}
+        bound: Set[str] = set()
+        conflicting: Set[str] = set()
+
+        def record(name, value):
+            if name in types and types[name] != value:
+                conflicting.add(name)
+            types[name] = value
+
+        arguments = function.args
+        positional = arguments.posonlyargs + arguments.args
+        every_argument = positional + arguments.kwonlyargs + [argument for argument in (arguments.vararg, arguments.kwarg) if argument]
+        bound.update(argument.arg for argument in every_argument)
+
+        chain = module.scope_chains.get(id(function), ())
+        decorators = {decorator.id for decorator in function.decorator_list if isinstance(decorator, ast.Name)}
+        if chain and isinstance(chain[-1], ast.ClassDef) and positional and "staticmethod" not in decorators:
+            owner = self.symbol_for_definition(module.path, chain[-1], module)
+            types[positional[0].arg] = ("class" if "classmethod" in decorators else "instance", owner)
+        argument_types = self._argument_types(module.path, function)
+        for name, annotated in argument_types.items():
+            types[name] = ("instance", annotated)
+
+        for node in _walk_scope(function):
+            if isinstance(node, ast.Assign):
+                names = [name for target in node.targets for name in _target_names(target)]
+                bound.update(names)
+                if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                    assigned = self._value_class(module.path, node.value, argument_types)
+                    if assigned is not None:
+                        record(node.targets[0].id, ("instance", assigned))
+                    else:
+                        conflicting.add(node.targets[0].id)
+                else:
+                    conflicting.update(names)
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+                bound.add(node.target.id)
+                annotated = self._annotation_class(module.path, node.annotation)
+                if annotated is not None:
+                    record(node.target.id, ("instance", annotated))
+            elif isinstance(node, (ast.AugAssign, ast.For, ast.AsyncFor, ast.comprehension)):
+                bound.update(_target_names(node.target))
+            elif isinstance(node, ast.NamedExpr):
+                bound.add(node.target.id)
+            elif isinstance(node, ast.withitem) and node.optional_vars is not None:
+                bound.update(_target_names(node.optional_vars))
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                bound.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+            elif isinstance(node, SCOPE_NODES):
+                bound.add(node.name)
+
+        for name in conflicting:
+            types.pop(name, None)
+        self._function_scopes[key] = (types, bound)
+        return types, bound
+
+    def infer(self, module: ParsedModule, expression: ast.AST, chain: Tuple[ast.AST, ...]) -> Optional[Tuple[str, Symbol]]:
+        """
+        The type of an expression as ("instance" | "class" | "module", symbol), or None.
+        """
+        if isinstance(expression, ast.Name):
+            for scope in reversed(chain):
+                if isinstance(scope, FUNCTION_NODES):
+                    types, bound = self._function_scope(module, scope)
+                    if expression.id in types:
+                        return types[expression.id]
+                    if expression.id in bound:
+                        return None
+            symbol = self.resolve_name(module.path, expression.id)
+            if symbol is not None and symbol.kind in ("class", "module"):
+                return (symbol.kind, symbol)
+            return None
+
+        if isinstance(expression, ast.Attribute):
+            base = self.infer(module, expression.value, chain)
+            if base is None:
+                return None
+            kind, symbol = base
+            if kind == "module":
+                resolved = self.resolve_attribute(symbol, expression.attr)
+                return (resolved.kind, resolved) if resolved is not None and resolved.kind in ("class", "module") else None
+            attribute_type = self.instance_attribute_types(symbol).get(expression.attr)
+            if attribute_type is not None:
+                return ("instance", attribute_type)
+            member = self.lookup_member(symbol, expression.attr)
+            return ("class", member) if member is not None and member.kind == "class" else None
+
+        if isinstance(expression, ast.Call):
+            status, symbol = self.resolve_call(module, expression, chain)
+            returned = self._returned_class(symbol) if status == RESOLVED else None
+            if returned is not None:
+                return ("instance", returned)
+        return None
+
+    def resolve_call(self, module: ParsedModule, call: ast.Call, chain: Optional[Tuple[ast.AST, ...]] = None) -> Tuple[str, Optional[Symbol]]:
+        """
+        Resolves a call to (RESOLVED, symbol), (UNKNOWN, None) when the callee could be a
+        project definition but its receiver type is not known, or (EXTERNAL, None) for
+        builtins and names bound outside the project.
+        """
+        if chain is None:
+            chain = module.scope_chains.get(id(call), ())
+        func = call.func
+
+        if isinstance(func, ast.Name):
+            for scope in reversed(chain):
+                if isinstance(scope, FUNCTION_NODES):
+                    types, bound = self._function_scope(module, scope)
+                    local_type = types.get(func.id)
+                    if local_type is not None and local_type[0] == "class":
+                        return RESOLVED, local_type[1]
+                    if func.id in bound:
+                        return UNKNOWN, None
+            symbol = self.resolve_name(module.path, func.id)
+            if symbol is not None and symbol.kind != "module":
+                return RESOLVED, symbol
+            binding = module.bindings[0].get(func.id)
+            return (UNKNOWN, None) if isinstance(binding, (ast.Assign, ast.AnnAssign)) else (EXTERNAL, None)
+
+        if isinstance(func, ast.Attribute):
+            receiver = func.value
+            if _is_super_call(call):
+                owner = next((scope for scope in reversed(chain) if isinstance(scope, ast.ClassDef)), None)
+                if owner is not None:
+                    member = self.lookup_member(self.symbol_for_definition(module.path, owner, module), func.attr, skip_first=True)
+                    if member is not None:
+                        return RESOLVED, member
+                return UNKNOWN, None
+
+            base = self.infer(module, receiver, chain)
+            if base is None:
+                return UNKNOWN, None
+            kind, symbol = base
+            if kind == "module":
+                resolved = self.resolve_attribute(symbol, func.attr)
+                return (RESOLVED, resolved) if resolved is not None and resolved.kind != "module" else (EXTERNAL, None)
+            member = self.lookup_member(symbol, func.attr)
+            return (RESOLVED, member) if member is not None else (UNKNOWN, None)
+
+        return UNKNOWN, None
+
+    # Callers and callees
+
+    def _is_call_to(self, call: ast.Call, symbol: Symbol, target: Symbol) -> bool:
+        if symbol == target:
+            return True
+        if target.kind == "method" and target.name == "__init__" and symbol.kind == "class":
+            return self.lookup_member(symbol, "__init__") == target
+        if target.kind == "method" and symbol.kind == "method" and symbol.name == target.name and not _is_super_call(call):
+            # A call to a base class method may dispatch to the target's override.
+            target_class, symbol_class = self.owner_class(target), self.owner_class(symbol)
+            return target_class is not None and symbol_class is not None and symbol_class in self.mro(target_class)
+        return False
+
+    def call_name(self, target: Symbol) -> str:
+        """
+        The name calls to the target are made by; constructors are called by class name.
+        """
+        if target.kind == "method" and target.name == "__init__":
+            owner = self.owner_class(target)
+            if owner is not None:
+                return owner.name
+        return target.name
+
+    def find_callers(self, target: Symbol, candidate_paths: List[str], name_is_unique: bool) -> List[Tuple[str, ast.AST]]:
+        """
+        The (path, scope) of every function or class in ``candidate_paths`` that calls the
+        target. Calls with an unknown receiver only count when no other definition shares
+        the target's name.
+        """
+        name = self.call_name(target)
+        callers = []
+        for path in candidate_paths:
+            module = self._module(path)
+            if module is None:
+                continue
+            seen = set()
+            for call in module.calls.get(name, []):
+                chain = module.scope_chains.get(id(call), ())
+                if not chain or id(chain[-1]) in seen:
+                    continue
+                status, symbol = self.resolve_call(module, call, chain)
+                if (status == RESOLVED and self._is_call_to(call, symbol, target)) or (status == UNKNOWN and name_is_unique):
+                    seen.add(id(chain[-1]))
+                    callers.append((module.path, chain[-1]))
+        return callers
+
+    def find_callees(self, target: Symbol) -> Dict[str, str]:
+        """
+        Source of each project definition the target calls. Definitions in the target's
+        file that are not methods keep their plain name; others are keyed by module and
+        qualified name.
+        """
+        module = self._module(target.path)
+        if module is None:
+            return {}
+
+        callees: Dict[str, str] = {}
+        for node in ast.walk(target.node):
+            if not isinstance(node, ast.Call):
+                continue
+            status, symbol = self.resolve_call(module, node)
+            if status == UNKNOWN and isinstance(node.func, ast.Attribute):
+                # Unknown receivers fall back to a function of that name, if unique in the file.
+                candidates = module.functions_by_name.get(node.func.attr, [])
+                if len(candidates) == 1:
+                    status, symbol = RESOLVED, self.symbol_for_definition(module.path, candidates[0], module)
+            if status != RESOLVED or symbol.kind == "module" or symbol == target:
+                continue
+
+            symbol_module = self._module(symbol.path)
+            if symbol_module is None:
+                continue
+            if symbol.path == module.path and symbol.kind == "function":
+                name = symbol.qualname
+            else:
+                name = f"{self.module_name(symbol.path)}.{symbol.qualname}"
+            callees[name] = ast.get_source_segment(symbol_module.source, symbol.node)
+        return callees
@@ -0,0 +1,132 @@
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pyqaai.core.instrumentation import Tracer, get_tracer
+from pyqaai.core.llm import LLM
+
+DEFAULT_CASCADE_TIERS = ("Tier 2", "Tier 3")
+DEFAULT_MIN_CONFIDENCE = 0.8
+# Field added to each response naming the model whose verdict was kept.
+DECIDED_BY_FIELD = "decided_by"
+CONFIDENCE_FIELD = "confidence"
+
+
+def parse_confidence(value: Any) -> Optional[float]:
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return None
+    return confidence if 0.0 <= confidence <= 1.0 else None
+
+
+class ModelCascade:
+    """
+    Screens the checks of the configured tiers with a cheaper model first. A screening
+    verdict is kept when it passes with at least ``min_confidence``; failing, low
+    confidence and unanswered checks are escalated to the main model. Counts of screened,
+    accepted and escalated checks are kept for the run summary.
+    """
+    def __init__(self, screen_llm: LLM, tiers: Iterable[str] = DEFAULT_CASCADE_TIERS, min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.screen_llm = screen_llm
+        self.tiers = set(tiers)
+        self.min_confidence = min_confidence
+        self.screened = 0
+        self.accepted = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.screened = 0
+            self.accepted = 0
+
+    @property
+    def model(self) -> str:
+        return self.screen_llm.model
+
+    @property
+    def key(self) -> str:
+        """
+        Identifies the cascade settings in verdict fingerprints.
+        """
+        return f"{self.model}@{self.min_confidence}"
+
+    def applies(self, task_key: str) -> bool:
+        return task_key in self.tiers
+
+    @staticmethod
+    def screen_structure(return_structure: Dict[str, str]) -> Dict[str, str]:
+        structure = dict(return_structure)
+        structure[CONFIDENCE_FIELD] = "Number from 0.0 to 1.0: how certain you are of the 'pass' verdict."
+        return structure
+
+    def accepts(self, response: Optional[Dict[str, Any]]) -> bool:
+        if not response or response.get("pass") != "True":
+            return False
+        confidence = parse_confidence(response.get(CONFIDENCE_FIELD))
+        return confidence is not None and confidence >= self.min_confidence
+
+    def screen(self,
+               system_prompt: str,
+               check_prompts: List[str],
+               code_context: Dict[str, Any],
+               on_accept: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Runs the screening prompts and returns, per check, the accepted response or None
+        for checks that must be escalated. ``on_accept`` is called as verdicts are kept.
+        """
+        accepted: List[Optional[Dict[str, Any]]] = [None] * len(check_prompts)
+
+        def on_response(index, response):
+            if self.accepts(response):
+                accepted[index] = dict(response, **{DECIDED_BY_FIELD: self.model})
+                if on_accept is not None:
+                    on_accept(index, accepted[index])
+
+        self.screen_llm.generate_responses(system_prompt, check_prompts, on_response=on_response, **code_context)
+        with self._lock:
+            self.screened += len(check_prompts)
+            self.accepted += sum(1 for response in accepted if response is not None)
+        return accepted
+
+    def summary(self, main_model: str, tracer: Optional[Tracer] = None) -> Dict[str, Any]:
+        """
+        Checks decided at each stage and the estimated main-model work avoided. Each
+        accepted check saves one main-model call, estimated from the mean prompt tokens of
+        the screening calls and the mean duration and completion tokens of the main-model
+        calls of this run (None if there were none).
+        """
+        tracer = tracer or get_tracer()
+        calls = [span for span in tracer.find("llm.generate_response") if not span.attributes.get("cache_hit")]
+        screen_calls = [span for span in calls if span.attributes.get("model") == self.model]
+        main_calls = [span for span in calls if span.attributes.get("model") == main_model]
+
+        def mean(spans, attribute=None):
+            values = [span.duration if attribute is None else span.attributes.get(attribute) for span in spans]
+            values = [value for value in values if value is not None]
+            return sum(values) / len(values) if values else None
+
+        screen_prompt_tokens = mean(screen_calls, "prompt_tokens")
+        main_seconds = mean(main_calls)
+        main_completion_tokens = mean(main_calls, "completion_tokens")
+        return {
+            "screen_model": self.model,
+            "main_model": main_model,
+            "min_confidence": self.min_confidence,
+            "checks_screened": self.screened,
+            "decided_by_screen": self.accepted,
+            "escalated": self.screened - self.accepted,
+            "screen_seconds": round(sum(span.duration for span in screen_calls), 3),
+            "main_calls_avoided": self.accepted,
+            "prompt_tokens_avoided": round(self.accepted * screen_prompt_tokens) if screen_prompt_tokens is not None else None,
+            "completion_tokens_avoided": round(self.accepted * main_completion_tokens) if main_completion_tokens is not None else None,
+            "main_seconds_avoided": round(self.accepted * main_seconds, 3) if main_seconds is not None else None,
+        }
+
+    def format_summary(self, main_model: str) -> str:
+        summary = self.summary(main_model)
+        line = (f"Model cascade: {summary['decided_by_screen']} of {summary['checks_screened']} screened checks decided by "
+                f"{summary['screen_model']}, {summary['escalated']} escalated to {main_model}.")
+        if summary["main_seconds_avoided"] is not None:
+            line += (f" Estimated {summary['main_seconds_avoided']:.1f}s of {main_model} time and "
+                     f"{summary['prompt_tokens_avoided'] or 0} prompt tokens avoided.")
+        return line
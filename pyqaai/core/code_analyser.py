@@ -1,38 +1,17 @@
 import ast
-import importlib
-import inspect
 import os
 from tqdm import tqdm
 from typing import Dict, List, Tuple
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import sys
+import sqlite3
 
-from pyqaai.models.models import CodeElement
-
-class SuppressOutput:
-    def __enter__(self):
-        self.stdout = sys.stdout
-        self.stderr = sys.stderr
-        sys.stdout = open(os.devnull, 'w')
-        sys.stderr = open(os.devnull, 'w')
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        sys.stdout.close()
-        sys.stderr.close()
-        sys.stdout = self.stdout
-        sys.stderr = self.stderr
-
-class FunctionCallVisitor(ast.NodeVisitor):
-    def __init__(self, function_name: str):
-        self.function_name = function_name
-        self.calls = []
-
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name) and node.func.id == self.function_name:
-            self.calls.append(node)
-        elif isinstance(node.func, ast.Attribute) and node.func.attr == self.function_name:
-            self.calls.append(node)
-        self.generic_visit(node)
+from pyqaai.models.models import CodeElement, get_source_files
+from pyqaai.core.call_resolver import CallResolver
+from pyqaai.core.file_discovery import FileDiscovery
+from pyqaai.core.import_resolver import StaticImportResolver
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.parse_cache import get_parse_cache
+from pyqaai.core.project_index import ProjectIndex, read_source_file, read_source_span
+from pyqaai.core.worker_pool import get_worker_pool
 
 class CalleeVisitor(ast.NodeVisitor):
     def __init__(self):
@@ -46,11 +25,35 @@ class CalleeVisitor(ast.NodeVisitor):
         self.generic_visit(node)
 
 
+def find_caller_spans(file_path: str, function_name: str) -> Tuple[str, List[Tuple[str, str, int, int, int, int]]]:
+    """
+    Worker for scan_callers_of_function: the (kind, name, lineno, col_offset, end_lineno,
+    end_col_offset) span of each scope in the file that calls ``function_name``.
+    """
+    try:
+        module = get_parse_cache().get(file_path)
+    except Exception:
+        return file_path, []
+
+    spans = []
+    seen = set()
+    for call in module.calls.get(function_name, []):
+        node = module.enclosing_scope(call)
+        if node is not None and id(node) not in seen:
+            seen.add(id(node))
+            spans.append((node.__class__.__name__, node.name, node.lineno, node.col_offset, node.end_lineno, node.end_col_offset))
+    return file_path, spans
+
 class CodeAnalyser:
 
-    def __init__(self):
-        self.project_root = self.find_project_root()
-        sys.path.append(self.project_root)
+    def __init__(self, use_index: bool = True, use_git_ls_files: bool = False):
+        with get_tracer().span("find_project_root"):
+            self.project_root = self.find_project_root()
+        self.use_index = use_index
+        self.file_discovery = FileDiscovery.for_project(self.project_root, use_git=use_git_ls_files)
+        self._project_index = None
+        self.import_resolver = StaticImportResolver(self.project_root)
+        self.call_resolver = CallResolver(self.import_resolver)
 
     @staticmethod
     def find_project_root(starting_directory: str = None) -> str:
@@ -79,102 +82,39 @@ class CodeAnalyser:
 
     @staticmethod
     def extract_functions_and_classes_from_module(file_path: str) -> Dict[str, CodeElement]:
-        with open(file_path, 'r') as file:
-            source = file.read()
-            tree = ast.parse(source)
-        
+        module = get_parse_cache().get(file_path)
+        # Elements keep byte offsets into the file; their code is read from it when needed
+        file_id = get_source_files().register(module.path)
+
         functions_classes = {}
-        
-        def visit_node(node, parent_class=None):
-            if isinstance(node, ast.ClassDef):
-                name = node.name
-                element_type = 'Class'
-                code = ast.get_source_segment(source, node)
-                lineno = node.lineno
-                functions_classes[name] = CodeElement(element_type=element_type, name=name, code=code, lineno=lineno)
-                
-                # Visit all child nodes with this class as the parent
-                for child in ast.iter_child_nodes(node):
-                    visit_node(child, parent_class=name)
-            
-            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                element_type = 'Function'
-                if parent_class:
-                    name = f"{parent_class}.{node.name}"
-                else:
-                    name = node.name
-                code = ast.get_source_segment(source, node)
-                lineno = node.lineno
-                functions_classes[name] = CodeElement(element_type=element_type, name=name, code=code, lineno=lineno)
-            
-            else:
-                # For other node types, continue visiting child nodes
-                for child in ast.iter_child_nodes(node):
-                    visit_node(child, parent_class=parent_class)
-
-        # Start visiting from the root of the AST
-        visit_node(tree)
+        for name, node in module.definitions:
+            element_type = 'Class' if isinstance(node, ast.ClassDef) else 'Function'
+            if not module.exact_bytes:
+                # Offsets into the decoded text do not match the file (other encodings, BOMs,
+                # invalid UTF-8), so the element keeps its text instead
+                functions_classes[name] = CodeElement(element_type=element_type, name=name, code=ast.get_source_segment(module.source, node),
+                                                      lineno=node.lineno, end_lineno=node.end_lineno)
+                continue
+            start, end = module.byte_span(node)
+            functions_classes[name] = CodeElement(element_type=element_type, name=name, lineno=node.lineno, end_lineno=node.end_lineno,
+                                                  file_id=file_id, start=start, end=end)
 
         return functions_classes
 
     @staticmethod
     def get_imported_modules(file_path: str) -> Tuple[Dict[str, str], List[str]]:
-        with open(file_path, 'r') as file:
-            source = file.read()
-            tree = ast.parse(source)
+        imports, import_statements = get_parse_cache().get(file_path).imports
+        return dict(imports), list(import_statements)
 
-        imports = {}
-        import_statements = set()
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                statement = ast.get_source_segment(source, node)
-                import_statements.add(statement)
-                
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports[alias.asname or alias.name] = alias.name
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module
-                    for alias in node.names:
-                        imported_name = alias.name
-                        full_import_name = f"{module}.{imported_name}"
-                        imports[alias.asname or imported_name] = full_import_name
-
-        return imports, list(import_statements)
-
-    def is_project_module(self, module) -> bool:
-        module_file = getattr(module, '__file__', None)
-        if module_file is not None:
-            module_file = os.path.realpath(module_file)
-            project_root_abs = os.path.realpath(self.project_root)
-            return module_file.startswith(project_root_abs + os.sep)
-        return False
-
-    def load_module_from_import(self, import_path: str) -> str:
-        try:
-            module_path, _, attr_name = import_path.rpartition('.')
-            module = importlib.import_module(module_path)
-            
-            if not self.is_project_module(module):
-                return None
-            
-            if hasattr(module, attr_name):
-                attr = getattr(module, attr_name)
-                return inspect.getsource(attr)
-            else:
-                return None
-            
-        except (ImportError, Exception):
-            return None
-
-    def extract_local_imported_functions(self, imported_modules: Dict[str, str]) -> Dict[str, str]:
+    def load_module_from_import(self, import_path: str, importer_path: str = None) -> str:
+        return self.import_resolver.resolve_definition(import_path, importer_path)
+
+    def extract_local_imported_functions(self, imported_modules: Dict[str, str], importer_path: str = None, quiet: bool = False) -> Dict[str, str]:
         local_functions_classes = {}
 
-        with tqdm(total=len(imported_modules), desc="Processing imports", leave=True) as pbar:
+        with tqdm(total=len(imported_modules), desc="Processing imports", leave=True, disable=quiet) as pbar:
             for imported_name, full_import_name in imported_modules.items():
-                with SuppressOutput():
-                    definition_code = self.load_module_from_import(full_import_name)
+                definition_code = self.load_module_from_import(full_import_name, importer_path)
                 if definition_code:
                     local_functions_classes[full_import_name] = definition_code
                 pbar.update(1)
@@ -183,74 +123,110 @@ class CodeAnalyser:
 
     @staticmethod
     def find_python_files_in_directory(directory: str) -> List[str]:
-        python_files = []
-        for root, _, files in os.walk(directory):
-            for file in files:
-                if file.endswith('.py'):
-                    python_files.append(os.path.join(root, file))
+        return FileDiscovery(directory).discover()
+
+    def find_project_python_files(self) -> List[str]:
+        """
+        Python files of the project, using the cached, ignore-aware file list.
+        """
+        with get_tracer().span("discover_files") as span:
+            python_files = self.file_discovery.discover()
+            span.set(files=len(python_files))
         return python_files
 
-    @staticmethod
-    def Analyse_file(file_path: str, function_name: str) -> Tuple[str, Dict[str, str]]:
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
-                with SuppressOutput():
-                    tree = ast.parse(content, filename=file_path)
-            
-            visitor = FunctionCallVisitor(function_name)
-            visitor.visit(tree)
-            
-            callers = {}
-            for call in visitor.calls:
-                for node in ast.walk(tree):
-                    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and call in ast.walk(node):
-                        caller_name = f"{node.__class__.__name__}:{node.name}"
-                        caller_code = ast.get_source_segment(content, node)
-                        callers[caller_name] = caller_code
-                        break
-            
-            return file_path, callers
-        except Exception:
-            return file_path, {} 
-
-    def find_callers_of_function(self, selected_function: str) -> Dict[str, str]:
-        python_files = [f for f in self.find_python_files_in_directory(self.project_root) if os.path.isfile(f)]
+    def get_project_index(self) -> ProjectIndex:
+        if self._project_index is None:
+            self._project_index = ProjectIndex(self.project_root)
+        return self._project_index
+
+    def refresh_project_index(self, quiet: bool = False) -> Tuple[int, int]:
+        reindexed, removed = self.get_project_index().update(self.find_project_python_files(), show_progress=not quiet)
+        if reindexed or removed:
+            self.call_resolver.clear()
+        return reindexed, removed
+
+    def find_callers_of_function(self, selected_function: str, refresh_index: bool = True,
+                                 target_path: str = None, target_qualname: str = None, quiet: bool = False) -> Dict[str, str]:
+        """
+        Callers of a function or class by name. With ``target_path`` and ``target_qualname``
+        the call sites are resolved and only those that call that definition are kept.
+        ``quiet`` turns off progress output, for callers running alongside other threads.
+        """
+        if not quiet:
+            print(f"Searching for callers of the function '{selected_function}'")
+
+        if self.use_index:
+            try:
+                index = self.get_project_index()
+                if refresh_index:
+                    reindexed, removed = self.refresh_project_index(quiet=quiet)
+                    if not quiet:
+                        print(f"Project index updated: {reindexed} files re-indexed, {removed} removed.")
+                target = self.call_resolver.symbol_for_qualname(target_path, target_qualname) if target_path and target_qualname else None
+                if target is not None:
+                    caller_methods = self.resolve_callers(index, target)
+                else:
+                    caller_methods = index.find_callers(selected_function)
+                if not quiet:
+                    print(f"Search complete. Total callers found: {len(caller_methods)}")
+                return caller_methods
+            except (sqlite3.Error, OSError) as e:
+                print(f"Project index unavailable ({e}), falling back to a full scan.")
+
+        caller_methods = self.scan_callers_of_function(self.find_project_python_files(), selected_function, quiet=quiet)
+        if not quiet:
+            print(f"Search complete. Total callers found: {len(caller_methods)}")
+        return caller_methods
+
+    def resolve_callers(self, index: ProjectIndex, target) -> Dict[str, str]:
+        call_name = self.call_resolver.call_name(target)
+        candidate_paths = sorted({row[0] for row in index.find_call_sites(call_name)})
+        # An unresolved receiver is only attributed to the target when nothing else shares its name.
+        name_is_unique = len(index.find_definitions(call_name)) <= 1
+
         caller_methods = {}
+        for path, node in self.call_resolver.find_callers(target, candidate_paths, name_is_unique):
+            source = get_parse_cache().get(path).source
+            caller_name = f"{os.path.relpath(path, self.project_root)}:{node.__class__.__name__}:{node.name}"
+            caller_methods[caller_name] = ast.get_source_segment(source, node)
+        return caller_methods
 
-        print(f"Searching for callers of the function '{selected_function}'")
-        # print(f"Total Python files to process: {len(python_files)}")
-
-        with ProcessPoolExecutor() as executor:
-            futures = [executor.submit(self.Analyse_file, file, selected_function) for file in python_files]
-            
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Analysing files"):
-                file_path, result = future.result()
-                if isinstance(result, dict):
-                    if result:
-                        for caller_name, caller_code in result.items():
-                            full_caller_name = f"{os.path.relpath(file_path, self.project_root)}:{caller_name}"
-                            caller_methods[full_caller_name] = caller_code
-                else:
-                    print(result)
+    def scan_callers_of_function(self, python_files: List[str], selected_function: str, quiet: bool = False) -> Dict[str, str]:
+        caller_methods = {}
+
+        # Workers return compact caller spans; only files with callers are read here, as plain text
+        # rather than through the parse cache, so the parent does not parse them again.
+        with tqdm(total=len(python_files), desc="Analysing files", disable=quiet) as pbar:
+            for results in get_worker_pool().map_files(find_caller_spans, python_files, selected_function):
+                for file_path, spans in results:
+                    source = read_source_file(file_path) if spans else None
+                    if source is not None:
+                        for kind, name, lineno, col_offset, end_lineno, end_col_offset in spans:
+                            full_caller_name = f"{os.path.relpath(file_path, self.project_root)}:{kind}:{name}"
+                            caller_methods[full_caller_name] = read_source_span(source, lineno, col_offset, end_lineno, end_col_offset)
+                pbar.update(len(results))
 
-        print(f"Search complete. Total callers found: {len(caller_methods)}")
         return caller_methods
 
-    def extract_callee_functions(self, file_path: str, selected_function: str) -> Dict[str, str]:
-        with open(file_path, 'r') as file:
-            content = file.read()
-            tree = ast.parse(content)
+    def extract_callee_functions(self, file_path: str, selected_function: str, qualname: str = None) -> Dict[str, str]:
+        """
+        Source of the functions called by ``selected_function``. With its qualified name the
+        calls are resolved, which also finds methods and functions in other modules.
+        """
+        if qualname:
+            target = self.call_resolver.symbol_for_qualname(file_path, qualname)
+            if target is not None:
+                return self.call_resolver.find_callees(target)
+
+        module = get_parse_cache().get(file_path)
 
         callee_visitor = CalleeVisitor()
 
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == selected_function:
-                callee_visitor.visit(node)
+        for node in module.functions_by_name.get(selected_function, []):
+            callee_visitor.visit(node)
 
-        callees = {callee: ast.get_source_segment(content, node) 
-                   for node in ast.walk(tree) 
-                   for callee in callee_visitor.callees 
-                   if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == callee}
+        callees = {callee: ast.get_source_segment(module.source, module.functions_by_name[callee][-1])
+                   for callee in callee_visitor.callees
+                   if callee in module.functions_by_name}
 
         return callees
@@ -4,8 +4,6 @@ from typing import Optional, Tuple, Dict
 current_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 config_file_path = os.path.join(current_directory, 'config.json')
 
-from pyqaai.core.llm import LLM
-
 def load_config() -> Dict[str, str]:
     try:
         # Check if config file exists
@@ -43,6 +41,9 @@ def validate_openai_credentials(api_key: str, organization: Optional[str] = None
             print("API key is required.")
             return False
 
+        # Imported here so loading the config does not import the OpenAI client
+        from pyqaai.core.llm import LLM
+
         # Use the existing LLM object to generate a test response to validate credentials
         llm = LLM(api_key=api_key, organisation=organization)
         response: Dict[str, str] = llm.generate_response(
@@ -66,14 +67,19 @@ def validate_openai_credentials(api_key: str, organization: Optional[str] = None
         return False
 
 
-def check_and_set_openai_credentials() -> Tuple[str, Optional[str]]:
+def check_and_set_openai_credentials(validate: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Returns the OpenAI credentials from the config file, prompting for them if missing.
+    The credentials are only checked against the API, which costs a full LLM round trip,
+    when ``validate`` is set; otherwise an invalid key surfaces on the first request.
+    """
     config: Dict[str, str] = load_config()
 
     # Check if OPENAI_API_KEY exists
     openai_api_key: str = config.get('OPENAI_API_KEY')
     openai_organization: Optional[str] = config.get('OPENAI_ORGANIZATION')
 
-    if not openai_api_key or not validate_openai_credentials(openai_api_key, openai_organization):
+    if not openai_api_key or (validate and not validate_openai_credentials(openai_api_key, openai_organization)):
         print("The provided OPENAI_API_KEY is not valid or not found.")
         
         reenter_choice: str = input("Would you like to re-enter your API key and organization ID? (yes/no): ").strip().lower()
@@ -85,10 +91,10 @@ def check_and_set_openai_credentials() -> Tuple[str, Optional[str]]:
             openai_organization = input("Please enter your OPENAI_ORGANIZATION (if applicable): ").strip() or None
 
             # Validate the new credentials
-            if validate_openai_credentials(openai_api_key, openai_organization):
+            if not validate or validate_openai_credentials(openai_api_key, openai_organization):
                 config['OPENAI_API_KEY'] = openai_api_key
                 config['OPENAI_ORGANIZATION'] = openai_organization
-                save_config(config)
+                save_config(config, config_file_path)
                 print("The API key and organization ID have been saved to the config file.")
             else:
                 print("Invalid credentials entered. Please check your API key and organization ID.")
@@ -96,4 +102,3 @@ def check_and_set_openai_credentials() -> Tuple[str, Optional[str]]:
             print("Continuing with existing configuration, but the credentials may not be valid.")
 
     return openai_api_key, openai_organization
-
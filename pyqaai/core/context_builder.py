@@ -0,0 +1,138 @@
+import ast
+import os
+import textwrap
+from typing import Dict, List, Optional, Tuple
+
+from pyqaai.core.tokenizer import count_tokens
+
+DEFAULT_CONTEXT_TOKEN_BUDGET = 24000
+
+# Lower ranks are included first.
+SECTION_RANKS = {
+    "invoked_functions": 0,
+    "local_imported_functions_classes": 1,
+    "caller_methods": 2,
+}
+
+
+class ContextItem:
+    def __init__(self, section: str, name: str, code: str, proximity: int = 0):
+        self.section = section
+        self.name = name
+        self.code = code
+        self.proximity = proximity
+        self.tokens = 0
+        self.status = "dropped"
+
+    def sort_key(self) -> Tuple[int, int, int]:
+        return (SECTION_RANKS[self.section], -self.proximity, self.tokens)
+
+
+class AssembledContext:
+    """
+    The context sections that fit in the token budget, plus a record of what was
+    included in full, reduced to signatures, or dropped.
+    """
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+        self.tokens_used = 0
+        self.invoked_functions: Dict[str, str] = {}
+        self.local_imported_functions_classes: Dict[str, str] = {}
+        self.caller_methods: Dict[str, str] = {}
+        self.items: List[ContextItem] = []
+
+    def section(self, name: str) -> Dict[str, str]:
+        return getattr(self, name)
+
+    def items_with_status(self, status: str) -> List[ContextItem]:
+        return [item for item in self.items if item.status == status]
+
+
+def summarise_definition(code: str) -> str:
+    """
+    Reduces a function or class to its signature(s) and docstring. Classes keep the
+    signatures of their methods. Falls back to the first line if the code does not parse.
+    """
+    try:
+        tree = ast.parse(textwrap.dedent(code))
+    except SyntaxError:
+        return code.splitlines()[0] if code else ""
+
+    def stub(node):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = []
+            docstring = ast.get_docstring(node, clean=False)
+            if docstring is not None:
+                body.append(ast.Expr(ast.Constant(docstring)))
+            if isinstance(node, ast.ClassDef):
+                body.extend(stub(child) for child in node.body if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)))
+            body.append(ast.Expr(ast.Constant(Ellipsis)))
+            node.body = body
+        return node
+
+    tree.body = [stub(node) for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))]
+    return ast.unparse(tree)
+
+
+def path_proximity(target_path: str, other_path: str) -> int:
+    """
+    Number of leading path components two project-relative paths share; a caller
+    in the same file as the target scores highest.
+    """
+    if os.path.normpath(target_path) == os.path.normpath(other_path):
+        return 1000
+    target_parts = os.path.normpath(target_path).split(os.sep)[:-1]
+    other_parts = os.path.normpath(other_path).split(os.sep)[:-1]
+    shared = 0
+    for target_part, other_part in zip(target_parts, other_parts):
+        if target_part != other_part:
+            break
+        shared += 1
+    return shared
+
+
+class ContextBuilder:
+    """
+    Ranks the context gathered for a target and fills a token budget with it: direct
+    callees first, then locally imported definitions, then direct callers ordered by
+    file proximity to the target. Within a section smaller items come first. Items that
+    do not fit in full are reduced to their signatures, and dropped if even that does
+    not fit.
+    """
+    def __init__(self, token_budget: int = DEFAULT_CONTEXT_TOKEN_BUDGET, model: str = "gpt-4o"):
+        self.token_budget = token_budget
+        self.model = model
+
+    def _rank(self, target_path: str, invoked_functions: Dict[str, str], local_imported_functions_classes: Dict[str, str], caller_methods: Dict[str, str]) -> List[ContextItem]:
+        items = [ContextItem("invoked_functions", name, code) for name, code in invoked_functions.items()]
+        items += [ContextItem("local_imported_functions_classes", name, code) for name, code in local_imported_functions_classes.items()]
+        for name, code in caller_methods.items():
+            # Caller names look like "<relative path>:<node type>:<name>".
+            caller_path = name.split(":", 1)[0]
+            items.append(ContextItem("caller_methods", name, code, proximity=path_proximity(target_path, caller_path)))
+
+        for item in items:
+            item.tokens = count_tokens(item.code or "", self.model)
+        return sorted(items, key=ContextItem.sort_key)
+
+    def build(self, target_path: str, invoked_functions: Dict[str, str], local_imported_functions_classes: Dict[str, str], caller_methods: Dict[str, str]) -> AssembledContext:
+        assembled = AssembledContext(self.token_budget)
+        assembled.items = self._rank(target_path, invoked_functions, local_imported_functions_classes, caller_methods)
+
+        for item in assembled.items:
+            remaining = self.token_budget - assembled.tokens_used
+            code: Optional[str] = None
+            if item.tokens <= remaining:
+                code, item.status = item.code, "included"
+                assembled.tokens_used += item.tokens
+            else:
+                summary = summarise_definition(item.code or "")
+                summary_tokens = count_tokens(summary, self.model)
+                if summary and summary_tokens <= remaining:
+                    code, item.status = summary, "summarised"
+                    assembled.tokens_used += summary_tokens
+
+            if code is not None:
+                assembled.section(item.section)[item.name] = code
+
+        return assembled
@@ -0,0 +1,279 @@
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from pyqaai.core.batch import BatchRunner, changed_line_ranges, enumerate_targets, expand_paths
+from pyqaai.core.cascade import ModelCascade
+from pyqaai.core.code_analyser import CodeAnalyser
+from pyqaai.core.context_builder import ContextBuilder
+from pyqaai.core.fingerprints import VerdictStore
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.llm import LLM
+from pyqaai.core.parse_cache import get_parse_cache
+from pyqaai.core.project_index import INDEX_DIRECTORY
+from pyqaai.static.prompts import QA_PROMPTS
+
+DAEMON_STATE_FILENAME = "daemon.json"
+DEFAULT_WATCH_INTERVAL = 2.0
+MAX_REQUEST_BYTES = 1024 * 1024
+
+
+def daemon_state_path(project_root: str) -> str:
+    return os.path.join(project_root, INDEX_DIRECTORY, DAEMON_STATE_FILENAME)
+
+
+class ProjectWatcher:
+    """
+    Polls the project for changed, added and removed files and updates the index, so
+    requests find it current. Polling relies on the cached file list and the index's
+    stat checks, which only re-parse files that changed.
+    """
+    def __init__(self, code_analyser: CodeAnalyser, lock: threading.Lock, interval: float = DEFAULT_WATCH_INTERVAL):
+        self.code_analyser = code_analyser
+        self.lock = lock
+        self.interval = interval
+        self.refreshes = 0
+        self.files_reindexed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        with self.lock:
+            reindexed, removed = self.code_analyser.refresh_project_index(quiet=True)
+        self.refreshes += 1
+        self.files_reindexed += reindexed + removed
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Index refresh failed: {e}")
+
+    def start(self) -> "ProjectWatcher":
+        self._thread = threading.Thread(target=self._run, name="pyqaai-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class QADaemon:
+    """
+    Long-running local server that keeps the project index, parse cache, verdict store
+    and LLM client (with its pooled HTTP connections) in memory between requests. It
+    listens on localhost and writes its address and a random access token to
+    ``.pyqaai/daemon.json``, which only the current user can read; ``pyqaai-client``
+    uses that file to send requests.
+
+    Requests are handled one at a time, since the timings and cascade counts they return
+    are kept per process. Within a request, the lock shared with the file watcher is only
+    held while the index is refreshed and a target's context is gathered, so the watcher
+    keeps the index current while the request's LLM checks run concurrently.
+    """
+    def __init__(self,
+                 code_analyser: CodeAnalyser,
+                 llm: LLM,
+                 context_builder: ContextBuilder,
+                 verdict_store: Optional[VerdictStore] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 watch_interval: float = DEFAULT_WATCH_INTERVAL,
+                 workers: int = 4,
+                 batch_checks: bool = False,
+                 cascade: Optional[ModelCascade] = None,
+                 static_checks: bool = False):
+        self.code_analyser = code_analyser
+        self.llm = llm
+        self.context_builder = context_builder
+        self.verdict_store = verdict_store
+        self.workers = workers
+        self.batch_checks = batch_checks
+        self.cascade = cascade
+        self.static_checks = static_checks
+        self.token = secrets.token_hex(16)
+        self.started = time.time()
+        self.requests = 0
+        self._request_lock = threading.Lock()
+        self._analysis_lock = threading.Lock()
+        self.watcher = ProjectWatcher(code_analyser, self._analysis_lock, watch_interval) if watch_interval > 0 else None
+        self.state_path = daemon_state_path(code_analyser.project_root)
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def status(self) -> Dict[str, Any]:
+        parse_cache = get_parse_cache()
+        response_cache = self.llm.response_cache
+        return {
+            "project_root": self.code_analyser.project_root,
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "backend": self.llm.backend.name,
+            "model": self.llm.model,
+            "cascade_model": self.cascade.model if self.cascade is not None else None,
+            "parse_cache": {"modules": len(parse_cache), "hits": parse_cache.hits, "misses": parse_cache.misses},
+            "response_cache": {"hits": response_cache.hits, "misses": response_cache.misses} if response_cache is not None else None,
+            "watcher": {"refreshes": self.watcher.refreshes, "files_reindexed": self.watcher.files_reindexed} if self.watcher is not None else None,
+        }
+
+    def check(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Runs a QA tier over the functions and classes in ``paths``, optionally narrowed to
+        one ``name`` or to the code changed since ``changed_since``. Returns the summary,
+        timings and per-target results in the same shape as the batch JSON file.
+        """
+        paths: List[str] = request.get("paths") or []
+        task_key = f"Tier {request.get('tier', '1')}"
+        if not paths:
+            raise ValueError("No paths given")
+        if task_key not in QA_PROMPTS:
+            raise ValueError(f"Unknown tier: {task_key}")
+
+        with self._request_lock:
+            tracer = get_tracer()
+            # Spans are per request; a long-lived process would otherwise keep them all.
+            tracer.clear()
+            if self.cascade is not None:
+                self.cascade.reset()
+            python_files = expand_paths(paths)
+            changed = changed_line_ranges(self.code_analyser.project_root, request["changed_since"]) if request.get("changed_since") else None
+            targets = enumerate_targets(python_files, changed)
+            if request.get("name"):
+                targets = [target for target in targets if target.name == request["name"]]
+
+            runner = BatchRunner(
+                self.code_analyser,
+                self.llm,
+                self.context_builder,
+                task_key,
+                workers=request.get("workers") or self.workers,
+                batch_checks=self.batch_checks,
+                verdict_store=self.verdict_store,
+                incremental=bool(request.get("incremental")),
+                cascade=self.cascade,
+                static_checks=self.static_checks,
+                analysis_lock=self._analysis_lock,
+            )
+            start = time.perf_counter()
+            results = runner.run(targets)
+            elapsed = time.perf_counter() - start
+
+            if request.get("output"):
+                summary, results_file = runner.write_outputs(results, request["output"], None, elapsed)
+            else:
+                summary, results_file = runner.summarise(results, elapsed), None
+            return {"summary": summary, "timings": tracer.summary(), "results": results, "results_file": results_file}
+
+    def _make_handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _authorised(self) -> bool:
+                header = self.headers.get("Authorization", "")
+                if hmac.compare_digest(header, f"Bearer {daemon.token}"):
+                    return True
+                self._send_json(401, {"error": "Missing or invalid token"})
+                return False
+
+            def do_GET(self):
+                if not self._authorised():
+                    return
+                if self.path == "/status":
+                    self._send_json(200, daemon.status())
+                else:
+                    self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+
+            def do_POST(self):
+                if not self._authorised():
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    if length > MAX_REQUEST_BYTES:
+                        raise ValueError("Request too large")
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError as e:
+                    self._send_json(400, {"error": f"Invalid request: {e}"})
+                    return
+
+                if self.path == "/shutdown":
+                    self._send_json(200, {"stopping": True})
+                    threading.Thread(target=daemon.httpd.shutdown, daemon=True).start()
+                    return
+                if self.path != "/check":
+                    self._send_json(404, {"error": f"Unknown endpoint {self.path}"})
+                    return
+
+                daemon.requests += 1
+                try:
+                    self._send_json(200, daemon.check(request))
+                except ValueError as e:
+                    self._send_json(400, {"error": str(e)})
+                except Exception as e:
+                    self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+        return Handler
+
+    def _write_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        state = {"url": self.url, "token": self.token, "pid": os.getpid(), "project_root": self.code_analyser.project_root}
+        # The token grants access to the daemon, so the file is private to the user.
+        descriptor = os.open(self.state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(state, file)
+
+    def _remove_state(self) -> None:
+        try:
+            with open(self.state_path) as file:
+                if json.load(file).get("token") != self.token:
+                    return
+            os.remove(self.state_path)
+        except (OSError, ValueError):
+            pass
+
+    def serve_forever(self) -> None:
+        """
+        Warms the index, publishes the state file and serves until interrupted or asked
+        to shut down.
+        """
+        if self.watcher is not None:
+            self.watcher.refresh()
+            self.watcher.start()
+        else:
+            self.code_analyser.refresh_project_index(quiet=True)
+        self._write_state()
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._remove_state()
+            if self.watcher is not None:
+                self.watcher.stop()
+            self.httpd.server_close()
@@ -0,0 +1,234 @@
+import argparse
+import ast
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+STRUCTURE_MARKER = "QA Checks to perform"
+IMPROVEMENT_MARKER = "Code Improvement Suggestion"
+CANNED_JUSTIFICATION = "Canned response from the PyQAAI fake LLM server. The code was not reviewed."
+CANNED_IMPROVEMENT = {
+    "import_statements": "",
+    "suggested_code": "# No suggestion: canned response from the PyQAAI fake LLM server.",
+    "changelog": "No changes suggested by the fake LLM server.",
+}
+STREAM_CHUNK_CHARACTERS = 16
+
+
+def _parse_structure(prompt: str) -> Any:
+    """
+    Extracts the return structure embedded in a QA check prompt, or None.
+    """
+    start = prompt.find(STRUCTURE_MARKER)
+    if start == -1:
+        return None
+    start = prompt.find(": ", start)
+    end = prompt.find("\n\n", start)
+    if start == -1 or end == -1:
+        return None
+    try:
+        return json.loads(prompt[start + 2:end])
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(prompt[start + 2:end])
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _fill_structure(structure: Dict[str, Any], rng: random.Random, pass_rate: float) -> Dict[str, Any]:
+    filled = dict(structure)
+    if "pass" in filled:
+        filled["pass"] = "True" if rng.random() < pass_rate else "False"
+    if "justification" in filled:
+        filled["justification"] = CANNED_JUSTIFICATION
+    if "confidence" in filled:
+        filled["confidence"] = round(rng.uniform(0.5, 1.0), 2)
+    if "answer" in filled:
+        filled["answer"] = CANNED_JUSTIFICATION
+    return filled
+
+
+def canned_response(messages: List[Dict[str, str]], pass_rate: float = 0.8) -> Dict[str, Any]:
+    """
+    Builds a schema-valid response for a PyQAAI prompt. Verdicts are derived from a hash
+    of the messages, so the same prompt always gets the same answer.
+    """
+    # The check instructions follow the code context, in the last message
+    prompt = messages[-1]["content"] if messages else ""
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+    rng = random.Random(digest)
+
+    if IMPROVEMENT_MARKER in prompt:
+        return dict(CANNED_IMPROVEMENT)
+    structure = _parse_structure(prompt)
+    if isinstance(structure, list):
+        return {"results": [_fill_structure(entry, rng, pass_rate) for entry in structure if isinstance(entry, dict)]}
+    if isinstance(structure, dict):
+        return _fill_structure(structure, rng, pass_rate)
+    return {}
+
+
+class FakeLLMServer:
+    """
+    Local HTTP server implementing the OpenAI chat completions endpoint with canned,
+    deterministic responses and configurable latency, for offline benchmarking and load
+    testing. Streaming requests are answered as server-sent events with the latency
+    spread over the chunks. Like providers with automatic prompt caching, it reports the
+    messages before the last one as cached tokens once it has seen them.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.5, jitter: float = 0.0, pass_rate: float = 0.8):
+        self.latency = latency
+        self.jitter = jitter
+        self.pass_rate = pass_rate
+        self.requests = 0
+        self._prefixes: set = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _delay(self, messages: List[Dict[str, str]]) -> float:
+        if not self.jitter:
+            return self.latency
+        seed = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).digest()
+        return max(0.0, self.latency + random.Random(seed).uniform(-self.jitter, self.jitter))
+
+    def _cached_tokens(self, messages: List[Dict[str, str]]) -> int:
+        prefix = messages[:-1]
+        if not prefix:
+            return 0
+        key = hashlib.sha256(json.dumps(prefix, sort_keys=True).encode("utf-8")).digest()
+        with self._lock:
+            seen = key in self._prefixes
+            self._prefixes.add(key)
+        return sum(len(message.get("content", "")) for message in prefix) // 4 if seen else 0
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+                    return
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    messages = request["messages"]
+                except (ValueError, KeyError) as e:
+                    self._send_json(400, {"error": {"message": f"Invalid request: {e}"}})
+                    return
+
+                with server._lock:
+                    server.requests += 1
+                    request_number = server.requests
+                content = json.dumps(canned_response(messages, server.pass_rate))
+                model = request.get("model", "fake")
+                completion_id = f"chatcmpl-fake-{request_number}"
+                delay = server._delay(messages)
+
+                if request.get("stream"):
+                    self._stream(completion_id, model, content, delay)
+                    return
+
+                time.sleep(delay)
+                prompt_tokens = sum(len(message.get("content", "")) for message in messages) // 4
+                completion_tokens = len(content) // 4
+                self._send_json(200, {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                        "prompt_tokens_details": {"cached_tokens": server._cached_tokens(messages)},
+                    },
+                })
+
+            def _stream(self, completion_id: str, model: str, content: str, delay: float) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                pieces = [content[i:i + STREAM_CHUNK_CHARACTERS] for i in range(0, len(content), STREAM_CHUNK_CHARACTERS)]
+                for index, piece in enumerate(pieces + [None]):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"role": "assistant", "content": piece} if index == 0 else ({"content": piece} if piece is not None else {}),
+                            "finish_reason": None if piece is not None else "stop",
+                        }],
+                    }
+                    time.sleep(delay / (len(pieces) + 1))
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="pyqaai-fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def serve(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m pyqaai.core.fake_server", description="Run the PyQAAI fake LLM server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds to wait before each response (default: 0.5).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Deterministic +/- variation of the latency in seconds.")
+    parser.add_argument("--pass-rate", type=float, default=0.8, help="Fraction of checks answered with a pass (default: 0.8).")
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(args.host, args.port, args.latency, args.jitter, args.pass_rate)
+    print(f"Fake LLM server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    serve()
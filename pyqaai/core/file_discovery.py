@@ -0,0 +1,278 @@
+import json
+import os
+import re
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pyqaai.core.project_index import INDEX_DIRECTORY
+
+FILE_LIST_CACHE_FILENAME = "files.json"
+FILE_LIST_CACHE_VERSION = 1
+IGNORE_FILENAMES = (".gitignore", ".pyqaaiignore")
+DEFAULT_EXCLUDED_DIRECTORIES = frozenset({
+    ".git", ".hg", ".svn", ".venv", "venv", ".env", "env", "node_modules", "build", "dist",
+    ".tox", ".nox", ".eggs", "site-packages", "__pycache__", ".mypy_cache", ".pytest_cache",
+    ".ruff_cache", ".idea", ".vscode", INDEX_DIRECTORY,
+})
+
+
+def _translate_glob(pattern: str) -> str:
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex.append(f"[{body}]")
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+class IgnoreRule:
+    def __init__(self, regex: "re.Pattern[str]", negate: bool, directory_only: bool):
+        self.regex = regex
+        self.negate = negate
+        self.directory_only = directory_only
+
+
+def compile_ignore_pattern(line: str) -> Optional[IgnoreRule]:
+    """
+    Compiles one line of a .gitignore file, or returns None for blank lines and comments.
+    """
+    line = line.rstrip("\n").rstrip()
+    if not line or line.startswith("#"):
+        return None
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        line = line[1:]
+    directory_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the ignore file's directory.
+    anchored = "/" in line
+    regex = _translate_glob(line.lstrip("/"))
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return IgnoreRule(re.compile(f"^{regex}$"), negate, directory_only)
+
+
+class IgnoreFile:
+    """
+    The rules of one .gitignore or .pyqaaiignore file, relative to its directory.
+    """
+    def __init__(self, base_directory: str, rules: List[IgnoreRule]):
+        self.base_directory = base_directory
+        self.rules = rules
+
+    @classmethod
+    def load(cls, path: str) -> "IgnoreFile":
+        with open(path, "r", encoding="utf-8", errors="ignore") as file:
+            rules = [rule for rule in (compile_ignore_pattern(line) for line in file) if rule is not None]
+        return cls(os.path.dirname(path), rules)
+
+    def match(self, path: str, is_directory: bool) -> Optional[bool]:
+        """
+        True if the last matching rule ignores the path, False if it re-includes it,
+        None if no rule matches.
+        """
+        relative = os.path.relpath(path, self.base_directory).replace(os.sep, "/")
+        result = None
+        for rule in self.rules:
+            if rule.directory_only and not is_directory:
+                continue
+            if rule.regex.match(relative):
+                result = not rule.negate
+        return result
+
+
+def is_ignored(path: str, is_directory: bool, ignore_files: Iterable[IgnoreFile]) -> bool:
+    ignored = False
+    # Deeper ignore files come later and take precedence, as in git.
+    for ignore_file in ignore_files:
+        result = ignore_file.match(path, is_directory)
+        if result is not None:
+            ignored = result
+    return ignored
+
+
+class FileDiscovery:
+    """
+    Lists the Python files of a directory tree, skipping excluded directories (virtual
+    environments, build output, caches, ...) and anything matched by .gitignore or
+    .pyqaaiignore files. Directories are scanned in parallel with os.scandir. The list is
+    cached in ``cache_path`` and reused while the mtimes of every scanned directory and
+    ignore file are unchanged. With ``use_git`` the list comes from ``git ls-files``
+    instead, which is not cached since git keeps its own index.
+    """
+    def __init__(self,
+                 root: str,
+                 excluded_directories: Iterable[str] = DEFAULT_EXCLUDED_DIRECTORIES,
+                 use_git: bool = False,
+                 cache_path: Optional[str] = None,
+                 max_workers: Optional[int] = None):
+        self.root = root
+        self.excluded_directories = frozenset(excluded_directories)
+        self.use_git = use_git
+        self.cache_path = cache_path
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+
+    @classmethod
+    def for_project(cls, project_root: str, **kwargs) -> "FileDiscovery":
+        return cls(project_root, cache_path=os.path.join(project_root, INDEX_DIRECTORY, FILE_LIST_CACHE_FILENAME), **kwargs)
+
+    def _is_excluded_directory(self, name: str) -> bool:
+        return name in self.excluded_directories or name.endswith(".egg-info")
+
+    def discover(self) -> List[str]:
+        if self.use_git:
+            try:
+                return self._git_files()
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"git ls-files failed ({e}), scanning the directory tree instead.")
+
+        cached = self._load_cache()
+        if cached is not None:
+            return cached
+
+        if self.cache_path is not None:
+            # Created before the scan, so creating it does not invalidate the recorded mtimes.
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            except OSError:
+                pass
+        files, directories, ignore_files = self._scan()
+        self._save_cache(files, directories, ignore_files)
+        return files
+
+    def _scan_directory(self, directory: str, ignore_files: Tuple[IgnoreFile, ...]) -> Tuple[List[str], List[Tuple[str, Tuple[IgnoreFile, ...]]], int, Dict[str, int]]:
+        own_ignore_files: Dict[str, int] = {}
+        for name in IGNORE_FILENAMES:
+            path = os.path.join(directory, name)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                ignore_files = ignore_files + (IgnoreFile.load(path),)
+                own_ignore_files[path] = mtime_ns
+            except OSError:
+                continue
+
+        files = []
+        subdirectories = []
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._is_excluded_directory(entry.name) and not is_ignored(entry.path, True, ignore_files):
+                                subdirectories.append((entry.path, ignore_files))
+                        elif entry.name.endswith(".py") and entry.is_file() and not is_ignored(entry.path, False, ignore_files):
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            mtime_ns = -1
+        return files, subdirectories, mtime_ns, own_ignore_files
+
+    def _scan(self) -> Tuple[List[str], Dict[str, int], Dict[str, int]]:
+        files: List[str] = []
+        directories: Dict[str, int] = {}
+        ignore_files: Dict[str, int] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(self._scan_directory, self.root, ()): self.root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    directory_files, subdirectories, mtime_ns, own_ignore_files = future.result()
+                    files.extend(directory_files)
+                    directories[directory] = mtime_ns
+                    ignore_files.update(own_ignore_files)
+                    for subdirectory, inherited in subdirectories:
+                        pending[executor.submit(self._scan_directory, subdirectory, inherited)] = subdirectory
+
+        return sorted(files), directories, ignore_files
+
+    def _git_files(self) -> List[str]:
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard", "--", "*.py"],
+            cwd=self.root, capture_output=True, text=True, check=True,
+        ).stdout
+        root_ignore = os.path.join(self.root, ".pyqaaiignore")
+        ignore_files = (IgnoreFile.load(root_ignore),) if os.path.isfile(root_ignore) else ()
+
+        files = []
+        for relative in output.split("\0"):
+            if not relative:
+                continue
+            parts = relative.split("/")
+            if any(self._is_excluded_directory(part) for part in parts[:-1]):
+                continue
+            path = os.path.join(self.root, *parts)
+            if os.path.isfile(path) and not is_ignored(path, False, ignore_files):
+                files.append(path)
+        return sorted(files)
+
+    def _cache_key(self) -> List[str]:
+        return sorted(self.excluded_directories)
+
+    def _load_cache(self) -> Optional[List[str]]:
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path, "r") as file:
+                cache = json.load(file)
+            if cache.get("version") != FILE_LIST_CACHE_VERSION or cache.get("root") != self.root or cache.get("excluded") != self._cache_key():
+                return None
+            for path, mtime_ns in list(cache["directories"].items()) + list(cache["ignore_files"].items()):
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return None
+            return cache["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cache(self, files: List[str], directories: Dict[str, int], ignore_files: Dict[str, int]) -> None:
+        if self.cache_path is None:
+            return
+        try:
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "w") as file:
+                json.dump({
+                    "version": FILE_LIST_CACHE_VERSION,
+                    "root": self.root,
+                    "excluded": self._cache_key(),
+                    "directories": directories,
+                    "ignore_files": ignore_files,
+                    "files": files,
+                }, file)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not cache the file list: {e}")
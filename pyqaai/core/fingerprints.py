@@ -0,0 +1,107 @@
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import textwrap
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pyqaai.core.project_index import INDEX_DIRECTORY
+
+VERDICT_STORE_FILENAME = "verdicts.sqlite"
+
+
+def normalised_ast_hash(code: str) -> str:
+    """
+    Hashes the AST of a definition without positions, so formatting and comment changes
+    keep the same hash. Code that does not parse is hashed as stripped text.
+    """
+    try:
+        payload = ast.dump(ast.parse(textwrap.dedent(code)), include_attributes=False)
+    except SyntaxError:
+        payload = "\n".join(line.strip() for line in code.splitlines() if line.strip())
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def element_fingerprint(code: str,
+                        invoked_functions: Dict[str, str],
+                        local_imported_functions_classes: Dict[str, str],
+                        caller_methods: Dict[str, str],
+                        model: str,
+                        prompt_key: str) -> str:
+    """
+    Fingerprint of a target's QA inputs: the normalised AST of the element, the hashes of
+    the definitions it calls or imports, the set of its callers, the model and the QA
+    prompts. A target whose fingerprint is unchanged can reuse its previous verdicts.
+    """
+    payload = {
+        "element": normalised_ast_hash(code or ""),
+        "callees": sorted(f"{name}:{normalised_ast_hash(code or '')}" for name, code in invoked_functions.items()),
+        "imports": sorted(f"{name}:{normalised_ast_hash(code or '')}" for name, code in local_imported_functions_classes.items()),
+        "callers": sorted(caller_methods),
+        "model": model,
+        "prompts": prompt_key,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class VerdictStore:
+    """
+    Stores the fingerprint and QA results of each target's last run, per tier, in
+    ``.pyqaai/verdicts.sqlite`` under the project root.
+    """
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+        self.connection = sqlite3.connect(self.store_path, check_same_thread=False)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS verdicts (
+                target TEXT NOT NULL,
+                task_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                checks TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (target, task_key)
+            );
+            """
+        )
+        self.connection.commit()
+
+    @classmethod
+    def for_project(cls, project_root: str) -> "VerdictStore":
+        return cls(os.path.join(project_root, INDEX_DIRECTORY, VERDICT_STORE_FILENAME))
+
+    def get(self, target: str, task_key: str, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the stored checks if the target was last checked with the same fingerprint.
+        """
+        with self._lock:
+            try:
+                row = self.connection.execute(
+                    "SELECT fingerprint, checks FROM verdicts WHERE target = ? AND task_key = ?", (target, task_key)
+                ).fetchone()
+            except sqlite3.Error as e:
+                print(f"Verdict store read failed: {e}")
+                return None
+        if row is None or row[0] != fingerprint:
+            return None
+        return json.loads(row[1])
+
+    def set(self, target: str, task_key: str, fingerprint: str, checks: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO verdicts (target, task_key, fingerprint, checks, updated) VALUES (?, ?, ?, ?, ?)",
+                    (target, task_key, fingerprint, json.dumps(checks), time.time()),
+                )
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Verdict store write failed: {e}")
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,144 @@
+import ast
+import os
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+from pyqaai.core.parse_cache import ParseCache, get_parse_cache
+
+MAX_REEXPORT_DEPTH = 8
+
+
+def split_import_path(import_path: str) -> Tuple[int, List[str]]:
+    """
+    Splits an import path as produced by get_imported_modules into its relative level
+    and dotted parts, e.g. "..core.llm.LLM" -> (2, ["core", "llm", "LLM"]).
+    """
+    level = len(import_path) - len(import_path.lstrip("."))
+    remainder = import_path[level:]
+    return level, remainder.split(".") if remainder else []
+
+
+class StaticImportResolver:
+    """
+    Resolves imported names to their definitions in project files without importing
+    anything. Dotted module names are searched for under the project's search roots the
+    way sys.path would (``a/b.py`` or ``a/b/__init__.py``), relative imports are resolved
+    from the importing file, and names re-exported through ``from x import y`` or
+    ``from x import *`` are followed. Anything outside the project resolves to None.
+    """
+    def __init__(self, project_root: str, search_roots: Optional[List[str]] = None, parse_cache: Optional[ParseCache] = None):
+        self.project_root = os.path.realpath(project_root)
+        self.search_roots = search_roots if search_roots is not None else self._default_search_roots()
+        self.parse_cache = parse_cache or get_parse_cache()
+        self._module_files: Dict[Tuple[str, ...], Optional[str]] = {}
+
+    def _default_search_roots(self) -> List[str]:
+        roots = [self.project_root]
+        src = os.path.join(self.project_root, "src")
+        if os.path.isdir(src):
+            roots.append(src)
+        for entry in sys.path:
+            entry = os.path.realpath(entry or os.getcwd())
+            if entry.startswith(self.project_root + os.sep) and os.path.isdir(entry) and entry not in roots:
+                roots.append(entry)
+        return roots
+
+    @staticmethod
+    def _module_file_in(directory: str, parts: List[str]) -> Optional[str]:
+        base = os.path.join(directory, *parts)
+        if os.path.isfile(base + ".py"):
+            return base + ".py"
+        if os.path.isfile(os.path.join(base, "__init__.py")):
+            return os.path.join(base, "__init__.py")
+        return None
+
+    def resolve_module(self, parts: List[str], level: int = 0, importer_path: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the file implementing the module, or None if it is not part of the project.
+        """
+        if level:
+            if importer_path is None:
+                return None
+            directory = os.path.dirname(os.path.realpath(importer_path))
+            for _ in range(level - 1):
+                directory = os.path.dirname(directory)
+            if parts:
+                path = self._module_file_in(directory, parts)
+            else:
+                path = os.path.join(directory, "__init__.py")
+                path = path if os.path.isfile(path) else None
+            # Relative imports must not escape the project.
+            if path is None or not path.startswith(self.project_root + os.sep):
+                return None
+            return path
+
+        key = tuple(parts)
+        if key not in self._module_files:
+            self._module_files[key] = next((path for path in (self._module_file_in(root, parts) for root in self.search_roots) if path), None)
+        return self._module_files[key]
+
+    def _find_in_module(self, module_file: str, name: str, depth: int, visited: Set[Tuple[str, str]]) -> Optional[str]:
+        if depth > MAX_REEXPORT_DEPTH or (module_file, name) in visited:
+            return None
+        visited.add((module_file, name))
+
+        try:
+            module = self.parse_cache.get(module_file)
+        except (SyntaxError, ValueError, OSError):
+            return None
+
+        # The last top-level definition wins, as it would at runtime.
+        for node in reversed(module.tree.body):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name == name:
+                return ast.get_source_segment(module.source, node)
+
+        # Follow explicit re-exports first, then star imports.
+        star_imports = []
+        for node in reversed(module.tree.body):
+            if not isinstance(node, ast.ImportFrom):
+                continue
+            parts = node.module.split(".") if node.module else []
+            for alias in node.names:
+                if alias.name == "*":
+                    star_imports.append((parts, node.level))
+                elif (alias.asname or alias.name) == name:
+                    return self._resolve_parts(parts + [alias.name], node.level, module_file, depth + 1, visited)
+
+        for parts, level in star_imports:
+            star_module = self.resolve_module(parts, level, module_file)
+            if star_module is not None:
+                definition = self._find_in_module(star_module, name, depth + 1, visited)
+                if definition:
+                    return definition
+        return None
+
+    def _resolve_parts(self, parts: List[str], level: int, importer_path: Optional[str], depth: int, visited: Set[Tuple[str, str]]) -> Optional[str]:
+        if not parts:
+            return None
+        module_parts, name = parts[:-1], parts[-1]
+
+        module_file = self.resolve_module(module_parts, level, importer_path) if (module_parts or level) else None
+        if module_file is not None:
+            definition = self._find_in_module(module_file, name, depth, visited)
+            if definition:
+                return definition
+
+        # The name may itself be a submodule (``from pkg import module`` or ``import pkg.module``).
+        submodule_file = self.resolve_module(parts, level, importer_path)
+        if submodule_file is not None:
+            try:
+                return self.parse_cache.get(submodule_file).source
+            except (SyntaxError, ValueError, OSError):
+                return None
+        return None
+
+    def resolve_definition(self, import_path: str, importer_path: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the source of the function, class or module an import path refers to, or
+        None if it cannot be found in the project.
+        """
+        level, parts = split_import_path(import_path)
+        # A bare top-level module (``import pkg``) is not a definition to include.
+        if "*" in parts or (level == 0 and len(parts) < 2):
+            return None
+        return self._resolve_parts(parts, level, importer_path, 0, set())
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Span attributes that are summed in the summary table.
+SUMMED_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "cached_tokens", "retries", "cache_hit", "critical_ms")
+
+
+class Span:
+    def __init__(self, name: str, category: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.start = 0.0
+        self.duration = 0.0
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "thread": self.thread_id,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Records timed spans around pipeline stages and LLM calls. Spans can carry attributes
+    such as token counts and are exported as JSON lines or as a Chrome trace
+    (chrome://tracing, Perfetto), and summarised per span name.
+    """
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", **attributes: Any) -> Iterator[Span]:
+        span = Span(name, category, attributes)
+        start = time.perf_counter()
+        span.start = start - self.origin
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            with self._lock:
+                self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans = []
+        self.origin = time.perf_counter()
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per span name, in order of first appearance: count, total, mean and
+        maximum duration in seconds, and the sums of the token, retry, cache and critical path
+        attributes.
+        """
+        rows: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        for span in spans:
+            row = rows.setdefault(span.name, {"name": span.name, "category": span.category, "count": 0, "total": 0.0, "max": 0.0})
+            row["count"] += 1
+            row["total"] += span.duration
+            row["max"] = max(row["max"], span.duration)
+            for attribute in SUMMED_ATTRIBUTES:
+                value = span.attributes.get(attribute)
+                if value is not None:
+                    row[attribute] = row.get(attribute, 0) + int(value)
+        for row in rows.values():
+            row["mean"] = row["total"] / row["count"]
+        return list(rows.values())
+
+    def find(self, name: str) -> List[Span]:
+        with self._lock:
+            return [span for span in self.spans if span.name == name]
+
+    def total(self, attribute: str) -> int:
+        """
+        Sum of a numeric span attribute over every span, e.g. ``cached_tokens``.
+        """
+        with self._lock:
+            return sum(int(span.attributes.get(attribute) or 0) for span in self.spans)
+
+    def format_summary(self) -> str:
+        lines = [f"{'Span':45} {'Count':>6} {'Total s':>9} {'Mean s':>8} {'Max s':>8} {'Critical s':>10} {'Tokens in/cached/out':>22}"]
+        for row in self.summary():
+            tokens = f"{row['prompt_tokens']}/{row.get('cached_tokens', 0)}/{row.get('completion_tokens', 0)}" if "prompt_tokens" in row else ""
+            critical = f"{row['critical_ms'] / 1000:.3f}" if "critical_ms" in row else ""
+            lines.append(f"{row['name'][:45]:45} {row['count']:6} {row['total']:9.3f} {row['mean']:8.3f} {row['max']:8.3f} {critical:>10} {tokens:>22}")
+        return "\n".join(lines)
+
+    def write_jsonl(self, path: str) -> None:
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w") as file:
+            for span in sorted(spans, key=lambda span: span.start):
+                file.write(json.dumps(span.to_dict()) + "\n")
+
+    def write_chrome_trace(self, path: str) -> None:
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": round(span.start * 1e6),
+                "dur": round(span.duration * 1e6),
+                "pid": os.getpid(),
+                "tid": span.thread_id,
+                "args": span.attributes,
+            }
+            for span in spans
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export(self, path: str) -> None:
+        """
+        Writes JSON lines for ``.jsonl`` paths and a Chrome trace otherwise.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if path.endswith(".jsonl"):
+            self.write_jsonl(path)
+        else:
+            self.write_chrome_trace(path)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
@@ -1,36 +1,60 @@
-from openai import OpenAI
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+import copy
 import json
-from typing import Any, Optional
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+from pyqaai.core.backends import LLMBackend, OpenAIBackend
+from pyqaai.core.instrumentation import Span, get_tracer
+from pyqaai.core.prompt_layout import render_code_context
+from pyqaai.core.rate_limiter import RateLimiter
+from pyqaai.core.response_cache import ResponseCache
+from pyqaai.core.streaming import JsonFieldStreamer
+from pyqaai.core.tokenizer import count_tokens
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+# Completion tokens reserved per check when deciding whether a batched prompt fits.
+RESPONSE_TOKENS_PER_CHECK = 800
 
 class LLM:
-    def __init__(self, api_key: str, organisation: str, model: str = "gpt-4o-2024-05-13", temperature: float = 0.0, stream: bool = False):
-        if not api_key or not organisation:
-            raise ValueError("API key and organisation must be provided")
+    def __init__(self, api_key: Optional[str], organisation: Optional[str], model: Optional[str] = None, temperature: float = 0.0, stream: bool = False, max_concurrency: int = 4, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None, max_retries: int = 5, backoff_base: float = 1.0, backoff_cap: float = 60.0, context_window: int = 128000, response_cache: Optional[ResponseCache] = None, backend: Optional[LLMBackend] = None):
+        # Without an explicit backend the OpenAI API is used with the given credentials.
+        self.backend = backend or OpenAIBackend(api_key, organisation)
         try:
-            self.client = OpenAI(organization=organisation, api_key=api_key)
+            self.client = self.backend.create_client()
         except Exception as e:
-            raise ValueError(f"Failed to initialize OpenAI client: {e}")
-        self.model = model
+            raise ValueError(f"Failed to initialize {self.backend.name} client: {e}")
+        self.model = model or self.backend.default_model
         self.temperature = temperature
         self.stream = stream
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.context_window = context_window
+        self.response_cache = response_cache
+
+    def with_model(self, model: str) -> "LLM":
+        """
+        A copy that sends requests to another model, sharing the client, rate limiter and
+        response cache. The copy does not stream.
+        """
+        other = copy.copy(self)
+        other.model = model
+        other.stream = False
+        return other
 
-    def _prepare_messages(self, system_prompt: str, custom_override: Optional[str] = None, import_statements: Optional[list[str]] = None, local_imported_functions_classes: Optional[dict[str, Any]] = None, caller_methods: Optional[list[str]] = None, qa_code: Optional[str] = None, invoked_functions: Optional[list[str]] = None) -> list[dict[str, str]]:
+    def _prepare_messages(self, system_prompt: str, custom_override: Optional[str] = None, import_statements: Optional[list[str]] = None, local_imported_functions_classes: Optional[dict[str, Any]] = None, caller_methods: Optional[dict[str, Any]] = None, qa_code: Optional[str] = None, invoked_functions: Optional[dict[str, Any]] = None, check_prompt: Optional[str] = None) -> list[dict[str, str]]:
         """
-        Prepares the list of messages to send to the model, including system and user prompts.
+        Prepares the list of messages to send to the model: the system prompt, the code
+        context and, last, the per-check ``check_prompt``. The first two are identical for
+        every check of a target so they form a stable, cacheable prompt prefix.
         """
         if not custom_override:
-            user_message = "--CODE STARTING--\n\n"
-            if import_statements:
-                user_message += f"Import Statements:\n{import_statements}\n\n"
-            if local_imported_functions_classes:
-                user_message += f"Locally Imported Functions/Classes:\n{local_imported_functions_classes}\n\n"
-            if caller_methods:
-                user_message += f"Caller Methods:\n{caller_methods}\n\n"
-            if invoked_functions:
-                user_message += f"Invoked Functions:\n{invoked_functions}\n"
-            user_message += "------\n"
-            if qa_code:
-                user_message += f"Code to perform QA Checks on:\n{qa_code}"
+            user_message = render_code_context(import_statements, local_imported_functions_classes, caller_methods, qa_code, invoked_functions)
         else:
             user_message = custom_override
 
@@ -38,32 +62,130 @@ class LLM:
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_message}
         ]
+        if check_prompt:
+            messages.append({"role": "user", "content": check_prompt})
         return messages
 
+    @staticmethod
+    def estimate_tokens(messages: list[dict[str, str]]) -> int:
+        """
+        Prompt size in tokens, counted locally, for rate limiting and context budgeting.
+        """
+        return sum(count_tokens(message["content"]) for message in messages) + 1
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """
+        Full-jitter exponential backoff, honouring a Retry-After header when the server sends one.
+        """
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _create_completion(self, prepared_messages: list[dict[str, str]], span: Optional[Span] = None):
+        """
+        Sends a chat completion request through the rate limiter, retrying 429/5xx and
+        connection errors with jittered exponential backoff. Retries and rate limit waits
+        are recorded on ``span``.
+        """
+        estimated_tokens = self.estimate_tokens(prepared_messages)
+        attempt = 0
+        rate_limit_wait = 0.0
+        while True:
+            wait_start = time.perf_counter()
+            self.rate_limiter.acquire(estimated_tokens)
+            rate_limit_wait += time.perf_counter() - wait_start
+            if span is not None:
+                span.set(retries=attempt, rate_limit_wait=round(rate_limit_wait, 6))
+            try:
+                return self.client.chat.completions.create(
+                    model=self.model,
+                    messages=prepared_messages,
+                    temperature=self.temperature,
+                    stream=self.stream,
+                    response_format={ "type": "json_object" },
+                )
+            except (RateLimitError, APIConnectionError, APITimeoutError, APIStatusError) as e:
+                retryable = not isinstance(e, APIStatusError) or isinstance(e, RateLimitError) or e.status_code in RETRYABLE_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff_delay(attempt, e))
+                attempt += 1
+
+    def _read_message(self, response, on_delta: Optional[Callable[[str], None]] = None, stream_field: str = "justification") -> Optional[str]:
+        """
+        Returns the message text of a completion. Streamed completions are consumed chunk by
+        chunk, passing the decoded text of ``stream_field`` to ``on_delta`` as it arrives.
+        """
+        if not self.stream:
+            if response.choices and response.choices[0].message.content:
+                return response.choices[0].message.content
+            return None
+
+        streamer = JsonFieldStreamer(stream_field) if on_delta is not None else None
+        parts = []
+        for chunk in response:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            delta = chunk.choices[0].delta.content
+            parts.append(delta)
+            if streamer is not None:
+                text = streamer.feed(delta)
+                if text:
+                    on_delta(text)
+        return "".join(parts) or None
+
     def generate_response(self, 
                         system_prompt: str, 
                         custom_override: Optional[str] = None, 
                         import_statements: Optional[list[str]] = None, 
                         local_imported_functions_classes: Optional[dict[str, Any]] = None, 
-                        caller_methods: Optional[list[str]] = None, 
+                        caller_methods: Optional[dict[str, Any]] = None, 
                         qa_code: Optional[str] = None, 
-                        invoked_functions: Optional[list[str]] = None) -> Optional[dict[str, Any]]:
+                        invoked_functions: Optional[dict[str, Any]] = None,
+                        on_delta: Optional[Callable[[str], None]] = None,
+                        stream_field: str = "justification",
+                        check_prompt: Optional[str] = None) -> Optional[dict[str, Any]]:
         """
-        Generates a response using the GPT model with the given inputs.
+        Generates a response using the GPT model with the given inputs. ``check_prompt`` is
+        sent after the code context. When streaming, ``on_delta`` receives the text of
+        ``stream_field`` as it is generated.
         """
+        with get_tracer().span("llm.generate_response", category="llm", model=self.model) as span:
+            return self._generate_response(span, system_prompt, custom_override, import_statements, local_imported_functions_classes, caller_methods, qa_code, invoked_functions, on_delta, stream_field, check_prompt)
+
+    def _generate_response(self, span: Span, system_prompt, custom_override, import_statements, local_imported_functions_classes, caller_methods, qa_code, invoked_functions, on_delta, stream_field, check_prompt) -> Optional[dict[str, Any]]:
         try:
-            prepared_messages = self._prepare_messages(system_prompt, custom_override, import_statements, local_imported_functions_classes, caller_methods, qa_code, invoked_functions)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=prepared_messages,
-                temperature=self.temperature,
-                stream=self.stream,
-                response_format={ "type": "json_object" },
-            )
+            prepared_messages = self._prepare_messages(system_prompt, custom_override, import_statements, local_imported_functions_classes, caller_methods, qa_code, invoked_functions, check_prompt)
 
-            if response.choices and response.choices[0].message.content:
-                message = response.choices[0].message.content
+            cache_key = None
+            if self.response_cache is not None:
+                cache_key = self.response_cache.make_key(self.model, self.temperature, prepared_messages)
+                cached = self.response_cache.get(cache_key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    if on_delta is not None and isinstance(cached.get(stream_field), str):
+                        on_delta(cached[stream_field])
+                    return cached
+
+            response = self._create_completion(prepared_messages, span)
+            message = self._read_message(response, on_delta, stream_field)
+
+            # Streamed responses carry no usage, so their token counts are estimated locally.
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                span.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens, cached_tokens=self._cached_tokens(usage))
+            else:
+                span.set(prompt_tokens=self.estimate_tokens(prepared_messages), completion_tokens=count_tokens(message or ""))
+
+            if message:
                 content = json.loads(message)
+                if cache_key is not None:
+                    self.response_cache.set(cache_key, content)
                 return content
             else:
                 print("No content found in the response.")
@@ -76,4 +198,74 @@ class LLM:
             return None
         except Exception as e:
             print(f"An error occurred: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _cached_tokens(usage) -> int:
+        """
+        Prompt tokens the provider served from its prompt prefix cache, 0 if not reported.
+        """
+        details = getattr(usage, "prompt_tokens_details", None)
+        return (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+
+    def generate_responses(self,
+                           system_prompt: str,
+                           check_prompts: list[str],
+                           on_response: Optional[Callable[[int, Optional[dict[str, Any]]], None]] = None,
+                           on_delta: Optional[Callable[[int, str], None]] = None,
+                           **context: Any) -> list[Optional[dict[str, Any]]]:
+        """
+        Generates one response per check prompt, sharing the same system prompt and code
+        context, with up to ``max_concurrency`` requests in flight. Results are returned in
+        the order of ``check_prompts``; ``on_response`` is called with (index, response) as each completes
+        and, when streaming, ``on_delta`` with (index, text) as justifications are generated.
+        """
+        results: list[Optional[dict[str, Any]]] = [None] * len(check_prompts)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, max(1, len(check_prompts)))) as executor:
+            futures = {
+                executor.submit(
+                    self.generate_response,
+                    system_prompt=system_prompt,
+                    check_prompt=check_prompt,
+                    on_delta=(lambda text, index=index: on_delta(index, text)) if on_delta is not None else None,
+                    **context
+                ): index
+                for index, check_prompt in enumerate(check_prompts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                if on_response is not None:
+                    on_response(index, results[index])
+
+        return results
+
+    def fits_context(self, system_prompt: str, reserved_tokens: int = 0, check_prompt: Optional[str] = None, **context: Any) -> bool:
+        """
+        Whether the prepared prompt plus ``reserved_tokens`` of output fits in the model's context window.
+        """
+        prepared_messages = self._prepare_messages(system_prompt, check_prompt=check_prompt, **context)
+        return self.estimate_tokens(prepared_messages) + reserved_tokens <= self.context_window
+
+    def generate_batch_response(self, system_prompt: str, check_prompt: str, return_structures: list[dict[str, str]], **context: Any) -> Optional[list[Optional[dict[str, Any]]]]:
+        """
+        Runs several checks in one request and splits the returned ``results`` array back into
+        per-check responses, aligned with ``return_structures``. Entries the model left out are
+        None; returns None if the response could not be used at all.
+        """
+        response = self.generate_response(system_prompt=system_prompt, check_prompt=check_prompt, **context)
+        if not response or not isinstance(response.get("results"), list):
+            return None
+
+        results = [result for result in response["results"] if isinstance(result, dict)]
+        by_prompt = {result.get("qa_check_prompt"): result for result in results}
+
+        responses: list[Optional[dict[str, Any]]] = []
+        for position, structure in enumerate(return_structures):
+            result = by_prompt.get(structure["qa_check_prompt"])
+            if result is None and len(results) == len(return_structures):
+                # Fall back to position when the model rewrote the prompt text.
+                result = results[position]
+            responses.append(result)
+        return responses
@@ -0,0 +1,343 @@
+import ast
+import hashlib
+import io
+import os
+import re
+import threading
+import tokenize
+from collections import OrderedDict
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Tuple
+
+# Rough ratio of in-memory AST size to source size, used for the memory budget.
+AST_SIZE_FACTOR = 12
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Line breaks as the tokenizer sees them; str.splitlines also splits on form feeds etc.
+LINE_BREAK = re.compile(rb"\r\n|\r|\n")
+
+
+class EnclosingScopeVisitor(ast.NodeVisitor):
+    """
+    Records the innermost enclosing function or class of every call in one pass.
+    Calls at module level are not recorded.
+    """
+    def __init__(self):
+        self.scopes: Dict[int, ast.AST] = {}
+        self._stack: List[ast.AST] = []
+
+    def _visit_scope(self, node):
+        self._stack.append(node)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_ClassDef = _visit_scope
+
+    def visit_Call(self, node):
+        if self._stack:
+            self.scopes[id(node)] = self._stack[-1]
+        self.generic_visit(node)
+
+
+class ScopeChainVisitor(ast.NodeVisitor):
+    """
+    Records the chain of enclosing functions and classes, outermost first, of every
+    call and every definition in one pass.
+    """
+    def __init__(self):
+        self.chains: Dict[int, Tuple[ast.AST, ...]] = {}
+        self._stack: List[ast.AST] = []
+
+    def _visit_scope(self, node):
+        self.chains[id(node)] = tuple(self._stack)
+        self._stack.append(node)
+        self.generic_visit(node)
+        self._stack.pop()
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_ClassDef = _visit_scope
+
+    def visit_Call(self, node):
+        self.chains[id(node)] = tuple(self._stack)
+        self.generic_visit(node)
+
+
+def _module_level_statements(body: List[ast.stmt]):
+    # Statements executed at import time, including those under if/try/with blocks.
+    for node in body:
+        yield node
+        if isinstance(node, (ast.If, ast.Try, ast.With, ast.AsyncWith)):
+            for field in ("body", "orelse", "finalbody"):
+                yield from _module_level_statements(getattr(node, field, []))
+            for handler in getattr(node, "handlers", []):
+                yield from _module_level_statements(handler.body)
+
+
+def used_names(tree: ast.AST) -> Set[str]:
+    """
+    Names read anywhere under ``tree``, including those in string annotations.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, str) and len(node.value) < 200:
+            # Forward references such as "Optional[Foo]"; other strings rarely parse
+            try:
+                names |= {name.id for name in ast.walk(ast.parse(node.value, mode="eval")) if isinstance(name, ast.Name)}
+            except SyntaxError:
+                pass
+    return names
+
+
+class ParsedModule:
+    """
+    A source file parsed once, together with the definition, import and call
+    tables derived from its tree. The tables are computed on first access.
+    ``exact_bytes`` is set when the source encodes back to the file's bytes as UTF-8,
+    which is what makes ``byte_span`` offsets valid in the file itself.
+    """
+    def __init__(self, path: str, source: str, content_hash: str, tree: ast.Module, exact_bytes: bool = True):
+        self.path = path
+        self.source = source
+        self.content_hash = content_hash
+        self.tree = tree
+        self.exact_bytes = exact_bytes
+        self.size = len(source) * AST_SIZE_FACTOR
+
+    @cached_property
+    def definitions(self) -> List[Tuple[str, ast.AST]]:
+        """
+        Top-level functions, classes and class methods as (qualified name, node),
+        in source order. Functions nested inside functions are not included.
+        """
+        definitions = []
+
+        def visit_node(node, parent_class=None):
+            if isinstance(node, ast.ClassDef):
+                definitions.append((node.name, node))
+                for child in ast.iter_child_nodes(node):
+                    visit_node(child, parent_class=node.name)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{parent_class}.{node.name}" if parent_class else node.name
+                definitions.append((name, node))
+            else:
+                for child in ast.iter_child_nodes(node):
+                    visit_node(child, parent_class=parent_class)
+
+        visit_node(self.tree)
+        return definitions
+
+    @cached_property
+    def line_offsets(self) -> List[int]:
+        """
+        Byte offset of the start of each line, indexed from 0 for line 1.
+        """
+        return [0] + [match.end() for match in LINE_BREAK.finditer(self.source.encode("utf-8"))]
+
+    def byte_span(self, node: ast.AST) -> Tuple[int, int]:
+        """
+        Start and end byte offsets of a node in the UTF-8 encoded source, matching
+        ``ast.get_source_segment``. AST column offsets are already in UTF-8 bytes. They
+        are only offsets into the file when ``exact_bytes`` is set.
+        """
+        return (self.line_offsets[node.lineno - 1] + node.col_offset,
+                self.line_offsets[node.end_lineno - 1] + node.end_col_offset)
+
+    @cached_property
+    def functions_by_name(self) -> Dict[str, List[ast.AST]]:
+        functions: Dict[str, List[ast.AST]] = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                functions.setdefault(node.name, []).append(node)
+        return functions
+
+    @cached_property
+    def imports(self) -> Tuple[Dict[str, str], List[str]]:
+        imports = {}
+        # A dict keeps the statements de-duplicated in source order; a set's order would
+        # change between runs with string hash randomisation and break prompt caching.
+        import_statements = {}
+
+        import_nodes = [node for node in ast.walk(self.tree) if isinstance(node, (ast.Import, ast.ImportFrom))]
+        for node in sorted(import_nodes, key=lambda node: (node.lineno, node.col_offset)):
+            import_statements[ast.get_source_segment(self.source, node)] = None
+
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = alias.name
+            else:
+                # Relative imports keep their leading dots, e.g. "..core.llm.LLM".
+                prefix = "." * node.level + (f"{node.module}." if node.module else "")
+                for alias in node.names:
+                    imports[alias.asname or alias.name] = f"{prefix}{alias.name}"
+
+        return imports, list(import_statements)
+
+    @cached_property
+    def used_names(self) -> Set[str]:
+        return used_names(self.tree)
+
+    @cached_property
+    def calls(self) -> Dict[str, List[ast.Call]]:
+        """
+        Every call in the module keyed by the called name (``f()`` and ``obj.f()`` both key on ``f``).
+        """
+        calls: Dict[str, List[ast.Call]] = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Call):
+                if isinstance(node.func, ast.Name):
+                    calls.setdefault(node.func.id, []).append(node)
+                elif isinstance(node.func, ast.Attribute):
+                    calls.setdefault(node.func.attr, []).append(node)
+        return calls
+
+    @cached_property
+    def enclosing_scopes(self) -> Dict[int, ast.AST]:
+        """
+        Innermost enclosing function or class of each call, keyed on ``id(call)``.
+        """
+        visitor = EnclosingScopeVisitor()
+        visitor.visit(self.tree)
+        return visitor.scopes
+
+    def enclosing_scope(self, call: ast.Call) -> Optional[ast.AST]:
+        return self.enclosing_scopes.get(id(call))
+
+    @cached_property
+    def scope_chains(self) -> Dict[int, Tuple[ast.AST, ...]]:
+        """
+        Enclosing functions and classes, outermost first, of each call and definition,
+        keyed on ``id(node)``.
+        """
+        visitor = ScopeChainVisitor()
+        visitor.visit(self.tree)
+        return visitor.chains
+
+    @cached_property
+    def bindings(self) -> Tuple[Dict[str, ast.AST], List[ast.ImportFrom]]:
+        """
+        The statement that last binds each module-level name (a def, class, import or
+        assignment), and the ``from x import *`` statements of the module. Imports map
+        each bound name to its ``ast.alias``.
+        """
+        bindings: Dict[str, ast.AST] = {}
+        star_imports: List[ast.ImportFrom] = []
+        for node in _module_level_statements(self.tree.body):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                bindings[node.name] = node
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    bindings[alias.asname or alias.name.split(".")[0]] = alias
+            elif isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    if alias.name == "*":
+                        star_imports.append(node)
+                    else:
+                        bindings[alias.asname or alias.name] = alias
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        bindings[target.id] = node
+        return bindings, star_imports
+
+    @cached_property
+    def import_statements_by_alias(self) -> Dict[int, ast.AST]:
+        """
+        The Import or ImportFrom statement of each ``ast.alias``, keyed on ``id(alias)``.
+        """
+        statements: Dict[int, ast.AST] = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    statements[id(alias)] = node
+        return statements
+
+
+class ParseCache:
+    """
+    Process-wide LRU cache of parsed modules keyed on path and content hash, bounded
+    by an estimated memory budget. A file whose size and mtime are unchanged is not
+    re-read; a file whose content changed is re-parsed.
+    """
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], ParsedModule]" = OrderedDict()
+        self._stats: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, file_path: str) -> ParsedModule:
+        path = os.path.realpath(file_path)
+        stat = os.stat(path)
+
+        with self._lock:
+            known = self._stats.get(path)
+            if known is not None and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                module = self._entries.get((path, known[2]))
+                if module is not None:
+                    self._entries.move_to_end((path, known[2]))
+                    self.hits += 1
+                    return module
+
+        with open(path, 'rb') as file:
+            data = file.read()
+        content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = (path, content_hash)
+
+        with self._lock:
+            previous = self._stats.get(path)
+            if previous is not None and previous[2] != content_hash and (path, previous[2]) in self._entries:
+                self.current_bytes -= self._entries.pop((path, previous[2])).size
+            self._stats[path] = (stat.st_mtime_ns, stat.st_size, content_hash)
+            module = self._entries.get(key)
+            if module is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return module
+
+        # Honour coding declarations and BOMs; a lossy decode no longer matches the file's bytes
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+        source = data.decode(encoding, errors='ignore')
+        tree = ast.parse(source, filename=path)
+        module = ParsedModule(path, source, content_hash, tree, exact_bytes=source.encode('utf-8') == data)
+
+        with self._lock:
+            self.misses += 1
+            self._store(key, module)
+        return module
+
+    def _store(self, key: Tuple[str, str], module: ParsedModule) -> None:
+        if key not in self._entries:
+            self._entries[key] = module
+            self.current_bytes += module.size
+
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
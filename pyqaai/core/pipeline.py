@@ -0,0 +1,442 @@
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pyqaai.core.backends import LLMBackend
+from pyqaai.core.cascade import DECIDED_BY_FIELD, DEFAULT_CASCADE_TIERS, DEFAULT_MIN_CONFIDENCE, ModelCascade
+from pyqaai.core.code_analyser import CodeAnalyser
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.context_builder import AssembledContext, ContextBuilder, DEFAULT_CONTEXT_TOKEN_BUDGET
+from pyqaai.core.llm import LLM, RESPONSE_TOKENS_PER_CHECK
+from pyqaai.core.prompt_layout import render_template
+from pyqaai.core.response_cache import ResponseCache, DEFAULT_TTL_SECONDS, DEFAULT_MAX_ENTRIES
+from pyqaai.core.stage_graph import StageGraph
+from pyqaai.core.static_checks import StaticFacts, analyse_definition, apply_static_rules
+from pyqaai.models.models import CodeElement
+from pyqaai.static.prompts import CHECK_PROMPT, CHECK_PROMPT_BATCH, STATIC_FACTS_PROMPT, SYSTEM_PROMPT, QA_CONTEXT_SECTIONS, QA_PROMPTS
+
+# Sections of the gathered context, in the order they are gathered; see QA_CONTEXT_SECTIONS.
+CONTEXT_SECTIONS = ("imports", "callees", "callers")
+
+
+class TargetContext:
+    """
+    Everything gathered about one function or class before it is sent to the model.
+    """
+    def __init__(self, file_path: str, name: str, element: CodeElement):
+        self.file_path = file_path
+        self.name = name
+        self.element = element
+        self.target_path = file_path
+        # Read once while gathering, so every prompt and the report see the same code
+        self.qa_code: Optional[str] = None
+        self.invoked_functions: Dict[str, str] = {}
+        self.imported_modules: Dict[str, str] = {}
+        self.import_statements: List[str] = []
+        self.local_imported_functions_classes: Dict[str, str] = {}
+        self.caller_methods: Dict[str, str] = {}
+        self.assembled_context: Optional[AssembledContext] = None
+        self.static_facts: Optional[StaticFacts] = None
+
+    @property
+    def code_context(self) -> Dict[str, Any]:
+        """
+        Keyword arguments for LLM.generate_response, using the budgeted context when available.
+        """
+        assembled = self.assembled_context
+        return {
+            "import_statements": self.import_statements,
+            "local_imported_functions_classes": assembled.local_imported_functions_classes if assembled else self.local_imported_functions_classes,
+            "caller_methods": assembled.caller_methods if assembled else self.caller_methods,
+            "qa_code": self.qa_code,
+            "invoked_functions": assembled.invoked_functions if assembled else self.invoked_functions,
+        }
+
+    def section_context(self, context_builder: ContextBuilder, sections: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        Like ``code_context`` but holding only the given context sections, budgeted on
+        their own.
+        """
+        if set(sections) == set(CONTEXT_SECTIONS) and self.assembled_context is not None:
+            return self.code_context
+        assembled = context_builder.build(
+            self.target_path,
+            self.invoked_functions if "callees" in sections else {},
+            self.local_imported_functions_classes if "imports" in sections else {},
+            self.caller_methods if "callers" in sections else {},
+        )
+        return {
+            "import_statements": self.import_statements if "imports" in sections else [],
+            "local_imported_functions_classes": assembled.local_imported_functions_classes,
+            "caller_methods": assembled.caller_methods,
+            "qa_code": self.qa_code,
+            "invoked_functions": assembled.invoked_functions,
+        }
+
+
+def create_llm(config: Dict[str, Any],
+               api_key: Optional[str],
+               organisation: Optional[str],
+               project_root: str,
+               no_cache: bool = False,
+               refresh: bool = False,
+               stream: bool = False,
+               backend: Optional[LLMBackend] = None) -> LLM:
+    response_cache = None
+    if not no_cache:
+        try:
+            response_cache = ResponseCache.for_project(
+                project_root,
+                ttl_seconds=config.get("RESPONSE_CACHE_TTL_SECONDS") or DEFAULT_TTL_SECONDS,
+                max_entries=config.get("RESPONSE_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES,
+                refresh=refresh,
+            )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Response cache unavailable, continuing without it: {e}")
+
+    return LLM(
+        api_key=api_key,
+        organisation=organisation,
+        model=config.get("LLM_MODEL"),
+        stream=stream,
+        max_concurrency=config.get("MAX_CONCURRENCY") or 4,
+        requests_per_minute=config.get("REQUESTS_PER_MINUTE"),
+        tokens_per_minute=config.get("TOKENS_PER_MINUTE"),
+        context_window=config.get("CONTEXT_WINDOW") or 128000,
+        response_cache=response_cache,
+        backend=backend,
+    )
+
+
+def create_context_builder(config: Dict[str, Any], llm: LLM) -> ContextBuilder:
+    return ContextBuilder(token_budget=config.get("CONTEXT_TOKEN_BUDGET") or DEFAULT_CONTEXT_TOKEN_BUDGET, model=llm.model)
+
+
+def create_cascade(config: Dict[str, Any], llm: LLM, model: Optional[str] = None) -> Optional[ModelCascade]:
+    """
+    The screening cascade configured by ``CASCADE_MODEL`` (or ``model``), or None.
+    """
+    model = model or config.get("CASCADE_MODEL")
+    if not model:
+        return None
+    if model == llm.model:
+        print(f"Cascade model {model} is the main model, screening disabled.")
+        return None
+    return ModelCascade(
+        llm.with_model(model),
+        tiers=config.get("CASCADE_TIERS") or DEFAULT_CASCADE_TIERS,
+        min_confidence=config.get("CASCADE_MIN_CONFIDENCE") or DEFAULT_MIN_CONFIDENCE,
+    )
+
+
+def _new_target_context(code_analyser: CodeAnalyser, file_path: str, name: str, element: CodeElement) -> TargetContext:
+    target = TargetContext(file_path, name, element)
+    target.target_path = os.path.relpath(os.path.abspath(file_path), code_analyser.project_root)
+    # Raises StaleSourceError if the file changed since the element was read
+    target.qa_code = element.code
+    return target
+
+
+def _gather_steps(code_analyser: CodeAnalyser, context_builder: ContextBuilder, target: TargetContext, refresh_index: bool, static_checks: bool, quiet: bool) -> Dict[str, Callable[[], None]]:
+    """
+    The steps that fill in a target's context, by stage name, in the order they run when
+    gathered one after another. Each step sets its part of ``target``.
+    """
+    file_path, name = target.file_path, target.name
+    short_name = name.split(".")[-1]
+
+    def static_analysis():
+        target.static_facts = analyse_definition(file_path, name)
+
+    def extract_callee_functions():
+        target.invoked_functions = code_analyser.extract_callee_functions(file_path, short_name, qualname=name)
+
+    def get_imported_modules():
+        target.imported_modules, target.import_statements = code_analyser.get_imported_modules(file_path)
+
+    def extract_local_imported_functions():
+        target.local_imported_functions_classes = code_analyser.extract_local_imported_functions(target.imported_modules, file_path, quiet=quiet)
+
+    def find_callers_of_function():
+        target.caller_methods = code_analyser.find_callers_of_function(short_name, refresh_index=refresh_index,
+                                                                          target_path=file_path, target_qualname=name, quiet=quiet)
+
+    def build_context():
+        target.assembled_context = context_builder.build(target.target_path, target.invoked_functions, target.local_imported_functions_classes, target.caller_methods)
+
+    steps = [extract_callee_functions, get_imported_modules, extract_local_imported_functions, find_callers_of_function, build_context]
+    if static_checks:
+        steps.insert(0, static_analysis)
+    return {step.__name__: step for step in steps}
+
+
+def gather_target_context(code_analyser: CodeAnalyser, context_builder: ContextBuilder, file_path: str, name: str, element: CodeElement, refresh_index: bool = True, static_checks: bool = False, quiet: bool = False) -> TargetContext:
+    target = _new_target_context(code_analyser, file_path, name, element)
+    tracer = get_tracer()
+    for stage_name, step in _gather_steps(code_analyser, context_builder, target, refresh_index, static_checks, quiet).items():
+        with tracer.span(stage_name):
+            step()
+    return target
+
+
+def section_groups(task_key: str) -> Dict[Tuple[str, ...], List[str]]:
+    """
+    The categories of a tier grouped by the context sections they need, fewest sections
+    first. Checks of a group share their whole prompt prefix.
+    """
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for category in QA_PROMPTS[task_key]:
+        sections = QA_CONTEXT_SECTIONS.get(category, CONTEXT_SECTIONS)
+        groups.setdefault(tuple(section for section in CONTEXT_SECTIONS if section in sections), []).append(category)
+    return dict(sorted(groups.items(), key=lambda group: len(group[0])))
+
+
+def section_label(sections: Tuple[str, ...]) -> str:
+    if set(sections) == set(CONTEXT_SECTIONS):
+        return "all"
+    return "+".join(sections) if sections else "code"
+
+
+def build_check_prompts(task_key: str) -> Tuple[List[str], List[Dict[str, str]], List[str]]:
+    """
+    Returns the categories, return structures and per-check prompts of a tier.
+    """
+    categories = []
+    return_structures = []
+    check_prompts = []
+    for category, question in QA_PROMPTS[task_key].items():
+        # Prepare the initial return structure
+        return_structure = {
+            "qa_check_prompt": f"{category}: {question}",
+            "pass": "True or False",  # Placeholder for LLM to decide
+            "justification": "Detailed technical prose explanation in markdown for 'pass' verdict."  # Placeholder for LLM to provide reasoning
+        }
+        categories.append(category)
+        return_structures.append(return_structure)
+
+        # Prepare the check prompt with the current question and return structure
+        check_prompts.append(render_template(CHECK_PROMPT, filled_structure=return_structure))
+
+    return categories, return_structures, check_prompts
+
+
+def run_tier_checks(llm: LLM,
+                    task_key: str,
+                    code_context: Dict[str, Any],
+                    batch_checks: bool = False,
+                    on_response: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None,
+                    on_notice: Optional[Callable[[str], None]] = None,
+                    on_delta: Optional[Callable[[int, str], None]] = None,
+                    cascade: Optional[ModelCascade] = None,
+                    static_facts: Optional[StaticFacts] = None,
+                    categories: Optional[List[str]] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Runs every check of a tier, or only those of ``categories``, and returns the
+    responses in category order; indices passed to the callbacks follow that order. With
+    ``static_facts``, checks that static analysis decides are answered without a model
+    call and the others get the relevant facts appended to their prompt. With a
+    ``cascade`` covering the tier, checks are screened by its cheaper model first and
+    only the ones it does not confidently pass go to ``llm``. With ``batch_checks`` the
+    remaining checks are first tried as a single batched request; checks it did not
+    answer run individually and concurrently. When the LLM streams, ``on_delta``
+    receives (index, text) as each check's justification is generated. Each response
+    names the model that decided it in ``decided_by``.
+    """
+    with get_tracer().span("run_tier_checks", task=task_key):
+        return _run_tier_checks(llm, task_key, code_context, batch_checks, on_response, on_notice, on_delta, cascade, static_facts, categories)
+
+
+def _run_tier_checks(llm, task_key, code_context, batch_checks, on_response, on_notice, on_delta, cascade, static_facts, selected) -> List[Optional[Dict[str, Any]]]:
+    categories, return_structures, check_prompts = build_check_prompts(task_key)
+    if selected is not None:
+        indices = [index for index, category in enumerate(categories) if category in selected]
+        categories = [categories[index] for index in indices]
+        return_structures = [return_structures[index] for index in indices]
+        check_prompts = [check_prompts[index] for index in indices]
+    system_prompt = render_template(SYSTEM_PROMPT)
+    total_questions = len(categories)
+    facts_sheets = [""] * total_questions
+
+    def notify(index, response):
+        if response and DECIDED_BY_FIELD not in response:
+            response[DECIDED_BY_FIELD] = llm.model
+        if on_response is not None:
+            on_response(index, response)
+
+    responses: List[Optional[Dict[str, Any]]] = [None] * total_questions
+    pending = list(range(total_questions))
+
+    # Mechanically decidable checks are answered from the AST; the rest get its facts
+    if static_facts is not None:
+        for index, category in enumerate(categories):
+            response, facts_sheets[index] = apply_static_rules(static_facts, category, QA_PROMPTS[task_key][category])
+            if response is not None:
+                responses[index] = response
+                notify(index, response)
+            elif facts_sheets[index]:
+                check_prompts[index] += render_template(STATIC_FACTS_PROMPT, facts=facts_sheets[index])
+        pending = [index for index in pending if responses[index] is None]
+        return_structures = [return_structures[index] for index in pending]
+
+    # The cheap model's confident passes are kept; everything else is escalated
+    if cascade is not None and cascade.applies(task_key) and pending:
+        screen_prompts = [
+            render_template(CHECK_PROMPT, filled_structure=cascade.screen_structure(structure))
+            + (render_template(STATIC_FACTS_PROMPT, facts=facts_sheets[index]) if facts_sheets[index] else "")
+            for index, structure in zip(pending, return_structures)
+        ]
+        screened = cascade.screen(system_prompt, screen_prompts, code_context, on_accept=lambda position, response: notify(pending[position], response))
+        for index, response in zip(pending, screened):
+            responses[index] = response
+        pending = [index for index in pending if responses[index] is None]
+        return_structures = [return_structures[index] for index in pending]
+
+    # Batched mode sends the shared context once for every check of the tier
+    if batch_checks and pending:
+        batch_check_prompt = render_template(CHECK_PROMPT_BATCH, filled_structure=return_structures)
+        batch_facts = "\n".join(f"{categories[index]}:\n{facts_sheets[index]}" for index in pending if facts_sheets[index])
+        if batch_facts:
+            batch_check_prompt += render_template(STATIC_FACTS_PROMPT, facts=batch_facts)
+        if llm.fits_context(system_prompt, reserved_tokens=len(pending) * RESPONSE_TOKENS_PER_CHECK, check_prompt=batch_check_prompt, **code_context):
+            batch_responses = llm.generate_batch_response(system_prompt, batch_check_prompt, return_structures, **code_context)
+            if batch_responses is not None:
+                for index, response in zip(pending, batch_responses):
+                    if response:
+                        responses[index] = response
+                        notify(index, response)
+                pending = [index for index in pending if responses[index] is None]
+        elif on_notice is not None:
+            on_notice("Batched prompt exceeds the context budget, running checks individually.")
+
+    # Remaining checks run concurrently, bounded by MAX_CONCURRENCY and the rate limits
+    if pending:
+        pending_responses = llm.generate_responses(
+            system_prompt,
+            [check_prompts[index] for index in pending],
+            on_response=lambda position, response: notify(pending[position], response),
+            on_delta=(lambda position, text: on_delta(pending[position], text)) if on_delta is not None else None,
+            **code_context
+        )
+        for index, response in zip(pending, pending_responses):
+            responses[index] = response
+
+    return responses
+
+
+def run_section_checks(llm: LLM,
+                       context_builder: ContextBuilder,
+                       task_key: str,
+                       target: TargetContext,
+                       batch_checks: bool = False,
+                       on_response: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None,
+                       on_notice: Optional[Callable[[str], None]] = None,
+                       cascade: Optional[ModelCascade] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Runs the checks of a tier for a fully gathered target one section group at a time,
+    each with only the context sections its checks need (see ``section_groups``).
+    """
+    categories = list(QA_PROMPTS[task_key])
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(categories)
+    for sections, group in section_groups(task_key).items():
+        group_responses = run_tier_checks(
+            llm,
+            task_key,
+            target.section_context(context_builder, sections),
+            batch_checks=batch_checks,
+            on_response=(lambda position, response, group=group: on_response(categories.index(group[position]), response)) if on_response is not None else None,
+            on_notice=on_notice,
+            cascade=cascade,
+            static_facts=target.static_facts,
+            categories=group,
+        )
+        for category, response in zip(group, group_responses):
+            responses[categories.index(category)] = response
+    return responses
+
+
+def check_target(code_analyser: CodeAnalyser,
+                 context_builder: ContextBuilder,
+                 llm: LLM,
+                 file_path: str,
+                 name: str,
+                 element: CodeElement,
+                 task_key: Optional[str] = None,
+                 refresh_index: bool = True,
+                 static_checks: bool = False,
+                 batch_checks: bool = False,
+                 cascade: Optional[ModelCascade] = None,
+                 on_stage: Optional[Callable[[str, TargetContext], None]] = None,
+                 on_response: Optional[Callable[[int, Optional[Dict[str, Any]]], None]] = None,
+                 on_notice: Optional[Callable[[str], None]] = None,
+                 on_delta: Optional[Callable[[int, str], None]] = None) -> Tuple[TargetContext, List[Optional[Dict[str, Any]]], StageGraph]:
+    """
+    Gathers the context of one target and runs the checks of ``task_key`` (if it is a
+    tier) as a stage graph. Code analysis runs on one thread, fastest stages first, and
+    each section group of checks is sent as soon as the sections it needs are gathered,
+    so checks that do not need callers run while the caller scan is still going.
+    ``on_stage`` is called with the stage name and target after each analysis stage and
+    ``on_response`` with (index, response) as checks finish, one call at a time.
+    Returns the target with its full context, the responses in category order and the
+    finished graph, whose critical path shows which stages the run waited on.
+    """
+    groups = section_groups(task_key) if task_key in QA_PROMPTS else {}
+    categories = list(QA_PROMPTS[task_key]) if groups else []
+    responses: List[Optional[Dict[str, Any]]] = [None] * len(categories)
+    target = _new_target_context(code_analyser, file_path, name, element)
+    # Progress output stays off: check groups print their results meanwhile
+    steps = _gather_steps(code_analyser, context_builder, target, refresh_index, static_checks and bool(groups), quiet=True)
+    graph = StageGraph(executors={"analysis": 1, "llm": max(1, len(groups))})
+    # Groups finish on different threads; responses are still reported one at a time
+    response_lock = threading.Lock()
+
+    def report_response(position, response):
+        with response_lock:
+            on_response(position, response)
+
+    def analysis_stage(stage_name, run):
+        def stage(_):
+            run()
+            if on_stage is not None:
+                on_stage(stage_name, target)
+        return stage
+
+    # Ready analysis stages start in the order of the steps, so the slow caller scan goes last
+    section_stages = {"imports": "extract_local_imported_functions", "callees": "extract_callee_functions", "callers": "find_callers_of_function"}
+    dependencies = {"extract_local_imported_functions": ["get_imported_modules"]}
+    static_stage = ["static_analysis"] if "static_analysis" in steps else []
+    build_context = steps.pop("build_context")
+    for stage_name, step in steps.items():
+        graph.add(stage_name, analysis_stage(stage_name, step), dependencies.get(stage_name, []), executor="analysis")
+    graph.add("build_context", lambda _: build_context(), list(section_stages.values()))
+
+    for sections, group in groups.items():
+        label = section_label(sections)
+        context_stage = "build_context"
+        if set(sections) != set(CONTEXT_SECTIONS):
+            context_stage = f"build_context[{label}]"
+            graph.add(context_stage, lambda _, sections=sections: target.section_context(context_builder, sections),
+                      [section_stages[section] for section in sections] + static_stage)
+
+        def run_group(inputs, group=group, context_stage=context_stage):
+            code_context = inputs[context_stage] if context_stage != "build_context" else target.code_context
+            positions = [categories.index(category) for category in group]
+            group_responses = run_tier_checks(
+                llm,
+                task_key,
+                code_context,
+                batch_checks=batch_checks,
+                on_response=(lambda position, response: report_response(positions[position], response)) if on_response is not None else None,
+                on_notice=on_notice,
+                on_delta=(lambda position, text: on_delta(positions[position], text)) if on_delta is not None else None,
+                cascade=cascade,
+                static_facts=target.static_facts,
+                categories=group,
+            )
+            for position, response in zip(positions, group_responses):
+                responses[position] = response
+
+        graph.add(f"checks[{label}]", run_group, [context_stage] + static_stage, executor="llm")
+
+    graph.run()
+    return target, responses, graph
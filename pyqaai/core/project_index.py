@@ -0,0 +1,273 @@
+import ast
+import hashlib
+import os
+import sqlite3
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.worker_pool import WorkerPool, get_worker_pool
+
+INDEX_DIRECTORY = ".pyqaai"
+INDEX_FILENAME = "index.sqlite"
+INDEX_SCHEMA_VERSION = 2
+
+
+def hash_content(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class IndexVisitor(ast.NodeVisitor):
+    """
+    Collects every definition and every call site of a module in a single pass.
+    """
+    def __init__(self):
+        self.definitions: List[Tuple] = []
+        self.calls: List[Tuple] = []
+        self._scopes: List[ast.AST] = []
+        self._names: List[str] = []
+
+    def _visit_scope(self, node):
+        self._names.append(node.name)
+        qualname = ".".join(self._names)
+        self.definitions.append((
+            node.name, qualname, node.__class__.__name__,
+            node.lineno, node.col_offset, node.end_lineno, node.end_col_offset,
+        ))
+        self._scopes.append(node)
+        self.generic_visit(node)
+        self._scopes.pop()
+        self._names.pop()
+
+    visit_FunctionDef = _visit_scope
+    visit_AsyncFunctionDef = _visit_scope
+    visit_ClassDef = _visit_scope
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            callee = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            callee = node.func.attr
+        else:
+            callee = None
+
+        # Calls at module level have no enclosing caller and are not recorded.
+        if callee and self._scopes:
+            scope = self._scopes[-1]
+            self.calls.append((
+                callee, node.lineno, ".".join(self._names), scope.__class__.__name__,
+                scope.lineno, scope.col_offset, scope.end_lineno, scope.end_col_offset,
+            ))
+        self.generic_visit(node)
+
+
+def index_file(file_path: str) -> Tuple[str, List[Tuple], List[Tuple]]:
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+            content = file.read()
+        tree = ast.parse(content, filename=file_path)
+    except Exception:
+        return file_path, [], []
+
+    visitor = IndexVisitor()
+    visitor.visit(tree)
+    return file_path, visitor.definitions, visitor.calls
+
+
+def read_source_file(path: str) -> Optional[str]:
+    """
+    The text of a file without parsing it, or None if it cannot be read.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def read_source_span(source: str, lineno: int, col_offset: int, end_lineno: int, end_col_offset: int) -> Optional[str]:
+    span = SimpleNamespace(lineno=lineno, col_offset=col_offset, end_lineno=end_lineno, end_col_offset=end_col_offset)
+    return ast.get_source_segment(source, span)
+
+
+class ProjectIndex:
+    """
+    On-disk index of every definition and call site in a project, stored as SQLite
+    under ``<project_root>/.pyqaai``. Files are only re-parsed when their size, mtime
+    and content hash show they have changed since the last update.
+    """
+    def __init__(self, project_root: str, index_path: Optional[str] = None, worker_pool: Optional[WorkerPool] = None):
+        self.project_root = project_root
+        self.worker_pool = worker_pool or get_worker_pool()
+        if index_path is None:
+            index_path = os.path.join(project_root, INDEX_DIRECTORY, INDEX_FILENAME)
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        # Callers serialise access; the daemon uses the index from its request threads.
+        self.connection = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_SCHEMA_VERSION:
+            self.connection.executescript(
+                """
+                DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS definitions;
+                DROP TABLE IF EXISTS calls;
+                """
+            )
+
+        self.connection.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS definitions (
+                path TEXT NOT NULL,
+                name TEXT NOT NULL,
+                qualname TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                lineno INTEGER NOT NULL,
+                col_offset INTEGER NOT NULL,
+                end_lineno INTEGER NOT NULL,
+                end_col_offset INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS calls (
+                path TEXT NOT NULL,
+                callee TEXT NOT NULL,
+                call_lineno INTEGER NOT NULL,
+                caller_qualname TEXT NOT NULL,
+                caller_kind TEXT NOT NULL,
+                caller_lineno INTEGER NOT NULL,
+                caller_col_offset INTEGER NOT NULL,
+                caller_end_lineno INTEGER NOT NULL,
+                caller_end_col_offset INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS definitions_name ON definitions (name);
+            CREATE INDEX IF NOT EXISTS definitions_path ON definitions (path);
+            CREATE INDEX IF NOT EXISTS calls_callee ON calls (callee);
+            CREATE INDEX IF NOT EXISTS calls_path ON calls (path);
+            PRAGMA user_version = {INDEX_SCHEMA_VERSION};
+            """
+        )
+        self.connection.commit()
+
+    def _find_stale_files(self, python_files: List[str]) -> Tuple[List[str], List[str]]:
+        known = {
+            path: (mtime_ns, size, content_hash)
+            for path, mtime_ns, size, content_hash in self.connection.execute("SELECT path, mtime_ns, size, content_hash FROM files")
+        }
+
+        stale = []
+        for file_path in python_files:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+
+            previous = known.pop(file_path, None)
+            if previous is not None and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+                continue
+
+            try:
+                with open(file_path, 'rb') as file:
+                    content_hash = hash_content(file.read())
+            except OSError:
+                continue
+
+            if previous is not None and previous[2] == content_hash:
+                # Touched but unchanged, so only the stat fields need refreshing.
+                self.connection.execute(
+                    "UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?",
+                    (stat.st_mtime_ns, stat.st_size, file_path),
+                )
+                continue
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, content_hash) VALUES (?, ?, ?, ?)",
+                (file_path, stat.st_mtime_ns, stat.st_size, content_hash),
+            )
+            stale.append(file_path)
+
+        removed = list(known)
+        return stale, removed
+
+    def _store_file(self, file_path: str, definitions: List[Tuple], calls: List[Tuple]) -> None:
+        self.connection.execute("DELETE FROM definitions WHERE path = ?", (file_path,))
+        self.connection.execute("DELETE FROM calls WHERE path = ?", (file_path,))
+        self.connection.executemany(
+            "INSERT INTO definitions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(file_path, *definition) for definition in definitions],
+        )
+        self.connection.executemany(
+            "INSERT INTO calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(file_path, *call) for call in calls],
+        )
+
+    def update(self, python_files: List[str], show_progress: bool = True) -> Tuple[int, int]:
+        """
+        Brings the index in line with the given file list. Returns the number of
+        re-indexed and removed files.
+        """
+        tracer = get_tracer()
+        with tracer.span("index.find_stale_files", files=len(python_files)):
+            stale, removed = self._find_stale_files(python_files)
+
+        for file_path in removed:
+            self.connection.execute("DELETE FROM files WHERE path = ?", (file_path,))
+            self.connection.execute("DELETE FROM definitions WHERE path = ?", (file_path,))
+            self.connection.execute("DELETE FROM calls WHERE path = ?", (file_path,))
+
+        if stale:
+            with tracer.span("index.parse_files", files=len(stale)), tqdm(total=len(stale), desc="Indexing files", disable=not show_progress) as pbar:
+                for results in self.worker_pool.map_files(index_file, stale):
+                    for file_path, definitions, calls in results:
+                        self._store_file(file_path, definitions, calls)
+                    pbar.update(len(results))
+
+        self.connection.commit()
+        return len(stale), len(removed)
+
+    def find_call_sites(self, function_name: str) -> List[Tuple[str, str, str, int, int, int, int]]:
+        """
+        Returns one row per distinct caller scope of ``function_name``:
+        (path, caller_qualname, caller_kind, lineno, col_offset, end_lineno, end_col_offset).
+        """
+        return self.connection.execute(
+            """
+            SELECT DISTINCT path, caller_qualname, caller_kind, caller_lineno, caller_col_offset, caller_end_lineno, caller_end_col_offset
+            FROM calls WHERE callee = ?
+            ORDER BY path, caller_lineno
+            """,
+            (function_name,),
+        ).fetchall()
+
+    def find_definitions(self, name: str) -> List[Tuple[str, str, str, int, int]]:
+        return self.connection.execute(
+            "SELECT path, qualname, kind, lineno, end_lineno FROM definitions WHERE name = ? ORDER BY path, lineno",
+            (name,),
+        ).fetchall()
+
+    def find_callers(self, function_name: str) -> Dict[str, str]:
+        callers = {}
+        sources: Dict[str, str] = {}
+
+        for path, qualname, kind, lineno, col_offset, end_lineno, end_col_offset in self.find_call_sites(function_name):
+            if path not in sources:
+                sources[path] = read_source_file(path)
+            if sources[path] is None:
+                continue
+
+            caller_name = f"{os.path.relpath(path, self.project_root)}:{kind}:{qualname.split('.')[-1]}"
+            callers[caller_name] = read_source_span(sources[path], lineno, col_offset, end_lineno, end_col_offset)
+
+        return callers
+
+    def close(self) -> None:
+        self.connection.close()
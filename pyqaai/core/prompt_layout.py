@@ -0,0 +1,70 @@
+import json
+from typing import Any, Dict, List, Optional
+
+CONTEXT_START = "--CODE STARTING--"
+CONTEXT_END = "------"
+
+
+def canonical_json(value: Any) -> str:
+    """
+    JSON for values embedded in prompts. Unlike ``repr`` it does not depend on set or
+    dict iteration order differences between runs: sets are sorted and dicts keep the
+    order they were written in.
+    """
+    def default(item):
+        if isinstance(item, (set, frozenset)):
+            return sorted(item)
+        raise TypeError(f"{type(item).__name__} is not JSON serialisable")
+    return json.dumps(value, ensure_ascii=False, default=default)
+
+
+def render_statements(statements: Optional[List[str]]) -> str:
+    """
+    Sorted, de-duplicated statements, one per line.
+    """
+    return "\n".join(sorted({statement.strip() for statement in statements or [] if statement and statement.strip()}))
+
+
+def render_definitions(definitions: Optional[Dict[str, Any]]) -> str:
+    """
+    Named definitions sorted by name, each under a ``# name`` line.
+    """
+    parts = []
+    for name in sorted(definitions or {}):
+        code = definitions[name]
+        parts.append(f"# {name}\n{code if isinstance(code, str) else canonical_json(code)}".rstrip())
+    return "\n\n".join(parts)
+
+
+def render_code_context(import_statements: Optional[List[str]] = None,
+                        local_imported_functions_classes: Optional[Dict[str, Any]] = None,
+                        caller_methods: Optional[Dict[str, Any]] = None,
+                        qa_code: Optional[str] = None,
+                        invoked_functions: Optional[Dict[str, Any]] = None) -> str:
+    """
+    The shared code context of every check of a target, byte-identical for the same
+    inputs. Sections run from the most widely shared (imports) to the most specific
+    (the target code), so checks of neighbouring targets can share a prefix too.
+    """
+    sections = [
+        ("Import Statements", render_statements(import_statements)),
+        ("Locally Imported Functions/Classes", render_definitions(local_imported_functions_classes)),
+        ("Invoked Functions", render_definitions(invoked_functions)),
+        ("Caller Methods", render_definitions(caller_methods)),
+    ]
+    message = f"{CONTEXT_START}\n\n"
+    for title, body in sections:
+        if body:
+            message += f"{title}:\n{body}\n\n"
+    message += f"{CONTEXT_END}\n"
+    if qa_code:
+        message += f"Code to perform QA Checks on:\n{qa_code}"
+    return message
+
+
+def render_template(template: tuple, **values: Any) -> str:
+    """
+    Joins a prompt template from ``pyqaai.static.prompts`` and fills it, serialising
+    structured values with ``canonical_json``.
+    """
+    return "\n".join(template).format(**{key: value if isinstance(value, str) else canonical_json(value) for key, value in values.items()})
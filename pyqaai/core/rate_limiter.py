@@ -0,0 +1,58 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+    ``acquire`` blocks until the requested amount is available.
+    """
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Takes ``amount`` tokens, waiting as long as needed. Requests larger than the
+        bucket are capped at its capacity so they can still proceed. Returns the time waited.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """
+    Combines a requests-per-minute and a tokens-per-minute bucket. Either limit may be
+    left unset, in which case it is not enforced.
+    """
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, tokens: int = 0) -> float:
+        waited = 0.0
+        if self.request_bucket is not None:
+            waited += self.request_bucket.acquire(1)
+        if self.token_bucket is not None and tokens:
+            waited += self.token_bucket.acquire(tokens)
+        return waited
@@ -3,70 +3,171 @@ import os
 import markdown  # Import the markdown library
 import html
 
+DEFAULT_SECTION = "main"
+REPORT_FOOT = "</body></html>"
+
+
+def resolve_report_path(report_file: str) -> str:
+    # Relative report paths are saved in ../data-out/
+    return os.path.join(os.path.dirname(__file__), "../data-out", report_file)
+
+
+def render_header(title: str, level: int = 1, anchor: str | None = None) -> str:
+    header_tag = f"h{level}"
+    anchor_attribute = f' id="{anchor}"' if anchor else ""
+    return f"<{header_tag}{anchor_attribute}>{title}</{header_tag}>"
+
+
+def render_paragraph(text: str) -> str:
+    # Convert markdown text to HTML
+    return f"<p>{markdown.markdown(text)}</p>"
+
+
+def render_code_block(code: str, code_block_id: str) -> str:
+    # Escape any HTML in the code
+    escaped_code = html.escape(code)
+    # HTML for the copy button and code block
+    return (
+        f'<div style="position: relative; margin-bottom: 1em;">'
+        f'<button onclick="copyToClipboard(\'{code_block_id}\')" '
+        f'style="position: absolute; top: 0; right: 0; padding: 5px 10px;">Copy</button>'
+        f'<pre id="{code_block_id}" style="margin-top: 30px;"><code>{escaped_code}</code></pre>'
+        f'</div>'
+    )
+
+
+def render_result(question: str, passed: bool, justification: str) -> str:
+    color = "green" if passed else "red"
+    result_icon = "&#10003;" if passed else "&#10007;"
+    result_content = f'<p><strong style="color: {color};">{result_icon} {question}</strong></p>'
+    # Convert markdown text in justification to HTML
+    return result_content + f"<p>{markdown.markdown(justification)}</p>"
+
+
+def render_timing_summary(summary_rows: list[dict]) -> str:
+    rows = "".join(
+        f"<tr><td>{html.escape(row['name'])}</td><td>{row['count']}</td><td>{row['total']:.3f}</td>"
+        f"<td>{row['mean']:.3f}</td><td>{row['max']:.3f}</td>"
+        f"<td>{row.get('prompt_tokens', '')}</td><td>{row.get('cached_tokens', '')}</td><td>{row.get('completion_tokens', '')}</td>"
+        f"<td>{row.get('retries', '')}</td><td>{row.get('cache_hit', '')}</td>"
+        f"<td>{format(row['critical_ms'] / 1000, '.3f') if 'critical_ms' in row else ''}</td></tr>"
+        for row in summary_rows
+    )
+    return (
+        "<p><strong>Run Timings:</strong></p>"
+        "<details><summary>Stages and LLM calls</summary><table>"
+        "<tr><th>Span</th><th>Count</th><th>Total s</th><th>Mean s</th><th>Max s</th>"
+        "<th>Prompt tokens</th><th>Cached prompt tokens</th><th>Completion tokens</th><th>Retries</th><th>Cache hits</th><th>Critical path s</th></tr>"
+        f"{rows}</table></details>"
+    )
+
+
+def render_critical_path(critical_path: list[dict]) -> str:
+    rows = "".join(
+        f"<tr><td>{html.escape(row['stage'])}</td><td>{row['start']:.3f}</td><td>{row['duration']:.3f}</td><td>{row['queued']:.3f}</td></tr>"
+        for row in critical_path
+    )
+    return (
+        "<p><strong>Critical Path:</strong></p>"
+        "<table><tr><th>Stage</th><th>Start s</th><th>Duration s</th><th>Queued s</th></tr>"
+        f"{rows}</table>"
+    )
+
+
+def render_cascade_summary(cascade: dict) -> str:
+    def estimate(value, unit=""):
+        return f"{value}{unit}" if value is not None else "n/a"
+    return (
+        "<p><strong>Model Cascade:</strong></p>"
+        f"<p><strong>Decided by {html.escape(cascade['screen_model'])}:</strong> {cascade['decided_by_screen']} of {cascade['checks_screened']} screened checks</p>"
+        f"<p><strong>Escalated to {html.escape(cascade['main_model'])}:</strong> {cascade['escalated']}</p>"
+        f"<p><strong>Screening time:</strong> {cascade['screen_seconds']}s</p>"
+        f"<p><strong>Estimated {html.escape(cascade['main_model'])} time avoided:</strong> {estimate(cascade['main_seconds_avoided'], 's')}</p>"
+        f"<p><strong>Estimated tokens avoided:</strong> {estimate(cascade['prompt_tokens_avoided'])} prompt, {estimate(cascade['completion_tokens_avoided'])} completion</p>"
+    )
+
+
+def report_head(title: str = "QA Report") -> str:
+    return f"<html><head><title>{html.escape(title)}</title>" + COPY_SCRIPT + "</head><body>"
+
+
+# JavaScript for copying code to clipboard
+COPY_SCRIPT = (
+    '<script>'
+    'function copyToClipboard(elementId) {'
+    '  var copyText = document.getElementById(elementId).textContent;'
+    '  navigator.clipboard.writeText(copyText).then(function() {'
+    '    alert("Code copied to clipboard!");'
+    '  }, function(err) {'
+    '    alert("Failed to copy code: " + err);'
+    '  });'
+    '}'
+    '</script>'
+)
+
+
 class HTMLReportGenerator:
+    """
+    A report made of named sections, written in section order. Content is appended to
+    the current section or to a named one, so a section reserved early (such as the code
+    improvement) can be filled in after later sections.
+    """
     def __init__(self, report_file: str = "qa_report.html"):
         try:
-            # Modify the path to save in ../data-out/
-            self.report_file = os.path.join(os.path.dirname(__file__), "../data-out", report_file)
-            self.report_content: list[str] = []
+            self.report_file = resolve_report_path(report_file)
+            self.sections: dict[str, list[str]] = {DEFAULT_SECTION: []}
+            self.current_section = DEFAULT_SECTION
+            self.incremental = False
+            self._code_blocks = 0
         except Exception as e:
             print(f"Error initializing HTMLReportGenerator: {e}")
             raise
 
-    def add_header(self, title: str, level: int = 1, index: int | None = None) -> None:
+    @property
+    def report_content(self) -> list[str]:
+        return [content for section in self.sections.values() for content in section]
+
+    def add_section(self, name: str, make_current: bool = True) -> None:
+        """
+        Appends an empty section after the existing ones.
+        """
+        if name not in self.sections:
+            self.sections[name] = []
+        if make_current:
+            self.current_section = name
+
+    def add_header(self, title: str, level: int = 1, section: str | None = None) -> None:
         try:
-            header_tag = f"h{level}"
-            content = f"<{header_tag}>{title}</{header_tag}>"
-            self._add_content(content, index)
+            self._add_content(render_header(title, level), section)
         except Exception as e:
             print(f"Error adding header: {e}")
             raise
 
-    def add_paragraph(self, text: str, index: int | None = None) -> None:
+    def add_paragraph(self, text: str, section: str | None = None) -> None:
         try:
-            # Convert markdown text to HTML
-            html_content = markdown.markdown(text)
-            content = f"<p>{html_content}</p>"
-            self._add_content(content, index)
+            self._add_content(render_paragraph(text), section)
         except Exception as e:
             print(f"Error adding paragraph: {e}")
             raise
 
-    def add_code_block(self, code: str, index: int | None = None) -> None:
+    def add_code_block(self, code: str, section: str | None = None) -> None:
         try:
-            # Escape any HTML in the code
-            escaped_code = html.escape(code)
-
             # Unique ID for each code block for copying purposes
-            code_block_id = f"code-block-{len(self.report_content)}"
-            
-            # HTML for the copy button and code block
-            content = (
-                f'<div style="position: relative; margin-bottom: 1em;">'
-                f'<button onclick="copyToClipboard(\'{code_block_id}\')" '
-                f'style="position: absolute; top: 0; right: 0; padding: 5px 10px;">Copy</button>'
-                f'<pre id="{code_block_id}" style="margin-top: 30px;"><code>{escaped_code}</code></pre>'
-                f'</div>'
-            )
-            self._add_content(content, index)
+            code_block_id = f"code-block-{self._code_blocks}"
+            self._code_blocks += 1
+            self._add_content(render_code_block(code, code_block_id), section)
         except Exception as e:
             print(f"Error adding code block: {e}")
             raise
 
-    def add_result(self, question: str, passed: bool, justification: str, index: int | None = None) -> None:
+    def add_result(self, question: str, passed: bool, justification: str, section: str | None = None) -> None:
         try:
-            color = "green" if passed else "red"
-            result_icon = "&#10003;" if passed else "&#10007;"
-            result_content = f'<p><strong style="color: {color};">{result_icon} {question}</strong></p>'
-            # Convert markdown text in justification to HTML
-            justification_html = markdown.markdown(justification)
-            content = result_content + f"<p>{justification_html}</p>"
-            self._add_content(content, index)
+            self._add_content(render_result(question, passed, justification), section)
         except Exception as e:
             print(f"Error adding result: {e}")
             raise
 
-    def add_summary(self, invoked_functions: list[str], imported_modules: list[str], caller_methods: list[str], index: int | None = None) -> None:
+    def add_summary(self, invoked_functions: list[str], imported_modules: list[str], caller_methods: list[str], section: str | None = None) -> None:
         try:
             summary_content = (
                 f"<p><strong>Code Inclusion Summary:</strong></p>"
@@ -74,23 +175,105 @@ class HTMLReportGenerator:
                 f"<p><strong>Imported Modules:</strong> {len(imported_modules)}</p>"
                 f"<p><strong>Caller Methods:</strong> {len(caller_methods)}</p>"
             )
-            self._add_content(summary_content, index)
+            self._add_content(summary_content, section)
         except Exception as e:
             print(f"Error adding summary: {e}")
             raise
 
-    def _add_content(self, content: str, index: int | None = None) -> None:
+    def add_context_summary(self, assembled_context, section: str | None = None) -> None:
+        try:
+            rows = "".join(
+                f"<tr><td>{html.escape(item.section)}</td><td>{html.escape(item.name)}</td>"
+                f"<td>{item.tokens}</td><td>{item.status}</td></tr>"
+                for item in assembled_context.items
+            )
+            summary_content = (
+                f"<p><strong>Context Budget:</strong> {assembled_context.tokens_used} of {assembled_context.token_budget} tokens used</p>"
+                f"<p><strong>Included:</strong> {len(assembled_context.items_with_status('included'))}, "
+                f"<strong>Summarised to signatures:</strong> {len(assembled_context.items_with_status('summarised'))}, "
+                f"<strong>Dropped:</strong> {len(assembled_context.items_with_status('dropped'))}</p>"
+            )
+            if rows:
+                summary_content += (
+                    "<details><summary>Context items</summary><table>"
+                    "<tr><th>Section</th><th>Name</th><th>Tokens</th><th>Status</th></tr>"
+                    f"{rows}</table></details>"
+                )
+            self._add_content(summary_content, section)
+        except Exception as e:
+            print(f"Error adding context summary: {e}")
+            raise
+
+    def add_cache_summary(self, hits: int, misses: int, section: str | None = None) -> None:
         try:
-            if index is None or index >= len(self.report_content):
-                self.report_content.append(content)
+            total = hits + misses
+            hit_rate = f"{hits / total:.0%}" if total else "n/a"
+            summary_content = (
+                f"<p><strong>Response Cache:</strong></p>"
+                f"<p><strong>Hits:</strong> {hits}</p>"
+                f"<p><strong>Misses:</strong> {misses}</p>"
+                f"<p><strong>Hit Rate:</strong> {hit_rate}</p>"
+            )
+            self._add_content(summary_content, section)
+        except Exception as e:
+            print(f"Error adding cache summary: {e}")
+            raise
+
+    def enable_incremental_save(self) -> None:
+        """
+        Writes the report to disk as content is added, so finished sections can be read
+        before the run completes. save_report still writes the final, complete file.
+        """
+        self.incremental = True
+        self._write_partial()
+
+    def _write_partial(self, content: str | None = None) -> None:
+        # Appends ``content`` to the file, or rewrites the whole file when it is None.
+        try:
+            os.makedirs(os.path.dirname(self.report_file), exist_ok=True)
+            if content is None:
+                with open(self.report_file, 'w') as file:
+                    file.write(self._get_report_head())
+                    file.write("".join(self.report_content))
             else:
-                self.report_content.insert(index, content)
+                with open(self.report_file, 'a') as file:
+                    file.write(content)
         except Exception as e:
-            print(f"Error adding content: {e}")
+            print(f"Error writing partial report: {e}")
+
+    def add_cascade_summary(self, cascade: dict, section: str | None = None) -> None:
+        try:
+            self._add_content(render_cascade_summary(cascade), section)
+        except Exception as e:
+            print(f"Error adding cascade summary: {e}")
+            raise
+
+    def add_critical_path(self, critical_path: list[dict], section: str | None = None) -> None:
+        try:
+            self._add_content(render_critical_path(critical_path), section)
+        except Exception as e:
+            print(f"Error adding critical path: {e}")
+            raise
+
+    def add_timing_summary(self, summary_rows: list[dict], section: str | None = None) -> None:
+        try:
+            self._add_content(render_timing_summary(summary_rows), section)
+        except Exception as e:
+            print(f"Error adding timing summary: {e}")
             raise
 
-    def get_report_content(self) -> str:
-        return "".join(self.report_content)
+    def _add_content(self, content: str, section: str | None = None) -> None:
+        try:
+            section = section or self.current_section
+            self.add_section(section, make_current=False)
+            self.sections[section].append(content)
+            if self.incremental:
+                # Only content of the last section can be appended; earlier sections move what follows.
+                last_section = next(reversed(self.sections))
+                self._write_partial(content if section == last_section else None)
+        except Exception as e:
+            print(f"Error adding content: {e}")
+            raise
 
     def save_report(self) -> None:
         try:
@@ -98,29 +281,15 @@ class HTMLReportGenerator:
             os.makedirs(os.path.dirname(self.report_file), exist_ok=True)
             
             with open(self.report_file, 'w') as file:
-                file.write("<html><head><title>QA Report</title>")
-                file.write(self._get_copy_script())
-                file.write("</head><body>")
+                file.write(self._get_report_head())
                 file.write("".join(self.report_content))
-                file.write("</body></html>")
+                file.write(REPORT_FOOT)
         except Exception as e:
             print(f"Error saving report: {e}")
             raise
 
-    def _get_copy_script(self) -> str:
-        # JavaScript for copying code to clipboard
-        return (
-            '<script>'
-            'function copyToClipboard(elementId) {'
-            '  var copyText = document.getElementById(elementId).textContent;'
-            '  navigator.clipboard.writeText(copyText).then(function() {'
-            '    alert("Code copied to clipboard!");'
-            '  }, function(err) {'
-            '    alert("Failed to copy code: " + err);'
-            '  });'
-            '}'
-            '</script>'
-        )
+    def _get_report_head(self) -> str:
+        return report_head()
 
     def open_report(self) -> None:
         try:
@@ -0,0 +1,242 @@
+import html
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from pyqaai.core.report_generator import (
+    REPORT_FOOT,
+    render_cascade_summary,
+    render_code_block,
+    render_header,
+    render_paragraph,
+    render_result,
+    render_timing_summary,
+    report_head,
+    resolve_report_path,
+)
+
+DEFAULT_PAGE_SIZE = 200
+# Justifications are shortened in the improvement prompt; the full text is in the report.
+MAX_SUMMARY_JUSTIFICATION_CHARS = 800
+
+
+def failure_summary(checks: List[Dict[str, Any]], max_justification_chars: int = MAX_SUMMARY_JUSTIFICATION_CHARS) -> str:
+    """
+    Compact plain-text summary of check results for the code improvement prompt. Failing
+    checks are listed with their question and justification, passing checks by name only,
+    and informational results (``pass`` is None, e.g. a custom task answer) in full.
+    Checks without a justification had no response and are left out.
+    """
+    def shorten(text: str) -> str:
+        text = " ".join(text.split())
+        return text if len(text) <= max_justification_chars else text[:max_justification_chars].rstrip() + "..."
+
+    failed = [check for check in checks if check.get("pass") is False and check.get("justification")]
+    passed = [check for check in checks if check.get("pass") is True]
+    notes = [check for check in checks if check.get("pass") is None and check.get("justification")]
+
+    lines = []
+    for check in failed:
+        lines.append(f"- FAILED {check['category']}: {check['question']}")
+        lines.append(f"  Reason: {shorten(check['justification'])}")
+    for check in notes:
+        lines.append(f"- {check['category']}: {check['question']}")
+        lines.append(f"  {' '.join(check['justification'].split())}")
+    if passed:
+        lines.append(f"- Passed: {', '.join(check['category'] for check in passed)}")
+    if not failed and not notes:
+        lines.append("- No failing checks.")
+    return "\n".join(lines)
+
+
+class TableOfContentsEntry:
+    __slots__ = ("name", "type", "lineno", "page", "anchor", "passed", "failed", "errored", "reused")
+
+    def __init__(self, name: str, element_type: str, lineno: int, page: int, anchor: str, passed: int, failed: int, errored: int, reused: bool):
+        self.name = name
+        self.type = element_type
+        self.lineno = lineno
+        self.page = page
+        self.anchor = anchor
+        self.passed = passed
+        self.failed = failed
+        self.errored = errored
+        self.reused = reused
+
+
+class BatchReportWriter:
+    """
+    Writes batch results to disk as they arrive, so memory does not grow with the
+    justifications of a large run:
+
+    - ``<report>_pages/page-NNNN.html``: the full results, ``page_size`` targets per page
+    - ``<report>.html``: an index page with the summary, failures and a per-file table of
+      contents linking into the pages, written by ``close``
+    - ``<report>.jsonl``: one result per line, readable while the run is in progress
+    - the results JSON file (default ``<report>.json``): the summary, timings and results
+
+    Only one table-of-contents entry per target is kept in memory.
+    """
+    def __init__(self, report_file: str, task_key: str, results_file: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE):
+        self.report_file = os.path.abspath(resolve_report_path(report_file))
+        self.task_key = task_key
+        base = os.path.splitext(self.report_file)[0]
+        self.results_file = os.path.abspath(results_file) if results_file else base + ".json"
+        self.jsonl_file = base + ".jsonl"
+        self.pages_directory = base + "_pages"
+        self.page_size = max(1, page_size)
+
+        self.targets = 0
+        self.checks_passed = 0
+        self.checks_failed = 0
+        self.checks_errored = 0
+        self.targets_reused = 0
+        self.decided_by: Dict[str, int] = {}
+        self.table_of_contents: Dict[str, List[TableOfContentsEntry]] = {}
+        self._page_file = None
+        self._page = 0
+
+        for path in (self.report_file, self.results_file, self.jsonl_file):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(self.pages_directory, exist_ok=True)
+        self._jsonl = open(self.jsonl_file, "w")
+        self._results = open(self.results_file + ".tmp", "w")
+        self._results.write('{"results": [')
+
+    def page_path(self, page: int) -> str:
+        return os.path.join(self.pages_directory, f"page-{page:04d}.html")
+
+    def _page_link(self, page: int, anchor: str) -> str:
+        return f"{os.path.basename(self.pages_directory)}/{os.path.basename(self.page_path(page))}#{anchor}"
+
+    def _open_page(self) -> None:
+        self._page += 1
+        self._page_file = open(self.page_path(self._page), "w")
+        self._page_file.write(report_head(f"Batch QA Report for {self.task_key}, page {self._page}"))
+        self._page_file.write(f'<p><a href="../{html.escape(os.path.basename(self.report_file))}">Back to the index</a></p>')
+
+    def _close_page(self) -> None:
+        if self._page_file is not None:
+            self._page_file.write(REPORT_FOOT)
+            self._page_file.close()
+            self._page_file = None
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """
+        Writes one target's result to the current page and both sidecar files.
+        """
+        if self._page_file is None or self.targets % self.page_size == 0:
+            self._close_page()
+            self._open_page()
+
+        anchor = f"target-{self.targets}"
+        passed = sum(1 for check in result["checks"] if check["pass"] is True)
+        failed = sum(1 for check in result["checks"] if check["pass"] is False)
+        errored = sum(1 for check in result["checks"] if check["pass"] is None)
+
+        reused_marker = " (reused)" if result["reused"] else ""
+        parts = [render_header(html.escape(f"{result['file']}:{result['lineno']} {result['type']}: {result['name']}{reused_marker}"), level=2, anchor=anchor)]
+        if result["reused"]:
+            parts.append(render_paragraph("*Unchanged since the last run; results reused from the verdict store.*"))
+        if result["error"]:
+            parts.append(render_paragraph(f"Analysis failed: {result['error']}"))
+        parts.append(render_code_block(result["code"] or "", f"code-block-{self.targets}"))
+        for check in result["checks"]:
+            parts.append(render_header(check["category"], level=3))
+            if check["pass"] is not None:
+                parts.append(render_result(check["question"], check["pass"], check["justification"]))
+                if check.get("decided_by"):
+                    parts.append(render_paragraph(f"*Decided by {check['decided_by']}.*"))
+        self._page_file.write("".join(parts))
+
+        serialised = json.dumps(result)
+        self._jsonl.write(serialised + "\n")
+        self._jsonl.flush()
+        self._results.write(("," if self.targets else "") + "\n" + serialised)
+
+        self.table_of_contents.setdefault(result["file"], []).append(
+            TableOfContentsEntry(result["name"], result["type"], result["lineno"], self._page, anchor, passed, failed, errored, result["reused"])
+        )
+        self.targets += 1
+        self.checks_passed += passed
+        self.checks_failed += failed
+        self.checks_errored += errored
+        self.targets_reused += 1 if result["reused"] else 0
+        for check in result["checks"]:
+            if check.get("decided_by"):
+                self.decided_by[check["decided_by"]] = self.decided_by.get(check["decided_by"], 0) + 1
+
+    def summary(self, elapsed: float, cascade: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return {
+            "tier": self.task_key,
+            "targets": self.targets,
+            "checks_passed": self.checks_passed,
+            "checks_failed": self.checks_failed,
+            "checks_errored": self.checks_errored,
+            "targets_reused": self.targets_reused,
+            "decided_by": dict(self.decided_by),
+            "elapsed_seconds": round(elapsed, 3),
+            "targets_per_minute": round(self.targets / elapsed * 60, 2) if elapsed > 0 else None,
+            "pages": self._page,
+            "cascade": cascade,
+        }
+
+    def _render_table_of_contents(self) -> str:
+        parts = ["<h2>Contents</h2>"]
+        for file_path in sorted(self.table_of_contents):
+            entries = sorted(self.table_of_contents[file_path], key=lambda entry: entry.lineno)
+            file_failed = sum(entry.failed for entry in entries)
+            status = f' <strong style="color: red;">{file_failed} failed</strong>' if file_failed else ""
+            parts.append(f"<details{' open' if file_failed else ''}><summary>{html.escape(file_path)} ({len(entries)}){status}</summary><ul>")
+            for entry in entries:
+                counts = f"{entry.passed} passed, {entry.failed} failed" + (f", {entry.errored} without a response" if entry.errored else "")
+                marker = " (reused)" if entry.reused else ""
+                parts.append(
+                    f'<li><a href="{self._page_link(entry.page, entry.anchor)}">{entry.lineno} {html.escape(entry.type)}: '
+                    f"{html.escape(entry.name)}</a>{marker}: {counts}</li>"
+                )
+            parts.append("</ul></details>")
+        return "".join(parts)
+
+    def _render_failures(self) -> str:
+        failing = [(file_path, entry) for file_path in sorted(self.table_of_contents) for entry in self.table_of_contents[file_path] if entry.failed]
+        if not failing:
+            return ""
+        items = "".join(
+            f'<li><a href="{self._page_link(entry.page, entry.anchor)}">{html.escape(file_path)}:{entry.lineno} {html.escape(entry.name)}</a>: {entry.failed} failed</li>'
+            for file_path, entry in failing
+        )
+        return f"<h2>Failing targets</h2><ul>{items}</ul>"
+
+    def close(self, timings: List[Dict[str, Any]], elapsed: float, cascade: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Finishes the pages and sidecar files and writes the index page. Returns the summary,
+        including the model cascade summary if one is given.
+        """
+        self._close_page()
+        self._jsonl.close()
+        summary = self.summary(elapsed, cascade)
+        self._results.write(f'\n], "summary": {json.dumps(summary)}, "timings": {json.dumps(timings)}}}\n')
+        self._results.close()
+        os.replace(self.results_file + ".tmp", self.results_file)
+
+        with open(self.report_file, "w") as file:
+            file.write(report_head(f"Batch QA Report for {self.task_key}"))
+            file.write(render_header(f"Batch QA Report for {self.task_key}", level=1))
+            lines = [
+                f"**Targets:** {summary['targets']}",
+                f"**Checks passed:** {summary['checks_passed']}",
+                f"**Checks failed:** {summary['checks_failed']}",
+                f"**Checks without a response:** {summary['checks_errored']}",
+                f"**Targets with reused results:** {summary['targets_reused']}",
+            ]
+            lines += [f"**Checks decided by {decider}:** {count}" for decider, count in sorted(self.decided_by.items())]
+            lines.append(f"**Pages:** {summary['pages']}")
+            file.write(render_paragraph("  \n".join(lines)))
+            if cascade:
+                file.write(render_cascade_summary(cascade))
+            file.write(self._render_failures())
+            file.write(self._render_table_of_contents())
+            file.write(render_timing_summary(timings))
+            file.write(REPORT_FOOT)
+        return summary
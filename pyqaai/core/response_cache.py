@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from pyqaai.core.project_index import INDEX_DIRECTORY
+
+RESPONSE_CACHE_FILENAME = "responses.sqlite"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class ResponseCache:
+    """
+    On-disk cache of LLM responses keyed by a hash of the model, temperature and the
+    exact messages sent. Entries expire after ``ttl_seconds`` and the least recently
+    used entries are evicted beyond ``max_entries``. With ``refresh`` set, lookups
+    always miss but fresh responses are still stored.
+    """
+    def __init__(self, cache_path: str, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES, refresh: bool = False):
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        self.connection = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+            """
+        )
+        self.connection.commit()
+
+    @classmethod
+    def for_project(cls, project_root: str, **kwargs: Any) -> "ResponseCache":
+        return cls(os.path.join(project_root, INDEX_DIRECTORY, RESPONSE_CACHE_FILENAME), **kwargs)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, messages: list[dict[str, str]]) -> str:
+        payload = json.dumps({"model": model, "temperature": temperature, "messages": messages}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        if self.refresh:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            try:
+                row = self.connection.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    self.misses += 1
+                    return None
+                self.connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache read failed: {e}")
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, response: dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(response), now, now),
+                )
+                self._evict(now)
+                self.connection.commit()
+            except sqlite3.Error as e:
+                print(f"Response cache write failed: {e}")
+
+    def _evict(self, now: float) -> None:
+        self.connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        self.connection.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+
+    def close(self) -> None:
+        self.connection.close()
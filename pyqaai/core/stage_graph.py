@@ -0,0 +1,195 @@
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pyqaai.core.instrumentation import get_tracer
+
+
+class Stage:
+    """
+    One node of a StageGraph. ``function`` is called with the results of the stages it
+    depends on, keyed by stage name. Times are ``time.perf_counter`` values.
+    """
+    def __init__(self, name: str, function: Callable[[Dict[str, Any]], Any], dependencies: Iterable[str], executor: Optional[str], order: int):
+        self.name = name
+        self.function = function
+        self.dependencies = list(dependencies)
+        self.executor = executor
+        self.order = order
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.skipped = False
+        self.ready = 0.0
+        self.start = 0.0
+        self.end = 0.0
+        self.span = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def queued(self) -> float:
+        return self.start - self.ready
+
+
+class StageGraph:
+    """
+    Runs a dependency graph of stages, each as soon as all of its dependencies have
+    finished. Stages run on named executors (``executors`` maps a name to its number of
+    worker threads), where ready stages are started in the order they were added, or,
+    with no executor, inline in the thread that finished their last dependency, which
+    suits cheap stages that must not queue behind slow ones. A failed stage skips every
+    stage depending on it; ``run`` re-raises the first failure once the rest of the graph
+    has finished.
+
+    Every stage is traced as a span. After the run, the spans of the stages on the
+    critical path carry ``critical_ms``: the time the path spent in that stage, including
+    any time it was queued.
+    """
+    def __init__(self, executors: Optional[Dict[str, int]] = None):
+        self.executors = {name: max(1, workers) for name, workers in (executors or {}).items()}
+        self.stages: Dict[str, Stage] = {}
+        self.origin = 0.0
+        self.end = 0.0
+        self._dependents: Dict[str, List[str]] = {}
+        self._remaining: Dict[str, int] = {}
+        self._queues: Dict[str, List[Tuple[int, Stage]]] = {}
+        self._finished = 0
+        self._condition = threading.Condition()
+
+    def add(self, name: str, function: Callable[[Dict[str, Any]], Any], dependencies: Iterable[str] = (), executor: Optional[str] = None) -> None:
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        if executor is not None and executor not in self.executors:
+            raise ValueError(f"Stage {name} uses unknown executor {executor}")
+        stage = Stage(name, function, dependencies, executor, len(self.stages))
+        for dependency in stage.dependencies:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+            self._dependents.setdefault(dependency, []).append(name)
+        self.stages[name] = stage
+
+    def result(self, name: str) -> Any:
+        return self.stages[name].result
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Runs every stage and returns their results by name.
+        """
+        self.origin = time.perf_counter()
+        self._remaining = {name: len(stage.dependencies) for name, stage in self.stages.items()}
+        self._queues = {name: [] for name in self.executors}
+        self._finished = 0
+        workers = [
+            threading.Thread(target=self._work, args=(executor,), name=f"stage-{executor}-{number}", daemon=True)
+            for executor, count in self.executors.items() for number in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        for stage in [stage for stage in self.stages.values() if not stage.dependencies]:
+            self._dispatch(stage)
+        with self._condition:
+            while self._finished < len(self.stages):
+                self._condition.wait()
+            self._condition.notify_all()
+        for worker in workers:
+            worker.join()
+        self.end = time.perf_counter()
+        self._mark_critical_path()
+
+        for stage in sorted(self.stages.values(), key=lambda stage: stage.end):
+            if stage.error is not None:
+                raise stage.error
+        return {name: stage.result for name, stage in self.stages.items()}
+
+    def _dispatch(self, stage: Stage) -> None:
+        stage.ready = time.perf_counter()
+        if stage.executor is None:
+            self._execute(stage)
+            return
+        with self._condition:
+            heapq.heappush(self._queues[stage.executor], (stage.order, stage))
+            self._condition.notify_all()
+
+    def _work(self, executor: str) -> None:
+        queue = self._queues[executor]
+        while True:
+            with self._condition:
+                while not queue and self._finished < len(self.stages):
+                    self._condition.wait()
+                if not queue:
+                    return
+                _, stage = heapq.heappop(queue)
+            self._execute(stage)
+
+    def _execute(self, stage: Stage) -> None:
+        stage.start = time.perf_counter()
+        if any(self.stages[name].error is not None or self.stages[name].skipped for name in stage.dependencies):
+            stage.skipped = True
+        else:
+            inputs = {name: self.stages[name].result for name in stage.dependencies}
+            try:
+                with get_tracer().span(stage.name) as span:
+                    stage.span = span
+                    stage.result = stage.function(inputs)
+            except Exception as e:
+                stage.error = e
+        stage.end = time.perf_counter()
+
+        ready = []
+        with self._condition:
+            for name in self._dependents.get(stage.name, []):
+                self._remaining[name] -= 1
+                if self._remaining[name] == 0:
+                    ready.append(self.stages[name])
+        for dependent in ready:
+            self._dispatch(dependent)
+        with self._condition:
+            self._finished += 1
+            self._condition.notify_all()
+
+    def critical_path(self) -> List[Stage]:
+        """
+        The chain of stages that decided when the graph finished: the last stage to
+        finish, then at each step back the dependency that finished last.
+        """
+        ran = [stage for stage in self.stages.values() if stage.end and not stage.skipped]
+        if not ran:
+            return []
+        path = [max(ran, key=lambda stage: stage.end)]
+        while path[-1].dependencies:
+            path.append(max((self.stages[name] for name in path[-1].dependencies), key=lambda stage: stage.end))
+        return list(reversed(path))
+
+    def critical_path_summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per stage on the critical path: its name, its start relative to the start
+        of the run, and the seconds it ran and was queued, all rounded to milliseconds.
+        """
+        return [
+            {
+                "stage": stage.name,
+                "start": round(stage.start - self.origin, 3),
+                "duration": round(stage.duration, 3),
+                "queued": round(stage.queued, 3),
+            }
+            for stage in self.critical_path()
+        ]
+
+    def format_critical_path(self) -> str:
+        steps = [
+            f"{row['stage']} {row['duration']:.2f}s" + (f" (queued {row['queued']:.2f}s)" if row["queued"] >= 0.01 else "")
+            for row in self.critical_path_summary()
+        ]
+        if not steps:
+            return ""
+        return f"Critical path ({self.end - self.origin:.2f}s): " + " -> ".join(steps)
+
+    def _mark_critical_path(self) -> None:
+        previous_end = self.origin
+        for stage in self.critical_path():
+            if stage.span is not None:
+                stage.span.set(critical_ms=round((stage.end - previous_end) * 1000))
+            previous_end = stage.end
@@ -0,0 +1,228 @@
+import ast
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pyqaai.core.parse_cache import ParsedModule, get_parse_cache, used_names
+
+# Recorded in ``decided_by`` for checks answered without a model call.
+STATIC_DECIDER = "static analysis"
+# Part of the batch prompt fingerprint; bump when the rules or facts change.
+STATIC_CHECKS_VERSION = "1"
+BROAD_EXCEPTIONS = {"Exception", "BaseException"}
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+class StaticFacts:
+    """
+    Facts about one function or class computed from its AST: missing type hints and
+    docstrings, exception handlers, raised exceptions, and the imports it uses next to
+    the imports its module never uses.
+    """
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.missing_annotations: List[str] = []
+        self.missing_docstrings: List[str] = []
+        self.bare_handlers: List[int] = []
+        self.broad_handlers: List[int] = []
+        self.silent_handlers: List[int] = []
+        self.handlers = 0
+        self.raises: List[str] = []
+        self.used_imports: List[str] = []
+        self.unused_module_imports: List[str] = []
+
+
+def _functions(qualname: str, node: ast.AST) -> List[Tuple[str, ast.AST, bool]]:
+    """
+    The function itself, or a class's methods, as (qualified name, node, is_method).
+    """
+    if isinstance(node, FUNCTION_NODES):
+        return [(qualname, node, "." in qualname)]
+    return [(f"{qualname}.{child.name}", child, True) for child in node.body if isinstance(child, FUNCTION_NODES)]
+
+
+def _is_public(name: str) -> bool:
+    short_name = name.split(".")[-1]
+    return not short_name.startswith("_") or (short_name.startswith("__") and short_name.endswith("__"))
+
+
+def _missing_annotations(qualname: str, node: ast.AST, is_method: bool) -> List[str]:
+    arguments = node.args
+    positional = arguments.posonlyargs + arguments.args
+    # self/cls are never annotated; static methods have no implicit first argument
+    is_static = any(isinstance(decorator, ast.Name) and decorator.id == "staticmethod" for decorator in node.decorator_list)
+    if is_method and positional and not is_static:
+        positional = positional[1:]
+    missing = [argument.arg for argument in positional + arguments.kwonlyargs if argument.annotation is None]
+    missing += [f"*{argument.arg}" for argument in (arguments.vararg,) if argument is not None and argument.annotation is None]
+    missing += [f"**{argument.arg}" for argument in (arguments.kwarg,) if argument is not None and argument.annotation is None]
+    descriptions = [f"{qualname}: parameter `{name}`" for name in missing]
+    if node.returns is None and node.name != "__init__":
+        descriptions.append(f"{qualname}: return type")
+    return descriptions
+
+
+def _handler_is_silent(handler: ast.ExceptHandler) -> bool:
+    return all(
+        isinstance(statement, (ast.Pass, ast.Continue)) or (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Constant))
+        for statement in handler.body
+    )
+
+
+def _exception_names(node: Optional[ast.AST]) -> List[str]:
+    if node is None:
+        return []
+    if isinstance(node, ast.Tuple):
+        return [name for element in node.elts for name in _exception_names(element)]
+    if isinstance(node, ast.Call):
+        return _exception_names(node.func)
+    if isinstance(node, ast.Name):
+        return [node.id]
+    if isinstance(node, ast.Attribute):
+        return [node.attr]
+    return []
+
+
+def _module_imports(module: ParsedModule) -> Dict[str, ast.AST]:
+    imports = {}
+    for node in module.tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name.split(".")[0]] = node
+        elif isinstance(node, ast.ImportFrom) and node.module != "__future__":
+            for alias in node.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = node
+    return imports
+
+
+def _exported_names(module: ParsedModule) -> Set[str]:
+    exported = set()
+    for node in module.tree.body:
+        if isinstance(node, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "__all__" for target in node.targets):
+            if isinstance(node.value, (ast.List, ast.Tuple)):
+                exported |= {element.value for element in node.value.elts if isinstance(element, ast.Constant) and isinstance(element.value, str)}
+    return exported
+
+
+def analyse_definition(file_path: str, qualname: str) -> Optional[StaticFacts]:
+    """
+    Static facts for the function or class ``qualname`` of a file, or None if it is not
+    a top-level definition or method of the file.
+    """
+    module = get_parse_cache().get(file_path)
+    node = dict(module.definitions).get(qualname)
+    if node is None:
+        return None
+
+    facts = StaticFacts(qualname, "Class" if isinstance(node, ast.ClassDef) else "Function")
+    if _is_public(qualname) and ast.get_docstring(node) is None:
+        facts.missing_docstrings.append(qualname)
+    for name, function, is_method in _functions(qualname, node):
+        if function is not node and _is_public(name) and ast.get_docstring(function) is None:
+            facts.missing_docstrings.append(name)
+        facts.missing_annotations += _missing_annotations(name, function, is_method)
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.ExceptHandler):
+            facts.handlers += 1
+            names = _exception_names(child.type)
+            if child.type is None:
+                facts.bare_handlers.append(child.lineno)
+            elif BROAD_EXCEPTIONS & set(names):
+                facts.broad_handlers.append(child.lineno)
+            if _handler_is_silent(child):
+                facts.silent_handlers.append(child.lineno)
+        elif isinstance(child, ast.Raise):
+            for name in _exception_names(child.exc):
+                if name not in facts.raises:
+                    facts.raises.append(name)
+
+    imports = _module_imports(module)
+    used_here = used_names(node)
+    facts.used_imports = sorted(name for name in imports if name in used_here)
+    # Imports in a package's __init__ are usually re-exports
+    if not module.path.endswith("__init__.py"):
+        used_in_module = module.used_names | _exported_names(module)
+        facts.unused_module_imports = sorted(name for name in imports if name not in used_in_module)
+    return facts
+
+
+def _lines(items: List[Any]) -> str:
+    return "\n".join(f"- {item}" for item in items)
+
+
+def _handler_lines(line_numbers: List[int], description: str) -> List[str]:
+    return [f"line {lineno}: {description}" for lineno in line_numbers]
+
+
+def _type_hint_facts(facts: StaticFacts) -> str:
+    if not facts.missing_annotations:
+        return "All parameters and return values are annotated."
+    return f"Missing type hints:\n{_lines(facts.missing_annotations)}"
+
+
+def _style_rule(facts: StaticFacts) -> Tuple[Optional[Tuple[bool, str]], str]:
+    if facts.missing_annotations:
+        return (False, f"Type and return hints are not used consistently. Static analysis found missing type hints:\n\n{_lines(facts.missing_annotations)}"), ""
+    return None, _type_hint_facts(facts)
+
+
+def _type_safety_rule(facts: StaticFacts) -> Tuple[Optional[Tuple[bool, str]], str]:
+    return None, _type_hint_facts(facts)
+
+
+def _documentation_rule(facts: StaticFacts) -> Tuple[Optional[Tuple[bool, str]], str]:
+    if facts.missing_docstrings:
+        return (False, f"PEP 257 requires docstrings for public functions, classes and methods. Static analysis found none for:\n\n{_lines(facts.missing_docstrings)}"), ""
+    return None, "Every public function, class and method has a docstring."
+
+
+def _exception_rule(facts: StaticFacts) -> Tuple[Optional[Tuple[bool, str]], str]:
+    # Silently ignoring a specific exception can be a deliberate fallback, so only broad ones decide the check
+    definite = _handler_lines(facts.bare_handlers, "bare `except:` also catches KeyboardInterrupt and SystemExit")
+    definite += _handler_lines([lineno for lineno in facts.broad_handlers if lineno in facts.silent_handlers], "`Exception` caught and silently ignored")
+    if definite:
+        return (False, f"Exceptions are not handled specifically or are discarded. Static analysis found:\n\n{_lines(definite)}"), ""
+    lines = [f"{facts.handlers} exception handler(s)."]
+    lines += _handler_lines(facts.broad_handlers, "catches `Exception` or `BaseException`")
+    lines += _handler_lines(facts.silent_handlers, "handler does nothing")
+    lines.append(f"Raises: {', '.join(facts.raises)}." if facts.raises else "Raises no exceptions directly.")
+    return None, "\n".join(lines)
+
+
+def _imports_rule(facts: StaticFacts) -> Tuple[Optional[Tuple[bool, str]], str]:
+    lines = [f"Module imports used here: {', '.join(facts.used_imports) or 'none'}."]
+    if facts.unused_module_imports:
+        lines.append(f"Imports never used anywhere in the module: {', '.join(facts.unused_module_imports)}.")
+    return None, "\n".join(lines)
+
+
+# Check category -> rule returning ((passed, justification) if decided, else None, and a facts sheet)
+STATIC_RULES: Dict[str, Callable[[StaticFacts], Tuple[Optional[Tuple[bool, str]], str]]] = {
+    "Type Safety": _type_safety_rule,
+    "Exception Management": _exception_rule,
+    "Code Style and Readability": _style_rule,
+    "Dependencies and Imports": _imports_rule,
+    "Documentation": _documentation_rule,
+}
+
+
+def apply_static_rules(facts: Optional[StaticFacts], category: str, question: str) -> Tuple[Optional[Dict[str, str]], str]:
+    """
+    Returns a complete response if static analysis decides the check, else None, and the
+    facts sheet to add to the check prompt ("" if there is none).
+    """
+    rule = STATIC_RULES.get(category)
+    if facts is None or rule is None:
+        return None, ""
+    decided, facts_sheet = rule(facts)
+    if decided is not None:
+        passed, justification = decided
+        response = {
+            "qa_check_prompt": f"{category}: {question}",
+            "pass": "True" if passed else "False",
+            "justification": justification,
+            "decided_by": STATIC_DECIDER,
+        }
+        return response, ""
+    return None, facts_sheet
@@ -0,0 +1,142 @@
+import threading
+from typing import Callable, Dict, List, Optional
+
+JSON_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class JsonFieldStreamer:
+    """
+    Incrementally scans a streamed JSON document and returns the decoded text of one
+    string field (e.g. "justification") as it arrives, without waiting for the document
+    to be complete. Every occurrence of the field, at any depth, is emitted.
+    """
+    def __init__(self, field: str):
+        self.field = field
+        self._containers: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+        self._expect_key = False
+        self._current_key: Optional[str] = None
+        self._string_role: Optional[str] = None
+        self._key_chars: List[str] = []
+
+    def _emit(self, text: str, out: List[str]) -> None:
+        if self._string_role == "key":
+            self._key_chars.append(text)
+        elif self._string_role == "target":
+            out.append(text)
+
+    def _emit_code_point(self, code_point: int, out: List[str]) -> None:
+        if 0xD800 <= code_point <= 0xDBFF:
+            self._high_surrogate = code_point
+            return
+        if 0xDC00 <= code_point <= 0xDFFF and self._high_surrogate is not None:
+            code_point = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code_point - 0xDC00)
+        self._high_surrogate = None
+        self._emit(chr(code_point), out)
+
+    def feed(self, text: str) -> str:
+        out: List[str] = []
+        for char in text:
+            if self._in_string:
+                if self._unicode is not None:
+                    self._unicode += char
+                    if len(self._unicode) == 4:
+                        try:
+                            self._emit_code_point(int(self._unicode, 16), out)
+                        except ValueError:
+                            pass
+                        self._unicode = None
+                elif self._escape:
+                    self._escape = False
+                    if char == "u":
+                        self._unicode = ""
+                    else:
+                        self._emit(JSON_ESCAPES.get(char, char), out)
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_role == "key":
+                        self._current_key = "".join(self._key_chars)
+                else:
+                    self._emit(char, out)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._key_chars = []
+                if self._expect_key:
+                    self._string_role = "key"
+                elif self._containers and self._containers[-1] == "{" and self._current_key == self.field:
+                    self._string_role = "target"
+                else:
+                    self._string_role = "value"
+            elif char == "{":
+                self._containers.append("{")
+                self._expect_key = True
+            elif char == "[":
+                self._containers.append("[")
+                self._expect_key = False
+            elif char in "}]":
+                if self._containers:
+                    self._containers.pop()
+                self._expect_key = False
+                self._current_key = None
+            elif char == ",":
+                self._expect_key = bool(self._containers) and self._containers[-1] == "{"
+                self._current_key = None
+            elif char == ":":
+                self._expect_key = False
+        return "".join(out)
+
+
+class StreamPrinter:
+    """
+    Prints streamed text from several concurrent checks without interleaving them. The
+    first check to stream owns the terminal and is printed live; the others are buffered
+    and printed, then followed live, once the terminal is free.
+    """
+    def __init__(self, write: Callable[[str], None], labels: List[str]):
+        self.write = write
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._active: Optional[int] = None
+        self._buffers: Dict[int, List[str]] = {}
+        self._finished: List[int] = []
+
+    def _start(self, index: int) -> None:
+        self._active = index
+        self.write(f"\n{self.labels[index]}: ")
+        self.write("".join(self._buffers.pop(index, [])))
+
+    def _advance(self) -> None:
+        # Completed buffered checks are printed whole before any still-streaming one.
+        while self._active is None and (self._finished or self._buffers):
+            if self._finished:
+                index = self._finished.pop(0)
+                self._start(index)
+                self.write("\n")
+                self._active = None
+            else:
+                self._start(next(iter(self._buffers)))
+
+    def delta(self, index: int, text: str) -> None:
+        with self._lock:
+            if self._active is None and index not in self._finished:
+                self._start(index)
+            if index == self._active:
+                self.write(text)
+            else:
+                self._buffers.setdefault(index, []).append(text)
+
+    def complete(self, index: int) -> None:
+        with self._lock:
+            if index == self._active:
+                self.write("\n")
+                self._active = None
+            elif index in self._buffers:
+                self._finished.append(index)
+            self._advance()
@@ -0,0 +1,34 @@
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # Unknown model name or the encoding could not be loaded (e.g. offline).
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Counts tokens with tiktoken when it is installed, otherwise approximates the
+    count from words and punctuation, which tracks BPE counts on code closely enough
+    for budgeting.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return sum(1 + len(word) // 8 for word in WORD_PATTERN.findall(text))
@@ -0,0 +1,90 @@
+import atexit
+import heapq
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, List, Optional
+
+# Below this many files the work runs in-process; pool start-up and IPC would cost more.
+SERIAL_THRESHOLD = 64
+# Chunks per worker, so a slow chunk does not leave the other workers idle.
+CHUNKS_PER_WORKER = 4
+
+
+def size_balanced_chunks(paths: List[str], chunk_count: int) -> List[List[str]]:
+    """
+    Splits files into ``chunk_count`` chunks of similar total size, assigning the largest
+    files first to the currently lightest chunk.
+    """
+    sized = []
+    for path in paths:
+        try:
+            sized.append((os.path.getsize(path), path))
+        except OSError:
+            sized.append((0, path))
+    sized.sort(reverse=True)
+
+    chunk_count = max(1, min(chunk_count, len(sized)))
+    heap = [(0, index) for index in range(chunk_count)]
+    chunks: List[List[str]] = [[] for _ in range(chunk_count)]
+    for size, path in sized:
+        total, index = heapq.heappop(heap)
+        chunks[index].append(path)
+        heapq.heappush(heap, (total + size, index))
+    return [chunk for chunk in chunks if chunk]
+
+
+def _run_chunk(function: Callable[..., Any], chunk: List[str], arguments: tuple) -> List[Any]:
+    return [function(path, *arguments) for path in chunk]
+
+
+class WorkerPool:
+    """
+    Long-lived process pool shared by the index updates and caller scans of a run. Files
+    are submitted in size-balanced chunks, so a function and its arguments are pickled
+    once per chunk rather than once per file, and small jobs run serially.
+    """
+    def __init__(self, max_workers: Optional[int] = None, serial_threshold: int = SERIAL_THRESHOLD):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.serial_threshold = serial_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def map_files(self, function: Callable[..., Any], paths: List[str], *arguments: Any) -> Iterator[List[Any]]:
+        """
+        Calls ``function(path, *arguments)`` for every path and yields the results one chunk
+        at a time, in completion order. ``function`` must be a picklable module-level function.
+        """
+        if len(paths) < self.serial_threshold or self.max_workers == 1:
+            for path in paths:
+                yield [function(path, *arguments)]
+            return
+
+        chunks = size_balanced_chunks(paths, self.max_workers * CHUNKS_PER_WORKER)
+        executor = self._get_executor()
+        futures = [executor.submit(_run_chunk, function, chunk, arguments) for chunk in chunks]
+        for future in as_completed(futures):
+            yield future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+        atexit.register(_worker_pool.shutdown)
+    return _worker_pool
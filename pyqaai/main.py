@@ -1,39 +1,262 @@
+import argparse
 import sys
 import logging
+import time
 import warnings
-from dotenv import load_dotenv, set_key, dotenv_values
 import os
-import json
-from tqdm import tqdm
-from termcolor import colored
 
-from pyqaai.core.code_analyser import CodeAnalyser
-from pyqaai.core.user_interface import UserInterface
 from pyqaai.static.constants import TASK_CHOICES, WELCOME_MESSAGE
-from pyqaai.core.llm import LLM
-from pyqaai.static.prompts import SYSTEM_PROMPT, QA_PROMPTS, SYSTEM_PROMPT_IMPROVEMENT
-from pyqaai.core.report_generator import HTMLReportGenerator
-from pyqaai.core.config_loader import check_and_set_openai_credentials
+from pyqaai.static.prompts import CHECK_PROMPT, IMPROVEMENT_PROMPT, SYSTEM_PROMPT, QA_PROMPTS
+from pyqaai.core.backends import BACKEND_NAMES, LLMBackend, create_backend
+from pyqaai.core.instrumentation import get_tracer
+from pyqaai.core.config_loader import check_and_set_openai_credentials, load_config
+
+# Modules that pull in the OpenAI client, tqdm, inquirer or markdown are imported by the
+# command that needs them, so --help, --version and `pyqaai tiers` start instantly.
 
 warnings.filterwarnings("ignore")
-logging.getLogger().setLevel(logging.CRITICAL + 1)
 
-for name in logging.root.manager.loggerDict:
-    logging.getLogger(name).setLevel(logging.CRITICAL + 1)
+def silence_logging() -> None:
+    # Also covers loggers created later by lazily imported libraries
+    logging.disable(logging.CRITICAL)
+
+class VersionAction(argparse.Action):
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help="Show the installed version and exit."):
+        super().__init__(option_strings=option_strings, dest=dest, default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        # Looked up only when asked for; importlib.metadata is not free to import
+        from importlib.metadata import PackageNotFoundError, version
+        try:
+            installed = version("pyqaai")
+        except PackageNotFoundError:
+            installed = "(not installed)"
+        parser.exit(message=f"pyqaai {installed}\n")
+
+def add_common_arguments(parser: argparse.ArgumentParser, suppress_defaults: bool = False) -> None:
+    # Subcommands suppress their defaults so options given before the subcommand are kept
+    default = argparse.SUPPRESS if suppress_defaults else False
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument("--no-cache", action="store_true", default=default, help="Do not read or write the LLM response cache.")
+    cache_group.add_argument("--refresh", action="store_true", default=default, help="Ignore cached LLM responses and store fresh ones.")
+    parser.add_argument("--stream", action="store_true", default=default, help="Stream LLM responses and print justifications as they are generated.")
+    parser.add_argument("--backend", choices=BACKEND_NAMES, default=argparse.SUPPRESS if suppress_defaults else None, help="LLM backend to use (default: LLM_BACKEND in config.json, else openai).")
+    parser.add_argument("--trace", metavar="PATH", default=argparse.SUPPRESS if suppress_defaults else None, help="Write per-stage and per-LLM-call timings to PATH (Chrome trace JSON, or JSON lines for .jsonl) and print a summary.")
+    parser.add_argument("--validate-credentials", action="store_true", default=default, help="Check the OpenAI credentials with a test request before starting.")
+    parser.add_argument("--no-static-checks", action="store_true", default=default, help="Send every check to the model instead of answering mechanically decidable ones from the AST.")
+    parser.add_argument("--cascade-model", metavar="MODEL", default=argparse.SUPPRESS if suppress_defaults else None, help="Screen checks with this cheaper model first and escalate only failing or low-confidence ones (default: CASCADE_MODEL in config.json).")
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="pyqaai", description="AI Driven Python QA CLI")
+    parser.add_argument("--version", action=VersionAction)
+    add_common_arguments(parser)
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Run a QA tier over every function and class in the given paths without prompts.")
+    add_common_arguments(batch_parser, suppress_defaults=True)
+    batch_parser.add_argument("paths", nargs="+", help="Python files, directories or glob patterns to check.")
+    batch_parser.add_argument("--tier", choices=["1", "2", "3"], default="1", help="QA tier to run (default: 1).")
+    batch_parser.add_argument("--changed-since", metavar="GIT_REF", help="Only check functions and classes changed since this git ref.")
+    batch_parser.add_argument("--workers", type=int, default=4, help="Targets checked in parallel (default: 4).")
+    batch_parser.add_argument("--incremental", action="store_true", help="Only re-check functions and classes whose code, callees or callers changed since their last run.")
+    batch_parser.add_argument("--output", help="Path of the consolidated HTML report.")
+    batch_parser.add_argument("--results", help="Path of the JSON results file (default: next to the HTML report).")
+
+    serve_parser = subparsers.add_parser("serve", help="Run a local daemon that keeps the index and LLM client warm for pyqaai-client.")
+    add_common_arguments(serve_parser, suppress_defaults=True)
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1).")
+    serve_parser.add_argument("--port", type=int, default=0, help="Port to listen on (default: any free port).")
+    serve_parser.add_argument("--watch-interval", type=float, help="Seconds between index refreshes; 0 refreshes only on request (default: 2).")
+    serve_parser.add_argument("--workers", type=int, default=4, help="Targets checked in parallel per request (default: 4).")
+
+    subparsers.add_parser("tiers", help="List the QA tiers and the checks each one runs.")
+    return parser.parse_args(argv)
+
+def resolve_backend(args: argparse.Namespace, config: dict) -> LLMBackend:
+    backend_name = args.backend or config.get("LLM_BACKEND") or "openai"
+    api_key, organisation = None, None
+    try:
+        if backend_name == "openai":
+            api_key, organisation = check_and_set_openai_credentials(validate=args.validate_credentials)
+        else:
+            api_key = config.get("LLM_API_KEY")
+        return create_backend(backend_name, config, api_key, organisation)
+    except Exception as e:
+        print(f"Error configuring the {backend_name} backend: {e}")
+        sys.exit(1)
+
+def finish_trace(args: argparse.Namespace) -> None:
+    if not args.trace:
+        return
+    tracer = get_tracer()
+    print(tracer.format_summary())
+    try:
+        tracer.export(args.trace)
+        print(f"Trace written to {args.trace}")
+    except OSError as e:
+        print(f"Error writing trace: {e}")
+
+def list_tiers() -> None:
+    for task in TASK_CHOICES:
+        print(task)
+        for category, question in QA_PROMPTS.get(task.split(":")[0].strip(), {}).items():
+            print(f"  - {category}: {question}")
+
+def print_prompt_cache_usage() -> None:
+    # Only providers with prompt prefix caching report cached tokens
+    tracer = get_tracer()
+    prompt_tokens, cached_tokens = tracer.total("prompt_tokens"), tracer.total("cached_tokens")
+    if cached_tokens:
+        print(f"Prompt cache: {cached_tokens} of {prompt_tokens} prompt tokens served from the provider's cache ({cached_tokens / prompt_tokens:.0%}).")
+
+
+def static_checks_enabled(args: argparse.Namespace, config: dict) -> bool:
+    return not args.no_static_checks and config.get("STATIC_CHECKS", True) is not False
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    import sqlite3
+    from pyqaai.core.batch import BatchRunner, changed_line_ranges, enumerate_targets, expand_paths
+    from pyqaai.core.code_analyser import CodeAnalyser
+    from pyqaai.core.fingerprints import VerdictStore
+    from pyqaai.core.pipeline import create_cascade, create_context_builder, create_llm
+    from pyqaai.core.report_writer import BatchReportWriter
+    from pyqaai.core.static_checks import STATIC_DECIDER
+
+    config = load_config()
+    backend = resolve_backend(args, config)
+
+    code_analyser = CodeAnalyser(use_git_ls_files=bool(config.get("DISCOVERY_USE_GIT")))
+    llm = create_llm(config, None, None, code_analyser.project_root, no_cache=args.no_cache, refresh=args.refresh, stream=args.stream, backend=backend)
+    task_key = f"Tier {args.tier}"
+
+    try:
+        python_files = expand_paths(args.paths)
+        changed = changed_line_ranges(code_analyser.project_root, args.changed_since) if args.changed_since else None
+    except ValueError as e:
+        print(f"Error selecting files: {e}")
+        sys.exit(1)
+
+    targets = enumerate_targets(python_files, changed)
+    print(f"{len(targets)} functions/classes selected in {len(python_files)} files.")
+
+    try:
+        verdict_store = VerdictStore.for_project(code_analyser.project_root)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Verdict store unavailable, checking every target: {e}")
+        verdict_store = None
+
+    runner = BatchRunner(
+        code_analyser,
+        llm,
+        create_context_builder(config, llm),
+        task_key,
+        workers=args.workers,
+        batch_checks=bool(config.get("BATCH_CHECKS")),
+        verdict_store=verdict_store,
+        incremental=args.incremental,
+        cascade=create_cascade(config, llm, args.cascade_model),
+        static_checks=static_checks_enabled(args, config),
+    )
+    report_file = os.path.abspath(args.output) if args.output else f"qa_report_batch_{task_key.replace(' ', '_')}.html"
+    # Results are written as they finish instead of being held until the end of the run
+    report_writer = BatchReportWriter(report_file, task_key, args.results)
+    start = time.perf_counter()
+    runner.run(targets, on_result=report_writer.add, keep_results=False)
+    elapsed = time.perf_counter() - start
+    summary = report_writer.close(get_tracer().summary(), elapsed, cascade=runner.cascade_summary())
+    results_file = report_writer.results_file
+
+    print(f"Checks passed: {summary['checks_passed']}, failed: {summary['checks_failed']}, without a response: {summary['checks_errored']}")
+    if args.incremental:
+        print(f"Reused results for {summary['targets_reused']} unchanged targets.")
+    if llm.response_cache is not None:
+        print(f"Response cache: {llm.response_cache.hits} hits, {llm.response_cache.misses} misses.")
+    print_prompt_cache_usage()
+    if summary["decided_by"].get(STATIC_DECIDER):
+        print(f"Static pre-checks: {summary['decided_by'][STATIC_DECIDER]} checks decided without a model call.")
+    if runner.cascade is not None:
+        print(runner.cascade.format_summary(llm.model))
+    print(f"Results written to {results_file}")
+    print(f"Throughput: {summary['targets']} targets in {elapsed:.1f}s ({summary['targets_per_minute'] or 0:.1f} targets/minute)")
+    backend.close()
+    finish_trace(args)
+
+    # A non-zero exit code lets CI fail the build on failing checks
+    sys.exit(1 if summary["checks_failed"] else 0)
+
+def run_serve(args: argparse.Namespace) -> None:
+    import sqlite3
+    from pyqaai.core.code_analyser import CodeAnalyser
+    from pyqaai.core.daemon import DEFAULT_WATCH_INTERVAL, QADaemon
+    from pyqaai.core.fingerprints import VerdictStore
+    from pyqaai.core.pipeline import create_cascade, create_context_builder, create_llm
+
+    config = load_config()
+    backend = resolve_backend(args, config)
+
+    code_analyser = CodeAnalyser(use_git_ls_files=bool(config.get("DISCOVERY_USE_GIT")))
+    llm = create_llm(config, None, None, code_analyser.project_root, no_cache=args.no_cache, refresh=args.refresh, backend=backend)
+    try:
+        verdict_store = VerdictStore.for_project(code_analyser.project_root)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Verdict store unavailable, incremental requests will check every target: {e}")
+        verdict_store = None
+
+    daemon = QADaemon(
+        code_analyser,
+        llm,
+        create_context_builder(config, llm),
+        verdict_store=verdict_store,
+        host=args.host,
+        port=args.port,
+        watch_interval=DEFAULT_WATCH_INTERVAL if args.watch_interval is None else args.watch_interval,
+        workers=args.workers,
+        batch_checks=bool(config.get("BATCH_CHECKS")),
+        cascade=create_cascade(config, llm, args.cascade_model),
+        static_checks=static_checks_enabled(args, config),
+    )
+    print(f"PyQAAI daemon for {code_analyser.project_root} listening on {daemon.url} (Ctrl+C to stop)")
+    daemon.serve_forever()
+    backend.close()
+    print("Daemon stopped.")
 
 def main():
+    args = parse_arguments()
+    if args.command == "tiers":
+        list_tiers()
+        return
+
+    silence_logging()
+    if args.command == "batch":
+        run_batch(args)
+    elif args.command == "serve":
+        run_serve(args)
+    else:
+        run_interactive(args)
+
+def run_interactive(args: argparse.Namespace) -> None:
+    from tqdm import tqdm
+    from termcolor import colored
+    from pyqaai.core.code_analyser import CodeAnalyser
+    from pyqaai.core.pipeline import check_target, create_cascade, create_context_builder, create_llm
+    from pyqaai.core.report_generator import HTMLReportGenerator
+    from pyqaai.core.prompt_layout import render_template
+    from pyqaai.core.report_writer import failure_summary
+    from pyqaai.core.streaming import StreamPrinter
+    from pyqaai.core.user_interface import UserInterface
+    from pyqaai.models.models import StaleSourceError
+
     print(WELCOME_MESSAGE)
     print(f"Current Working Directory: {os.getcwd()}\n")
 
-    try:
-        openai_api_key, openai_organization = check_and_set_openai_credentials()
-    except Exception as e:
-        print(f"Error retrieving OpenAI credentials: {e}")
-        sys.exit(1)
+    config = load_config()
+    backend = resolve_backend(args, config)
 
-    code_analyser = CodeAnalyser()
+    code_analyser = CodeAnalyser(use_git_ls_files=bool(config.get("DISCOVERY_USE_GIT")))
     user_interface = UserInterface()
-    llm = LLM(api_key=openai_api_key, organisation=openai_organization)
+    llm = create_llm(config, None, None, code_analyser.project_root, no_cache=args.no_cache, refresh=args.refresh, stream=args.stream, backend=backend)
+    response_cache = llm.response_cache
     
     try:
         file_path = user_interface.select_python_file()
@@ -64,37 +287,133 @@ def main():
     print("---")
     report_generator = HTMLReportGenerator(report_file=f"qa_report_{selected_task.replace(' ', '_').replace(':', '_')}.html")
     report_generator.add_header(f"QA Report for {selected_task}", level=1)
+    # Finished sections are written to disk as they arrive
+    report_generator.enable_incremental_save()
 
-    print("Extracting invoked functions...")
-    invoked_functions = code_analyser.extract_callee_functions(file_path, selected_function_class)
-    if len(invoked_functions) > 0:
-        print(f"{colored('✓', 'green')} {len(invoked_functions)} invoked functions found in {selected_function_class}.\n\n")
-    else:
-        print(f"{len(invoked_functions)} invoked functions found in {selected_function_class}.\n\n")
+    task_key = selected_task.split(":")[0].strip()
+    if task_key != "Custom Task" and task_key not in QA_PROMPTS:
+        print("Selected task does not match any known QA checks.")
+        sys.exit(1)
 
-    print("Extracting imported modules...")
-    imported_modules, import_statements = code_analyser.get_imported_modules(file_path)
-    local_imported_functions_classes = code_analyser.extract_local_imported_functions(imported_modules)
-    if len(imported_modules) > 0:
-        print(f"{colored('✓', 'green')} {len(imported_modules)} imported modules processed.\n\n")
-    else:
-        print(f"{len(imported_modules)} imported modules processed.\n\n")
+    try:
+        qa_code = functions_classes[selected_function_class_full].code
+    except StaleSourceError as e:
+        print(f"Error reading the selected code: {e}")
+        sys.exit(1)
+    # Filled in once code analysis has finished, which may be after the first checks
+    report_generator.add_section("summary", make_current=False)
+    report_generator.add_section("code")
+    report_generator.add_header("Selected Code Block", level=2)
+    report_generator.add_code_block(qa_code)
+    # Reserved here and filled in once the checks have run
+    report_generator.add_section("improvement", make_current=False)
+    report_generator.add_section("results")
+
+    tracer = get_tracer()
+    context_builder = create_context_builder(config, llm)
+    stage_messages = {
+        "extract_callee_functions": lambda target: (len(target.invoked_functions), f"invoked functions found in {selected_function_class}."),
+        "extract_local_imported_functions": lambda target: (len(target.imported_modules), "imported modules processed."),
+        "find_callers_of_function": lambda target: (len(target.caller_methods), "caller functions found."),
+    }
+
+    def on_stage(stage, target):
+        if stage in stage_messages:
+            count, message = stage_messages[stage](target)
+            tqdm.write(f"{colored('✓', 'green')} {count} {message}" if count > 0 else f"{count} {message}")
+
+    print("Extracting invoked functions, imported modules and caller methods...")
+    # Structured results for the improvement prompt, which gets a summary rather than the report HTML
+    check_results = []
+    cascade = None
+
+    if task_key in QA_PROMPTS:
+        checks = QA_PROMPTS[task_key]
+        cascade = create_cascade(config, llm, args.cascade_model)
+        if cascade is not None and not cascade.applies(task_key):
+            cascade = None
+        total_questions = len(checks.items())
 
-    print("Extracting caller methods...")
-    caller_methods = code_analyser.find_callers_of_function(selected_function_class)
-    if len(caller_methods) > 0:
-        print(f"{colored('✓', 'green')} {len(caller_methods)} caller functions found.\n\n")
-    else:
-        print(f"{len(caller_methods)} caller functions found.\n\n")
-    
-    qa_code = functions_classes[selected_function_class_full].code
+        categories = list(checks.keys())
+        responses = [None] * total_questions
+        completed = [False] * total_questions
+        next_to_report = 0
+        printer = StreamPrinter(write=lambda text: tqdm.write(text, end=""), labels=categories) if args.stream else None
+
+        def report_ready_checks():
+            # Checks are written in category order as soon as all earlier ones have finished
+            nonlocal next_to_report
+            while next_to_report < total_questions and completed[next_to_report]:
+                category = categories[next_to_report]
+                response = responses[next_to_report]
+                report_generator.add_header(category, level=2)
+                if response:
+                    passed = response.get("pass") == "True"
+                    justification = response.get("justification", "No justification provided.")
+                    report_generator.add_result(checks[category], passed, justification)
+                    if response.get("decided_by") not in (None, llm.model):
+                        report_generator.add_paragraph(f"*Decided by {response['decided_by']}.*")
+                    check_results.append({"category": category, "question": checks[category], "pass": passed, "justification": justification})
+                next_to_report += 1
+
+        with tqdm(total=total_questions, desc="QA Check", unit="check", dynamic_ncols=True, leave=True) as pbar:
+            def on_response(index, response):
+                category = categories[index]
+                if printer is not None:
+                    printer.complete(index)
+                if response:
+                    if response.get("pass") == "True":
+                        # Update progress bar color and print question with a green checkmark
+                        pbar.colour = "green"
+                        tqdm.write(f"{category} {colored('✓', 'green')}")
+                    else:
+                        # Update progress bar color and print question with a red checkmark
+                        pbar.colour = "red"
+                        tqdm.write(f"{category} {colored('✗', 'red')}")
+                else:
+                    tqdm.write(f"{category}: Failed to generate a response.")
 
-    report_generator.add_summary(invoked_functions, imported_modules, caller_methods)
+                # Update the progress bar
+                pbar.update(1)
 
-    report_generator.add_header("Selected Code Block", level=2)
-    report_generator.add_code_block(qa_code)
+                responses[index] = response
+                completed[index] = True
+                report_ready_checks()
+
+            # Checks start as soon as the context sections they need are gathered
+            target, final_responses, graph = check_target(
+                code_analyser,
+                context_builder,
+                llm,
+                file_path,
+                selected_function_class_full,
+                functions_classes[selected_function_class_full],
+                task_key=task_key,
+                static_checks=static_checks_enabled(args, config),
+                batch_checks=bool(config.get("BATCH_CHECKS")),
+                cascade=cascade,
+                on_stage=on_stage,
+                on_response=on_response,
+                on_notice=tqdm.write,
+                on_delta=printer.delta if printer is not None else None,
+            )
+
+        # Checks that never reported still get their section
+        for index in range(total_questions):
+            if not completed[index]:
+                responses[index] = final_responses[index]
+                completed[index] = True
+        report_ready_checks()
+    else:
+        target, _, graph = check_target(code_analyser, context_builder, llm, file_path, selected_function_class_full,
+                                        functions_classes[selected_function_class_full], on_stage=on_stage)
 
-    task_key = selected_task.split(":")[0].strip()
+    assembled_context = target.assembled_context
+    report_generator.add_summary(target.invoked_functions, target.imported_modules, target.caller_methods, section="summary")
+    report_generator.add_context_summary(assembled_context, section="summary")
+    print(f"Context: {assembled_context.tokens_used}/{assembled_context.token_budget} tokens, "
+          f"{len(assembled_context.items_with_status('summarised'))} summarised, {len(assembled_context.items_with_status('dropped'))} dropped.\n")
+    code_context = target.code_context
 
     if task_key == "Custom Task":
         print("Custom Task Selected. Code analysis has been performed to gather relevant code. The AI will now carry out your custom task with the relevant code.")
@@ -106,21 +425,28 @@ def main():
             "answer": "Detailed technical prose explanation in markdown. No code at all. This section should be for planning in technical detail what should be done to fulfill the request or answering custom QA questions."  # Placeholder for LLM to provide reasoning
         }
 
-        # Prepare the system prompt with the custom question and return structure
-        system_prompt = "\n".join(SYSTEM_PROMPT).format(filled_structure=return_structure)
+        # Prepare the check prompt with the custom question and return structure
+        check_prompt = render_template(CHECK_PROMPT, filled_structure=return_structure)
+
+        on_delta = None
+        if args.stream:
+            print()
+            on_delta = lambda text: print(text, end="", flush=True)
 
         response = llm.generate_response(
-            system_prompt=system_prompt,
-            import_statements=import_statements,
-            local_imported_functions_classes=local_imported_functions_classes,
-            caller_methods=caller_methods,
-            qa_code=qa_code,
-            invoked_functions=invoked_functions
+            system_prompt=render_template(SYSTEM_PROMPT),
+            check_prompt=check_prompt,
+            on_delta=on_delta,
+            stream_field="answer",
+            **code_context
         )
+        if args.stream:
+            print()
 
         if response:
             answer = response.get("answer", "No answer provided.")
             report_generator.add_result(custom_prompt, "True", answer)
+            check_results.append({"category": "Custom Task", "question": custom_prompt, "pass": None, "justification": answer})
 
             print(colored("Response Received ✓", "green"))
 
@@ -128,86 +454,41 @@ def main():
             print(colored("Failed to generate a response ✗", "red"))
             print("Failed to generate a response.")
 
-    elif task_key in QA_PROMPTS:
-        checks = QA_PROMPTS[task_key]
-        total_questions = len(checks.items())
-
-        with tqdm(total=total_questions, desc="QA Check", unit="check", dynamic_ncols=True, leave=True) as pbar:
-            filled_structure = []
-
-            # Iterate over each category and its checks
-            for category, question in checks.items():
-                report_generator.add_header(category, level=2)
-
-                # Prepare the initial return structure
-                return_structure = {
-                    "qa_check_prompt": f"{category}: {question}",
-                    "pass": "True or False",  # Placeholder for LLM to decide
-                    "justification": "Detailed technical prose explanation in markdown for 'pass' verdict."  # Placeholder for LLM to provide reasoning
-                }
-
-                # Prepare the system prompt with the current question and return structure
-                system_prompt = "\n".join(SYSTEM_PROMPT).format(filled_structure=return_structure)
-
-                # Get the LLM response
-                response = llm.generate_response(
-                    system_prompt=system_prompt,
-                    import_statements=import_statements,
-                    local_imported_functions_classes=local_imported_functions_classes,
-                    caller_methods=caller_methods,
-                    qa_code=qa_code,
-                    invoked_functions=invoked_functions
-                )
-
-                if response:
-                    # Process the response and update the return structure accordingly
-                    filled_structure.append(response)
-
-                    # Check if the response passes
-                    passed = response.get("pass") == "True"
-                    justification = response.get("justification", "No justification provided.")
-                    report_generator.add_result(question, passed, justification)
-
-                    if passed:
-                        # Update progress bar color and print question with a green checkmark
-                        pbar.colour = "green"
-                        tqdm.write(f"{category} {colored('✓', 'green')}")
-                    else:
-                        # Update progress bar color and print question with a red checkmark
-                        pbar.colour = "red"
-                        tqdm.write(f"{category} {colored('✗', 'red')}")
-                else:
-                    tqdm.write("Failed to generate a response.")
-                
-                # Update the progress bar
-                pbar.update(1)
-
-    else:
-        print("Selected task does not match any known QA checks.")
-        sys.exit(1)
-
+    print(graph.format_critical_path())
     print("------\n\n")
     print("Generating Suggested Code Improvements...")
     # CODE IMPROVEMENT SUGGESTIONS
-    system_prompt = "\n".join(SYSTEM_PROMPT_IMPROVEMENT).format(qa_results="\n".join(report_generator.get_report_content()))
-
-    response = llm.generate_response(
-        system_prompt=system_prompt,
-        import_statements=import_statements,
-        local_imported_functions_classes=local_imported_functions_classes,
-        caller_methods=caller_methods,
-        qa_code=qa_code,
-        invoked_functions=invoked_functions
-    )
+    # Shares the system prompt and code context prefix with the checks above
+    check_prompt = render_template(IMPROVEMENT_PROMPT, qa_results=failure_summary(check_results))
+
+    with tracer.span("code_improvement"):
+        response = llm.generate_response(
+            system_prompt=render_template(SYSTEM_PROMPT),
+            check_prompt=check_prompt,
+            **code_context
+        )
 
     if response:
-        report_generator.add_header("Suggested Code Improvement:", level=2, index=4)
-        report_generator.add_paragraph(response["changelog"], index=5)
-        report_generator.add_code_block(response["import_statements"], index=6)
-        report_generator.add_code_block(response["suggested_code"], index=7)
-        
-    report_generator.save_report()
+        report_generator.add_header("Suggested Code Improvement:", level=2, section="improvement")
+        report_generator.add_paragraph(response["changelog"], section="improvement")
+        report_generator.add_code_block(response["import_statements"], section="improvement")
+        report_generator.add_code_block(response["suggested_code"], section="improvement")
+
+    if response_cache is not None:
+        print(f"Response cache: {response_cache.hits} hits, {response_cache.misses} misses.")
+        report_generator.add_cache_summary(response_cache.hits, response_cache.misses)
+    print_prompt_cache_usage()
+    if cascade is not None:
+        print(cascade.format_summary(llm.model))
+        report_generator.add_cascade_summary(cascade.summary(llm.model))
+    report_generator.add_critical_path(graph.critical_path_summary())
+    report_generator.add_timing_summary(tracer.summary())
+
+    with tracer.span("save_report"):
+        report_generator.save_report()
     report_generator.open_report()
+    backend.close()
+    finish_trace(args)
     print("Completed all checks and generated report.")
 
 if __name__ == "__main__":
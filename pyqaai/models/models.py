@@ -1,6 +1,141 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Memory maps kept open at once; the least recently read file is closed beyond this.
+MAX_OPEN_SOURCE_FILES = 64
+
+
+class SourceFiles:
+    """
+    Table of source files referenced by code elements. Paths are stored once and elements
+    keep a small integer id; text is read on demand from a memory map of the file. A file
+    that changed on disk since it was registered is reported as stale rather than read at
+    offsets that no longer match.
+    """
+    def __init__(self, max_open: int = MAX_OPEN_SOURCE_FILES):
+        self.max_open = max(1, max_open)
+        self.paths: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._stats: List[Tuple[int, int]] = []
+        self._maps: "OrderedDict[int, mmap.mmap]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def register(self, file_path: str) -> int:
+        """
+        Returns the id of ``file_path``, recording its current size and mtime. A file that
+        changed since it was last registered gets a new id, so elements holding the old id
+        keep failing the staleness check instead of reading new bytes at old offsets.
+        """
+        path = os.path.realpath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            file_id = self._ids.get(path)
+            if file_id is not None and self._stats[file_id] == (stat.st_mtime_ns, stat.st_size):
+                return file_id
+            if file_id is not None:
+                self._close(file_id)
+            file_id = len(self.paths)
+            self._ids[path] = file_id
+            self.paths.append(path)
+            self._stats.append((stat.st_mtime_ns, stat.st_size))
+            return file_id
+
+    def path(self, file_id: int) -> str:
+        return self.paths[file_id]
+
+    def read(self, file_id: int, start: int, end: int) -> Optional[str]:
+        """
+        The text between byte offsets ``start`` and ``end`` of a file, or None if the file
+        was changed or removed since it was registered.
+        """
+        path = self.paths[file_id]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            if self._stats[file_id] != (stat.st_mtime_ns, stat.st_size):
+                self._close(file_id)
+                return None
+            mapped = self._maps.get(file_id)
+            if mapped is None:
+                with open(path, "rb") as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[file_id] = mapped
+                while len(self._maps) > self.max_open:
+                    _, evicted = self._maps.popitem(last=False)
+                    evicted.close()
+            else:
+                self._maps.move_to_end(file_id)
+            return mapped[start:end].decode("utf-8", errors="ignore")
+
+    def _close(self, file_id: int) -> None:
+        mapped = self._maps.pop(file_id, None)
+        if mapped is not None:
+            mapped.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for file_id in list(self._maps):
+                self._close(file_id)
+
+
+_source_files: Optional[SourceFiles] = None
+
+
+class StaleSourceError(Exception):
+    """
+    Raised when the code of an element is read after its file changed on disk.
+    """
+    def __init__(self, path: str, name: str):
+        super().__init__(f"{path} changed since {name} was read; parse the file again to check it.")
+        self.path = path
+        self.name = name
+
+
+def get_source_files() -> SourceFiles:
+    global _source_files
+    if _source_files is None:
+        _source_files = SourceFiles()
+    return _source_files
+
+
 class CodeElement:
-    def __init__(self, element_type: str, name: str, code: str, lineno: int):
+    """
+    A function or class: its kind, name and line span, and the byte range of its source
+    in a registered file. ``code`` is read from the file each time it is accessed, so
+    enumerating a large project does not hold the text of every definition, and raises
+    StaleSourceError if the file changed since. Elements created with ``code`` keep that
+    text instead.
+    """
+    __slots__ = ("type", "name", "lineno", "end_lineno", "file_id", "start", "end", "_code")
+
+    def __init__(self, element_type: str, name: str, code: Optional[str] = None, lineno: int = 0,
+                 end_lineno: Optional[int] = None, file_id: Optional[int] = None, start: int = 0, end: int = 0):
         self.type = element_type
         self.name = name
-        self.code = code
-        self.lineno = int
\ No newline at end of file
+        self.lineno = lineno
+        self.end_lineno = end_lineno if end_lineno is not None else lineno
+        self.file_id = file_id
+        self.start = start
+        self.end = end
+        self._code = code
+
+    @property
+    def code(self) -> Optional[str]:
+        if self._code is not None or self.file_id is None:
+            return self._code
+        code = get_source_files().read(self.file_id, self.start, self.end)
+        if code is None:
+            raise StaleSourceError(self.path, self.name)
+        return code
+
+    @property
+    def path(self) -> Optional[str]:
+        return get_source_files().path(self.file_id) if self.file_id is not None else None
+
+    def __repr__(self) -> str:
+        return f"CodeElement({self.type} {self.name}, lines {self.lineno}-{self.end_lineno})"
@@ -1,18 +1,33 @@
+# The prompt of a check is laid out as a prefix shared by every check of a target (these
+# instructions, then the code context) followed by the check itself, so providers that
+# cache prompt prefixes can reuse the shared part.
 SYSTEM_PROMPT = (
     "Automated Python Quality Assurance Checking Tool v2.0\n\n",
     "You are a python expert that has been tasked with reviewing a Python function or class.",
-    "You will have access to the Function or Class to check, Import Statements, Locally Imported Functions/Classes, and Caller Methods.\n\n",
-    "------\n"
+    "You will have access to the Function or Class to check, Import Statements, Locally Imported Functions/Classes, and Caller Methods.",
+    "The task to perform and the JSON structure to return follow the code.\n\n",
+)
+
+CHECK_PROMPT = (
     "QA Checks to perform (complete the following FULL JSON list[dict] as instructed and return): {filled_structure}\n\n",
     "DO NOT DEVIATE FROM THE list[dict] structure or add any new keys. Only fill in the values for each check.\n\n",
 )
 
-SYSTEM_PROMPT_IMPROVEMENT = (
+CHECK_PROMPT_BATCH = (
+    "QA Checks to perform (complete EVERY entry of the following JSON list[dict] as instructed): {filled_structure}\n\n",
+    "Return a JSON object of the form {{'results': list[dict]}} containing one completed entry per QA check, in the same order, with 'qa_check_prompt' copied unchanged.\n\n",
+    "DO NOT DEVIATE FROM THE list[dict] structure or add any new keys. Only fill in the values for each check.\n\n",
+)
+
+STATIC_FACTS_PROMPT = (
+    "Static analysis facts (computed from the AST, these are reliable and need not be re-derived from the code):",
+    "{facts}\n\n",
+)
+
+IMPROVEMENT_PROMPT = (
     "Automated Python Quality Assurance Report Code Improvement Suggestion v2.0\n\n",
-    "You are a python expert that has been tasked with reviewing a Python function or class. Please be mindful that you don't necessarily have access to the latest API References for libaries in your training data, so please be cautious with any suggestions relating to what methods exist in an external API.",
-    "You will have access to the Function or Class to check, Import Statements, Locally Imported Functions/Classes, and Caller Methods.\n\n",
-    "------\n",
-    "You have previously performed the check. Based on the following QA Results, please suggest improvements to the code block provided below based on those results:\n\n",
+    "Please be mindful that you don't necessarily have access to the latest API References for libaries in your training data, so please be cautious with any suggestions relating to what methods exist in an external API.",
+    "You have previously performed the check. Based on the following QA Results, please suggest improvements to the code block provided above based on those results:\n\n",
     "QA Check Results {qa_results}\n\n",
     "You MUST return in the following JSON structure: {{'import_statements':'any necessary python import statements here', suggested_code': 'python code here - Original updated function ONLY. Do not include imports or surrounding code unless changes are there too', 'changelog': 'summary of changes in markdown'}}\n\n",
 )
@@ -38,4 +53,17 @@ QA_PROMPTS = {
         "Maintainability and Extensibility": "Is the code modular and well-structured to support future changes? Does the code follow the open/closed principle?",
         "Common Pitfalls": "Are there any easy-to-miss errors, typical Python pitfalls, or anti-patterns that need attention?"
     },
-}
\ No newline at end of file
+}
+
+# Context sections each check needs: "imports" (import statements and locally imported
+# definitions), "callees" (invoked functions) and "callers" (caller methods). Checks not
+# listed need all three. Checks with fewer sections start before the caller scan finishes.
+QA_CONTEXT_SECTIONS = {
+    "Type Safety": ("imports", "callees"),
+    "Code Style and Readability": ("imports",),
+    "Logic Clarity": ("callees",),
+    "Performance": ("callees",),
+    "Dependencies and Imports": ("imports", "callees"),
+    "Documentation": (),
+    "Common Pitfalls": ("imports", "callees"),
+}
@@ -0,0 +1,43 @@
+"""
+Import-time regression checks: importing the package and the CLI entry points must not
+load the LLM client, the report renderer or the interactive prompts. Each import runs in
+a fresh interpreter. ``benchmarks/bench_startup.py`` measures the import times.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("openai", "markdown", "inquirer")
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def imported_modules(code: str) -> set:
+    """
+    The modules loaded after running ``code`` in a fresh interpreter.
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPOSITORY_ROOT, os.environ.get("PYTHONPATH")])))
+    script = f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=environment, cwd=REPOSITORY_ROOT)
+    assert result.returncode == 0, result.stderr
+    return set(result.stdout.split())
+
+
+@pytest.mark.parametrize("code", [
+    "import pyqaai.core",
+    "import pyqaai",
+    "import pyqaai.main",
+    "import pyqaai.client",
+    "from pyqaai.core import CodeAnalyser, ContextBuilder",
+])
+def test_heavy_modules_are_not_imported(code):
+    loaded = {name.split(".")[0] for name in imported_modules(code)}
+    assert not loaded & set(HEAVY_MODULES), f"{code!r} imports {sorted(loaded & set(HEAVY_MODULES))}"
+
+
+def test_core_names_load_only_their_module():
+    loaded = imported_modules("import pyqaai.core; pyqaai.core.CodeAnalyser")
+    assert "pyqaai.core.code_analyser" in loaded
+    assert "pyqaai.core.report_generator" not in loaded
+    assert "pyqaai.core.user_interface" not in loaded